@@ -0,0 +1,31 @@
+# alembic/script.py.mako
+"""Add composite indexes for keyset-paginated job listing
+
+Revision ID: 93a034c1ca55
+Revises: 76fe211d9bf1
+Create Date: 2026-10-18 09:12:41.508114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93a034c1ca55'
+down_revision: Union[str, None] = '76fe211d9bf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_video_jobs_status_created_at_id', 'video_jobs', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_video_jobs_source_type_created_at_id', 'video_jobs', ['source_type', 'created_at', 'id'], unique=False)
+    op.create_index('ix_video_jobs_created_at_id', 'video_jobs', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_jobs_created_at_id', table_name='video_jobs')
+    op.drop_index('ix_video_jobs_source_type_created_at_id', table_name='video_jobs')
+    op.drop_index('ix_video_jobs_status_created_at_id', table_name='video_jobs')
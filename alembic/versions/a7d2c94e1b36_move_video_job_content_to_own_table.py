@@ -0,0 +1,185 @@
+# alembic/script.py.mako
+"""Move transcript, condensed_transcript, topics and editor_data to video_job_contents
+
+Revision ID: a7d2c94e1b36
+Revises: f3a86d1e5c27
+Create Date: 2026-10-18 18:02:37.540218
+
+"""
+import importlib.util
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2c94e1b36'
+down_revision: Union[str, None] = 'f3a86d1e5c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+CONTENT_COLUMNS = ('transcript', 'condensed_transcript', 'topics', 'editor_data')
+_COLUMN_LIST = ', '.join(CONTENT_COLUMNS)
+
+# Only jobs that have any content get a row (most status-only jobs don't need one)
+COPY_TO_CONTENTS = (
+    f"INSERT INTO video_job_contents (job_id, {_COLUMN_LIST})"
+    f" SELECT id, {_COLUMN_LIST} FROM video_jobs"
+    " WHERE id > :last_id AND id <= :upto"
+    f" AND ({' OR '.join(f'{c} IS NOT NULL' for c in CONTENT_COLUMNS)})"
+)
+COPY_TO_JOBS = (
+    "UPDATE video_jobs SET "
+    + ", ".join(f"{c} = (SELECT c.{c} FROM video_job_contents c WHERE c.job_id = video_jobs.id)" for c in CONTENT_COLUMNS)
+    + " WHERE id > :last_id AND id <= :upto"
+)
+
+# --- SQLite: the FTS5 index now reads its content through a view joining both tables ---
+# Every change to an indexed value first removes the old tuple (read through the view in a BEFORE
+# trigger) and re-adds the new one in an AFTER trigger. Status writes fire none of these triggers.
+_SEARCH_ROW = "SELECT {delete}id, transcript, topics, script_genre FROM video_jobs_search WHERE id = {job_id}"
+_FTS_DELETE = "INSERT INTO video_jobs_fts (video_jobs_fts, rowid, transcript, topics, script_genre) " + _SEARCH_ROW.format(delete="'delete', ", job_id="{job_id}") + ";"
+_FTS_INSERT = "INSERT INTO video_jobs_fts (rowid, transcript, topics, script_genre) " + _SEARCH_ROW.format(delete="", job_id="{job_id}") + ";"
+SQLITE_UPGRADE = [
+    "CREATE VIEW video_jobs_search AS"
+    " SELECT j.id AS id, c.transcript AS transcript, c.topics AS topics, j.script_genre AS script_genre"
+    " FROM video_jobs j LEFT JOIN video_job_contents c ON c.job_id = j.id",
+    "CREATE VIRTUAL TABLE video_jobs_fts USING fts5("
+    " transcript, topics, script_genre,"
+    " content='video_jobs_search', content_rowid='id', tokenize='porter unicode61')",
+    # video_jobs: new jobs, deleted jobs (the cascaded content delete then finds no view row) and genre changes
+    f"CREATE TRIGGER video_jobs_fts_ai AFTER INSERT ON video_jobs BEGIN {_FTS_INSERT.format(job_id='new.id')} END",
+    f"CREATE TRIGGER video_jobs_fts_bd BEFORE DELETE ON video_jobs BEGIN {_FTS_DELETE.format(job_id='old.id')} END",
+    f"CREATE TRIGGER video_jobs_fts_bu BEFORE UPDATE OF script_genre ON video_jobs BEGIN {_FTS_DELETE.format(job_id='old.id')} END",
+    f"CREATE TRIGGER video_jobs_fts_au AFTER UPDATE OF script_genre ON video_jobs BEGIN {_FTS_INSERT.format(job_id='new.id')} END",
+    # video_job_contents: an UPSERT that hits an existing row fires BEFORE INSERT and then the UPDATE
+    # triggers, so the BEFORE INSERT delete only runs when the row really is new
+    "CREATE TRIGGER video_job_contents_fts_bi BEFORE INSERT ON video_job_contents"
+    " WHEN NOT EXISTS (SELECT 1 FROM video_job_contents WHERE job_id = new.job_id)"
+    f" BEGIN {_FTS_DELETE.format(job_id='new.job_id')} END",
+    f"CREATE TRIGGER video_job_contents_fts_ai AFTER INSERT ON video_job_contents BEGIN {_FTS_INSERT.format(job_id='new.job_id')} END",
+    f"CREATE TRIGGER video_job_contents_fts_bu BEFORE UPDATE OF transcript, topics ON video_job_contents BEGIN {_FTS_DELETE.format(job_id='old.job_id')} END",
+    f"CREATE TRIGGER video_job_contents_fts_au AFTER UPDATE OF transcript, topics ON video_job_contents BEGIN {_FTS_INSERT.format(job_id='new.job_id')} END",
+    f"CREATE TRIGGER video_job_contents_fts_bd BEFORE DELETE ON video_job_contents BEGIN {_FTS_DELETE.format(job_id='old.job_id')} END",
+    f"CREATE TRIGGER video_job_contents_fts_ad AFTER DELETE ON video_job_contents BEGIN {_FTS_INSERT.format(job_id='old.job_id')} END",
+]
+SQLITE_TRIGGERS = (
+    'video_jobs_fts_ai', 'video_jobs_fts_bd', 'video_jobs_fts_bu', 'video_jobs_fts_au',
+    'video_job_contents_fts_bi', 'video_job_contents_fts_ai', 'video_job_contents_fts_bu',
+    'video_job_contents_fts_au', 'video_job_contents_fts_bd', 'video_job_contents_fts_ad',
+)
+SQLITE_BACKFILL = (
+    "INSERT INTO video_jobs_fts (rowid, transcript, topics, script_genre)"
+    " SELECT id, transcript, topics, script_genre FROM video_jobs_search WHERE id > :last_id AND id <= :upto"
+)
+
+# --- Postgres: the weighted tsvector moves to video_job_contents; the genre is read from the job ---
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce((SELECT j.script_genre FROM video_jobs j WHERE j.id = {row}job_id), '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}topics::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce({row}transcript, '')), 'C')"
+)
+PG_UPGRADE = [
+    "ALTER TABLE video_job_contents ADD COLUMN search_vector tsvector",
+    "CREATE FUNCTION video_job_contents_search_vector_update() RETURNS trigger AS $$ BEGIN"
+    f" new.search_vector := {PG_SEARCH_VECTOR.format(row='new.')};"
+    " RETURN new; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER video_job_contents_search_vector_trg BEFORE INSERT OR UPDATE OF transcript, topics"
+    " ON video_job_contents FOR EACH ROW EXECUTE FUNCTION video_job_contents_search_vector_update()",
+    # A genre change re-fires the contents trigger of that job
+    "CREATE FUNCTION video_jobs_genre_search_update() RETURNS trigger AS $$ BEGIN"
+    " UPDATE video_job_contents SET topics = topics WHERE job_id = new.id;"
+    " RETURN NULL; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER video_jobs_genre_search_trg AFTER UPDATE OF script_genre ON video_jobs"
+    " FOR EACH ROW WHEN (old.script_genre IS DISTINCT FROM new.script_genre)"
+    " EXECUTE FUNCTION video_jobs_genre_search_update()",
+]
+PG_BACKFILL = f"UPDATE video_job_contents SET search_vector = {PG_SEARCH_VECTOR.format(row='')} WHERE job_id > :last_id AND job_id <= :upto"
+
+
+def _in_batches(conn, statement: str) -> None:
+    """Runs statement for consecutive video_jobs id ranges of BATCH_SIZE jobs, so no single statement holds the table for long."""
+    last_id = 0
+    while True:
+        upto = conn.execute(
+            sa.text("SELECT max(id) FROM (SELECT id FROM video_jobs WHERE id > :last_id ORDER BY id LIMIT :batch) AS ids"),
+            {"last_id": last_id, "batch": BATCH_SIZE},
+        ).scalar()
+        if upto is None:
+            break
+        conn.execute(sa.text(statement), {"last_id": last_id, "upto": upto})
+        last_id = upto
+
+
+def _previous_revision():
+    """The full-text search revision; downgrade() restores its schema by re-running its upgrade()."""
+    path = next(Path(__file__).parent.glob(f"{down_revision}_*.py"))
+    spec = importlib.util.spec_from_file_location(f"_revision_{down_revision}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.create_table(
+        'video_job_contents',
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('video_jobs.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('transcript', sa.Text(), nullable=True),
+        sa.Column('condensed_transcript', sa.Text(), nullable=True),
+        sa.Column('topics', sa.JSON(), nullable=True),
+        sa.Column('editor_data', sa.JSON(), nullable=True),
+    )
+    _in_batches(conn, COPY_TO_CONTENTS)
+
+    # The previous full-text index reads the columns that are about to go
+    if conn.dialect.name == 'sqlite':
+        for name in ('video_jobs_fts_au', 'video_jobs_fts_ad', 'video_jobs_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS video_jobs_fts")
+    elif conn.dialect.name == 'postgresql':
+        op.drop_index('ix_video_jobs_search_vector', table_name='video_jobs')
+        op.execute("DROP TRIGGER IF EXISTS video_jobs_search_vector_trg ON video_jobs")
+        op.execute("DROP FUNCTION IF EXISTS video_jobs_search_vector_update()")
+        op.drop_column('video_jobs', 'search_vector')
+
+    with op.batch_alter_table('video_jobs') as batch_op:
+        for column in CONTENT_COLUMNS:
+            batch_op.drop_column(column)
+
+    if conn.dialect.name == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        _in_batches(conn, SQLITE_BACKFILL)
+    elif conn.dialect.name == 'postgresql':
+        for statement in PG_UPGRADE:
+            op.execute(statement)
+        _in_batches(conn, PG_BACKFILL)
+        op.create_index('ix_video_job_contents_search_vector', 'video_job_contents', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS video_jobs_fts")
+        op.execute("DROP VIEW IF EXISTS video_jobs_search")
+    elif conn.dialect.name == 'postgresql':
+        op.drop_index('ix_video_job_contents_search_vector', table_name='video_job_contents')
+        op.execute("DROP TRIGGER IF EXISTS video_jobs_genre_search_trg ON video_jobs")
+        op.execute("DROP FUNCTION IF EXISTS video_jobs_genre_search_update()")
+        op.execute("DROP TRIGGER IF EXISTS video_job_contents_search_vector_trg ON video_job_contents")
+        op.execute("DROP FUNCTION IF EXISTS video_job_contents_search_vector_update()")
+
+    op.add_column('video_jobs', sa.Column('transcript', sa.Text(), nullable=True))
+    op.add_column('video_jobs', sa.Column('condensed_transcript', sa.Text(), nullable=True))
+    op.add_column('video_jobs', sa.Column('topics', sa.JSON(), nullable=True))
+    op.add_column('video_jobs', sa.Column('editor_data', sa.JSON(), nullable=True))
+    _in_batches(conn, COPY_TO_JOBS)
+    op.drop_table('video_job_contents')
+
+    _previous_revision().upgrade() # Rebuilds the full-text index on the restored columns
@@ -0,0 +1,30 @@
+# alembic/script.py.mako
+"""Add pipeline_state column to VideoJob
+
+Revision ID: b3e8d51f0c74
+Revises: a7d2c94e1b36
+Create Date: 2026-10-18 21:14:08.316542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8d51f0c74'
+down_revision: Union[str, None] = 'a7d2c94e1b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable: jobs created before the pipeline layer (or with PIPELINE_AUTORUN off) have none
+    op.add_column('video_jobs', sa.Column('pipeline_state', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    # Plain DROP COLUMN (SQLite >= 3.35), not a batch table rebuild: on SQLite the rebuild would
+    # break the video_jobs_search view and FTS triggers that reference video_jobs
+    op.drop_column('video_jobs', 'pipeline_state')
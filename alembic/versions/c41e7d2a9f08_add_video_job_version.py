@@ -0,0 +1,29 @@
+# alembic/script.py.mako
+"""Add version column to VideoJob for optimistic concurrency
+
+Revision ID: c41e7d2a9f08
+Revises: 93a034c1ca55
+Create Date: 2026-10-18 11:03:27.214590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7d2a9f08'
+down_revision: Union[str, None] = '93a034c1ca55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server_default fills existing rows, so no backfill is needed
+    op.add_column('video_jobs', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('video_jobs') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,29 @@
+# alembic/script.py.mako
+"""Add condensed_transcript column to VideoJob
+
+Revision ID: e5b19c3d7a42
+Revises: c41e7d2a9f08
+Create Date: 2026-10-18 14:26:51.408317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b19c3d7a42'
+down_revision: Union[str, None] = 'c41e7d2a9f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable, filled lazily by the next topic generation of each job
+    op.add_column('video_jobs', sa.Column('condensed_transcript', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('video_jobs') as batch_op:
+        batch_op.drop_column('condensed_transcript')
@@ -0,0 +1,110 @@
+# alembic/script.py.mako
+"""Add full-text search over transcript, topics and script_genre
+
+Revision ID: f3a86d1e5c27
+Revises: e5b19c3d7a42
+Create Date: 2026-10-18 16:47:09.113652
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a86d1e5c27'
+down_revision: Union[str, None] = 'e5b19c3d7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# SQLite: FTS5 external-content table (no second copy of the transcripts) kept in sync by triggers.
+# The UPDATE trigger only fires when an indexed column is in the SET clause, so status writes don't pay for it.
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE video_jobs_fts USING fts5("
+    " transcript, topics, script_genre,"
+    " content='video_jobs', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER video_jobs_fts_ai AFTER INSERT ON video_jobs BEGIN"
+    " INSERT INTO video_jobs_fts (rowid, transcript, topics, script_genre)"
+    " VALUES (new.id, new.transcript, new.topics, new.script_genre);"
+    " END",
+    "CREATE TRIGGER video_jobs_fts_ad AFTER DELETE ON video_jobs BEGIN"
+    " INSERT INTO video_jobs_fts (video_jobs_fts, rowid, transcript, topics, script_genre)"
+    " VALUES ('delete', old.id, old.transcript, old.topics, old.script_genre);"
+    " END",
+    "CREATE TRIGGER video_jobs_fts_au AFTER UPDATE OF transcript, topics, script_genre ON video_jobs BEGIN"
+    " INSERT INTO video_jobs_fts (video_jobs_fts, rowid, transcript, topics, script_genre)"
+    " VALUES ('delete', old.id, old.transcript, old.topics, old.script_genre);"
+    " INSERT INTO video_jobs_fts (rowid, transcript, topics, script_genre)"
+    " VALUES (new.id, new.transcript, new.topics, new.script_genre);"
+    " END",
+]
+SQLITE_BACKFILL = (
+    "INSERT INTO video_jobs_fts (rowid, transcript, topics, script_genre)"
+    " SELECT id, transcript, topics, script_genre FROM video_jobs WHERE id > :last_id ORDER BY id LIMIT :batch"
+)
+
+# Postgres: weighted tsvector column (genre > topics > transcript) maintained by a trigger, with a GIN index
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}script_genre, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}topics::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce({row}transcript, '')), 'C')"
+)
+PG_UPGRADE = [
+    "ALTER TABLE video_jobs ADD COLUMN search_vector tsvector",
+    "CREATE FUNCTION video_jobs_search_vector_update() RETURNS trigger AS $$ BEGIN"
+    f" new.search_vector := {PG_SEARCH_VECTOR.format(row='new.')};"
+    " RETURN new; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER video_jobs_search_vector_trg BEFORE INSERT OR UPDATE OF transcript, topics, script_genre"
+    " ON video_jobs FOR EACH ROW EXECUTE FUNCTION video_jobs_search_vector_update()",
+]
+PG_BACKFILL = (
+    f"UPDATE video_jobs SET search_vector = {PG_SEARCH_VECTOR.format(row='')}"
+    " WHERE id IN (SELECT id FROM video_jobs WHERE id > :last_id ORDER BY id LIMIT :batch) RETURNING id"
+)
+
+
+def _backfill(conn, statement: str, returns_ids: bool) -> None:
+    """Indexes existing rows in id-ordered batches, so no single statement holds the table for long."""
+    last_id = 0
+    while True:
+        if returns_ids:
+            ids = [row[0] for row in conn.execute(sa.text(statement), {"last_id": last_id, "batch": BACKFILL_BATCH_SIZE})]
+        else:
+            ids = [row[0] for row in conn.execute(
+                sa.text("SELECT id FROM video_jobs WHERE id > :last_id ORDER BY id LIMIT :batch"),
+                {"last_id": last_id, "batch": BACKFILL_BATCH_SIZE},
+            )]
+            if ids:
+                conn.execute(sa.text(statement), {"last_id": last_id, "batch": BACKFILL_BATCH_SIZE})
+        if not ids:
+            break
+        last_id = max(ids)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        _backfill(conn, SQLITE_BACKFILL, returns_ids=False)
+    elif conn.dialect.name == 'postgresql':
+        for statement in PG_UPGRADE:
+            op.execute(statement)
+        _backfill(conn, PG_BACKFILL, returns_ids=True)
+        op.create_index('ix_video_jobs_search_vector', 'video_jobs', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        for name in ('video_jobs_fts_au', 'video_jobs_fts_ad', 'video_jobs_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS video_jobs_fts")
+    elif conn.dialect.name == 'postgresql':
+        op.drop_index('ix_video_jobs_search_vector', table_name='video_jobs')
+        op.execute("DROP TRIGGER IF EXISTS video_jobs_search_vector_trg ON video_jobs")
+        op.execute("DROP FUNCTION IF EXISTS video_jobs_search_vector_update()")
+        op.drop_column('video_jobs', 'search_vector')
@@ -44,16 +44,129 @@
 # # def add(x, y):
 # #     return x + y
 
+import asyncio
+import inspect
 import logging
-from celery import Celery
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from celery import Celery, Task
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from kombu import Exchange, Queue
 from app.core.config import settings
 from app.core.logging_config import setup_logging # Import setup function
+from app.database import make_async_engine, make_async_sessionmaker
 
 # Ensure logging is configured when Celery starts
 setup_logging()
 log = logging.getLogger(__name__)
 log.info("Configuring Celery application...")
 
+
+# --- Persistent per-process event loop for async tasks ---
+
+class WorkerLoop:
+    """
+    One long-lived event loop per worker process, running on a background thread.
+    It owns the pooled async DB engine and any reusable async clients (OpenAI/httpx),
+    so tasks stop paying loop, TLS and connection setup on every invocation.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.engine = make_async_engine() # Pooled, connections are reused across tasks
+        self.session_factory = make_async_sessionmaker(self.engine)
+        self._resources: Dict[str, Any] = {}
+        self._closers: List[Callable[[], Awaitable[None]]] = []
+        self._thread = threading.Thread(target=self.loop.run_forever, name="celery-async-loop", daemon=True)
+        self._thread.start()
+        log.info(f"Started persistent async task loop in worker process {self.pid}")
+
+    def run(self, coro: Awaitable) -> Any:
+        """Runs coro on the loop and blocks the calling (pool) thread until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def resource(self, name: str, factory: Callable[[], Any], closer: Optional[Callable[[Any], Awaitable[None]]] = None) -> Any:
+        """
+        Returns the loop-owned resource `name`, creating it with factory() on first use.
+        Must be called from a coroutine running on this loop (async clients bind to the loop they are used on).
+        """
+        if name not in self._resources:
+            resource = factory()
+            self._resources[name] = resource
+            if closer:
+                self._closers.append(lambda: closer(resource))
+        return self._resources[name]
+
+    async def _aclose(self) -> None:
+        for closer in reversed(self._closers):
+            try:
+                await closer()
+            except Exception as e:
+                log.warning(f"Error closing worker loop resource: {e}")
+        await self.engine.dispose()
+
+    def shutdown(self) -> None:
+        try:
+            self.run(self._aclose())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+            self.loop.close()
+            log.info(f"Stopped async task loop in worker process {self.pid}")
+
+
+_worker_loop: Optional[WorkerLoop] = None
+_worker_loop_lock = threading.Lock()
+
+
+def get_worker_loop() -> WorkerLoop:
+    """Returns this process's WorkerLoop, starting it lazily (also after a fork)."""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.pid != os.getpid():
+        with _worker_loop_lock:
+            if _worker_loop is None or _worker_loop.pid != os.getpid():
+                _worker_loop = WorkerLoop()
+    return _worker_loop
+
+
+def worker_session():
+    """New AsyncSession bound to the worker loop's pooled engine. Use only inside async tasks."""
+    return get_worker_loop().session_factory()
+
+
+def worker_resource(name: str, factory: Callable[[], Any], closer: Optional[Callable[[Any], Awaitable[None]]] = None) -> Any:
+    """Shortcut for get_worker_loop().resource(...)."""
+    return get_worker_loop().resource(name, factory, closer)
+
+
+class AsyncTask(Task):
+    """Celery task base that runs `async def` task bodies on the worker's persistent event loop."""
+
+    def __call__(self, *args, **kwargs):
+        result = super().__call__(*args, **kwargs)
+        if inspect.isawaitable(result):
+            return get_worker_loop().run(result)
+        return result
+
+
+@worker_process_init.connect
+def _reset_worker_loop(**kwargs):
+    # Never share a loop/engine inherited from the parent process across a fork
+    global _worker_loop
+    _worker_loop = None
+
+
+@worker_process_shutdown.connect # Prefork children
+@worker_shutdown.connect # Thread pool workers run their tasks (and the loop) in the main process
+def _shutdown_worker_loop(**kwargs):
+    global _worker_loop
+    if _worker_loop is not None and _worker_loop.pid == os.getpid():
+        _worker_loop.shutdown()
+        _worker_loop = None
+
 celery = Celery(
     # Use project name from settings if desired, or keep specific name
     settings.PROJECT_NAME or "yt_auto_vid_suite",
@@ -63,7 +176,9 @@ celery = Celery(
         # Add paths to task modules here
         'app.services.transcription_service', # Contains transcribe_audio_task
         'app.services.input_handler',      # Contains download_youtube_audio_task
+        'app.services.audio_normalizer',     # Contains normalize_audio_task
         'app.services.llm_service',          # Contains generate_topics_task
+        'app.services.pipeline',             # Contains the pipeline stage tasks
         # Add future tasks here:
         # 'app.services.video_generator',
         # 'app.services.youtube_service',
@@ -71,17 +186,110 @@ celery = Celery(
     ],
 )
 
-# Optional Celery configuration (keep as before)
+# --- Queue topology ---
+# I/O-bound stages spend their time waiting on YouTube, Whisper or the chat API: they run on
+# thread pool workers (every thread drives the shared worker loop) with a few prefetched messages
+# per thread. Downloads get their own worker, sized to the yt-dlp slots (plus metadata lookups running
+# ahead), so a download backlog can't take every thread of the worker serving Whisper and chat calls.
+# CPU-bound stages (ffmpeg/numpy audio work, rendering) run prefork, one task per core, and reserve
+# nothing beyond what they run.
+# Threads rather than gevent: AsyncTask blocks the calling thread on the worker's asyncio loop, which
+# gevent's monkey-patching would turn into a greenlet.
+DEFAULT_QUEUE = "celery" # Unrouted tasks; consumed by the CPU profile
+IO_QUEUES = ("download", "transcription", "llm")
+CPU_QUEUES = ("audio", "render")
+
+TASK_QUEUES = {
+    "tasks.download_youtube_audio": "download",
+    "tasks.transcribe_audio": "transcription", # Whisper requests; chunk export runs in ffmpeg subprocesses
+    "tasks.generate_topics": "llm",
+    "tasks.normalize_audio": "audio",
+    "tasks.render_*": "render", # Video rendering tasks, once they exist
+    # Pipeline stages (app/services/pipeline.py) run the tasks above in-process, so they go where those go
+    "tasks.pipeline.download": "download",
+    "tasks.pipeline.normalize": "audio",
+    "tasks.pipeline.transcribe": "transcription",
+    "tasks.pipeline.topics": "llm",
+    "tasks.pipeline.join": "llm", # Merges chord results: tiny, and shouldn't wait behind CPU work
+}
+
+# 0-9, higher runs first within a queue. Cheap calls a user is waiting on go ahead of long ones.
+TASK_PRIORITIES = {
+    "tasks.generate_topics": 8,
+    "tasks.transcribe_audio": 6,
+    "tasks.normalize_audio": 6,
+    "tasks.download_youtube_audio": 4,
+    "tasks.pipeline.topics": 8,
+    "tasks.pipeline.transcribe": 6,
+    "tasks.pipeline.normalize": 6,
+    "tasks.pipeline.download": 4,
+}
+DEFAULT_PRIORITY = 5
+
+
+def broker_priority(priority: int) -> int:
+    """
+    Message priority for a 0-9 "higher runs first" priority. The Redis transport consumes 0 first
+    (AMQP brokers consume 9 first), so the scale is flipped there.
+    """
+    priority = max(0, min(9, priority))
+    if settings.CELERY_BROKER_URL.split(":", 1)[0] in ("redis", "rediss", "sentinel"):
+        return 9 - priority
+    return priority
+
+
+def _task_annotations() -> Dict[str, Dict[str, Any]]:
+    """Per-task priority and the rate limit of the queue each task is routed to."""
+    annotations: Dict[str, Dict[str, Any]] = {}
+    for name, queue in TASK_QUEUES.items():
+        if "*" in name:
+            continue
+        annotations[name] = {"priority": broker_priority(TASK_PRIORITIES.get(name, DEFAULT_PRIORITY))}
+        if rate_limit := settings.CELERY_QUEUE_RATE_LIMITS.get(queue):
+            annotations[name]["rate_limit"] = rate_limit # Celery enforces it per worker process
+    return annotations
+
+
+@dataclass(frozen=True)
+class WorkerProfile:
+    queues: Tuple[str, ...]
+    pool: str # "threads" or "prefork"
+    concurrency: int
+    prefetch_multiplier: int
+
+
+def worker_profiles() -> Dict[str, WorkerProfile]:
+    """Worker profiles by name, for `python -m app.worker <profile>`."""
+    cores = settings.CELERY_CPU_CONCURRENCY or os.cpu_count() or 1
+    io = lambda threads, *queues: WorkerProfile(queues, "threads", threads, settings.CELERY_IO_PREFETCH_MULTIPLIER)
+    cpu = lambda *queues: WorkerProfile(queues, "prefork", cores, 1)
+    return {
+        "download": io(settings.YTDLP_DOWNLOAD_WORKERS + settings.YTDLP_METADATA_WORKERS, "download"),
+        "api": io(settings.CELERY_IO_CONCURRENCY, "transcription", "llm"),
+        "cpu": cpu(*CPU_QUEUES, DEFAULT_QUEUE),
+        # One queue per worker, e.g. to scale LLM calls separately
+        "transcription": io(settings.CELERY_IO_CONCURRENCY, "transcription"),
+        "llm": io(settings.CELERY_IO_CONCURRENCY, "llm"),
+        **{queue: cpu(queue) for queue in CPU_QUEUES},
+        "all": cpu(*IO_QUEUES, *CPU_QUEUES, DEFAULT_QUEUE), # Everything in one worker (development)
+    }
+
+
 celery.conf.update(
     task_serializer="json",
     accept_content=["json"],
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-    worker_prefetch_multiplier=1,
+    worker_prefetch_multiplier=1, # CPU profiles; I/O profiles pass their own multiplier
     task_acks_late=True,
-    # Optional: Set default task routing, rate limits etc.
-    # task_routes = {'tasks.transcribe_audio': {'queue': 'transcription'},} # Example routing
+    task_default_queue=DEFAULT_QUEUE,
+    task_queues=[Queue(name, Exchange(name), routing_key=name) for name in (*IO_QUEUES, *CPU_QUEUES, DEFAULT_QUEUE)],
+    task_routes={name: {"queue": queue, "routing_key": queue} for name, queue in TASK_QUEUES.items()},
+    task_annotations=_task_annotations(),
+    task_default_priority=broker_priority(DEFAULT_PRIORITY),
+    task_queue_max_priority=9, # x-max-priority on AMQP brokers
+    broker_transport_options={"priority_steps": list(range(10)), "sep": ":"}, # Redis: one list per priority
 )
 
 log.info(f"Celery configured with broker: {settings.CELERY_BROKER_URL}")
@@ -22,13 +22,28 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # SQLite tuning: "production" applies WAL/busy_timeout/mmap/cache PRAGMAs on connect, "default" leaves SQLite as is
+    SQLITE_PROFILE: str = "production"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
+    SQLITE_SYNC_BEGIN_IMMEDIATE: bool = True # Sync (worker) transactions take the write lock at BEGIN
 
     # Celery
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    # Worker profiles (python -m app.worker <profile>, queues in app/celery_app.py)
+    CELERY_IO_CONCURRENCY: int = 32 # Threads per API worker (transcription and llm queues)
+    CELERY_IO_PREFETCH_MULTIPLIER: int = 4 # I/O tasks mostly wait, so each thread may reserve a few messages
+    CELERY_CPU_CONCURRENCY: int = 0 # Prefork processes per CPU worker (audio and render queues); 0 = one per core
+    CELERY_QUEUE_RATE_LIMITS: dict[str, str] = {"download": "30/m"} # Per queue and worker process, Celery rate strings
+    CELERY_BULK_PRIORITY: int = 1 # 0-9, higher runs first; POST /jobs/bulk downloads queue behind single submissions
 
     # API Keys (loaded but potentially validated later)
     OPENAI_API_KEY: str | None = None
+    OPENAI_BASE_URL: str | None = None # Override to point at a local/fake OpenAI-compatible server
     GEMINI_API_KEY: str | None = None
     PEXELS_API_KEY: str | None = None
 
@@ -36,6 +51,100 @@ class Settings(BaseSettings):
     DOWNLOAD_DIR: Path = BASE_DIR / "downloads"
     RENDER_DIR: Path = BASE_DIR / "renders"
     MUSIC_LIBRARY_DIR: Path = BASE_DIR / "music_library" # Where user adds music
+    CACHE_DIR: Path = BASE_DIR / "cache" # Local caches shared by API and workers
+
+    # Job status events (pushed to streaming clients instead of polling)
+    JOB_EVENTS_BACKEND: str = "redis" # "redis", or "memory" for a single process (tests/eager mode)
+    JOB_EVENTS_REDIS_URL: str | None = None # Defaults to CELERY_BROKER_URL
+    JOB_EVENTS_HEARTBEAT_SECONDS: float = 15.0 # SSE keep-alive comment interval
+
+    # Audio uploads (streamed to DOWNLOAD_DIR; hashed on the way for transcript cache hits)
+    UPLOAD_MAX_BYTES: int = 2 * 1024 * 1024 * 1024 # Rejected from Content-Length, or as soon as more arrives
+    UPLOAD_WRITE_CHUNK_BYTES: int = 1024 * 1024 # Network chunks are gathered into writes of this size
+
+    # YouTube ingest (per worker process; yt-dlp instances stay warm on each pool thread)
+    YTDLP_DOWNLOAD_WORKERS: int = 4 # Parallel downloads
+    YTDLP_METADATA_WORKERS: int = 4 # Metadata lookups, run ahead of free download slots
+    YTDLP_CONCURRENT_FRAGMENTS: int = 4 # Parallel fragment connections per download (HLS/DASH sources)
+    YTDLP_AUDIO_FORMAT: str = "bestaudio[acodec^=mp4a]/bestaudio[acodec=opus]/bestaudio/best" # Prefer streams Whisper takes as is
+    YTDLP_SKIP_REENCODE: bool = True # Keep m4a/webm-opus audio as downloaded; anything else is still converted to MP3
+
+    # Bulk job submission
+    BULK_JOB_MAX_ITEMS: int = 1000 # Max job specs accepted per POST /jobs/bulk
+
+    # Worker status writes (write-behind, merged per job, one transaction per batch)
+    STATUS_COALESCER_ENABLED: bool = True
+    STATUS_FLUSH_INTERVAL_MS: int = 200 # Max time a non-terminal status update waits before being written
+    STATUS_FLUSH_MAX_BATCH: int = 100 # Flush early once this many jobs have pending updates
+
+    # Transcript cache (content-addressed, skips Whisper for audio we've already seen)
+    TRANSCRIPT_CACHE_ENABLED: bool = True
+    TRANSCRIPT_CACHE_PATH: Path = BASE_DIR / "cache" / "transcripts.sqlite3"
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024 # LRU eviction above this size
+
+    # LLM response cache (shared SQLite file; exact prompt match plus optional near-duplicate scripts)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: Path = BASE_DIR / "cache" / "llm_responses.sqlite3"
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024 # LRU eviction above this size
+    LLM_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    LLM_CACHE_NEAR_DUPLICATES: bool = True # Reuse responses for scripts whose SimHash is within the distance below
+    LLM_CACHE_SIMHASH_MAX_DISTANCE: int = 3 # Bits out of 64 (max 3)
+
+    # Topic generation: one JSON-mode call for genre + topics instead of two round trips
+    LLM_SINGLE_CALL_ANALYSIS: bool = True # Per-job override: POST /jobs/{id}/generate_topics?single_call=
+
+    # Async LLM executor (per worker process: divide the org's quotas by the number of LLM worker processes)
+    LLM_MAX_CONCURRENCY: int = 32 # In-flight chat completions per worker process
+    LLM_RPM_LIMIT: int = 3500 # Requests per minute
+    LLM_TPM_LIMIT: int = 90000 # Tokens per minute (estimated prompt tokens + max_tokens)
+    LLM_MAX_RETRIES: int = 5 # On 429/5xx/connection errors, with jittered exponential backoff
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 120.0
+    LLM_HTTP2: bool = True # Needs httpx[http2]; falls back to HTTP/1.1 pooling without it
+
+    # Streamed topic generation: topics are parsed as they arrive and persisted in batches
+    LLM_STREAM_TOPICS: bool = True
+    LLM_STREAM_PERSIST_EVERY: int = 5 # Write the partial list after this many new topics...
+    LLM_STREAM_PERSIST_INTERVAL_SECONDS: float = 1.0 # ...or when this much time has passed since the last write
+
+    # Transcript condensation: extractive summary of the whole transcript sent to the LLM (cached on the job)
+    TRANSCRIPT_CONDENSE_ENABLED: bool = True # Off: the LLM sees the first 4000 characters
+    TRANSCRIPT_CONDENSE_TOKEN_BUDGET: int = 1000 # Prompt tokens spent on the script per call
+    TRANSCRIPT_CONDENSE_SECTION_TOKENS: int = 150 # Budget share per section; more sections = more even coverage
+
+    # Topic post-processing: near-duplicate removal and novelty ranking against all earlier topics
+    TOPIC_RANKER_ENABLED: bool = True
+    TOPIC_INDEX_PATH: Path = BASE_DIR / "cache" / "topic_index.sqlite3" # Shared ANN index of every generated topic
+    TOPIC_EMBED_DIM: int = 1024 # Hashed character n-gram buckets
+    TOPIC_INDEX_BITS: int = 128 # Random-hyperplane code length (multiple of 64); changing it rebuilds the index
+    TOPIC_INDEX_BACKFILL_STALE_SECONDS: int = 600 # A backfill claim not renewed for this long (its process died) is taken over
+    TOPIC_DEDUP_THRESHOLD: float = 0.8 # Cosine at or above which two topics of one job are duplicates
+    TOPIC_HISTORY_THRESHOLD: float = 0.85 # Cosine at or above which a topic repeats one of another job
+    TOPIC_DROP_HISTORY_DUPLICATES: bool = False # Drop repeats of earlier jobs' topics instead of ranking them last
+
+    # Audio normalization before transcription (streamed through ffmpeg: mono 16 kHz, silence trimmed, compact codec)
+    AUDIO_NORMALIZE_ENABLED: bool = True
+    AUDIO_NORMALIZE_CODEC: str = "opus" # "opus" (.ogg) or "mp3"
+    AUDIO_NORMALIZE_BITRATE: str = "24k"
+    AUDIO_TRIM_SILENCE: bool = True # Energy VAD: trims leading/trailing silence and shortens long pauses
+    AUDIO_SILENCE_THRESHOLD_DB: float = -45.0 # 20ms frames quieter than this (RMS, dBFS) are silence
+    AUDIO_SILENCE_PAD_SECONDS: float = 0.3 # Silence kept next to speech so word edges aren't clipped
+    AUDIO_MAX_PAUSE_SECONDS: float = 5.0 # Pauses are shortened to this; also bounds what the trimmer holds in memory
+
+    # YouTube download/transcription pipelining
+    YOUTUBE_PIPELINE_MODE: str = "staged" # "staged": download, then a transcription task; "streaming": transcribe chunks while downloading, in the download task
+    STREAM_CHUNK_SECONDS: float = 120.0 # Streaming chunk length; shorter = transcription starts sooner
+    STREAM_CUT_SEARCH_SECONDS: float = 10.0 # Each chunk ends at the quietest frame of its last this-many seconds
+    STREAM_QUEUE_CHUNKS: int = 2 # Encoded chunks waiting for a Whisper slot before the download is paused
+
+    # Pipeline orchestration (app/services/pipeline.py)
+    PIPELINE_AUTORUN: bool = True # Run new jobs end to end (through topics) as one Celery canvas; False: stop after transcription as before
+
+    # Chunked transcription (long audio is split at silences and transcribed in parallel)
+    TRANSCRIPTION_CHUNKING_ENABLED: bool = True
+    TRANSCRIPTION_CHUNK_MAX_SECONDS: float = 600.0 # Upper bound per chunk; longer audio gets chunked
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS: float = 1.0 # Only used when no silence is found near a cut
+    TRANSCRIPTION_CHUNK_CONCURRENCY: int = 4 # Max in-flight Whisper requests per job
+    WHISPER_MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024 # API upload limit; bigger files are always chunked
 
     class Config:
         env_file = BASE_DIR / ".env"
@@ -53,6 +162,7 @@ def get_settings() -> Settings:
     settings.DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
     settings.RENDER_DIR.mkdir(parents=True, exist_ok=True)
     settings.MUSIC_LIBRARY_DIR.mkdir(parents=True, exist_ok=True)
+    settings.CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
     return settings
 
@@ -0,0 +1,21 @@
+class StaleJobVersionError(Exception):
+    """Raised when a VideoJob update expected a version that another writer already replaced."""
+
+    def __init__(self, job_id: int, expected_version: int, actual_version: int):
+        self.job_id = job_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+        super().__init__(f"VideoJob {job_id} is at version {actual_version}, expected {expected_version}")
+
+
+class SearchUnavailableError(Exception):
+    """Raised when the full-text index is missing (migrations not applied) or the database backend has none."""
+
+
+class UploadTooLargeError(Exception):
+    """Raised as soon as an upload is known to exceed UPLOAD_MAX_BYTES (declared or streamed size)."""
+
+    def __init__(self, size: int, max_bytes: int):
+        self.size = size
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds the {max_bytes // 2**20}MB limit")
@@ -47,18 +47,82 @@ from app.core.config import settings
 
 
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
 from app.core.config import settings
 
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in settings.DATABASE_URL or settings.DATABASE_URL.rstrip("/").endswith("sqlite:"))
+
+
+# --- SQLite production profile ---
+# Applied on every new DBAPI connection. WAL lets readers run alongside the single writer,
+# busy_timeout makes writers wait for the lock instead of failing with "database is locked".
+def sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL", # Durable at checkpoints; safe with WAL
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KIB, # Negative = KiB rather than pages
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON", # video_job_contents rows are deleted with their job (ON DELETE CASCADE)
+    }
+
+def _apply_sqlite_profile(sync_engine_, begin_immediate: bool = False) -> None:
+    """Installs the connect-time PRAGMAs (and optionally BEGIN IMMEDIATE) on an engine."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(sync_engine_, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        if begin_immediate:
+            # Stop the driver from issuing its own deferred BEGIN; we emit BEGIN IMMEDIATE below
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    if begin_immediate:
+        # Take the write lock when the transaction starts, so a read-then-write transaction
+        # waits on busy_timeout instead of failing on the lock upgrade
+        @event.listens_for(sync_engine_, "begin")
+        def _on_begin(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def _engine_kwargs(is_async: bool) -> dict:
+    """Pool strategy per engine type."""
+    if IS_SQLITE_MEMORY:
+        # One shared connection, otherwise every connection would see its own empty database
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    pool_kwargs = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if IS_SQLITE:
+        # Pooled connections may be handed to different threads (Celery thread pools, to_thread)
+        return {
+            "poolclass": AsyncAdaptedQueuePool if is_async else QueuePool,
+            "connect_args": {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            **pool_kwargs,
+        }
+    return {"pool_pre_ping": True, **pool_kwargs}
+
+# --- Async engine/session factories (shared by FastAPI and the Celery worker loop) ---
+def make_async_engine(**engine_kwargs):
+    """Creates an async engine for DATABASE_URL. Each event loop that talks to the DB should own one."""
+    engine = create_async_engine(settings.DATABASE_URL, **{**_engine_kwargs(is_async=True), **engine_kwargs})
+    if IS_SQLITE and settings.SQLITE_PROFILE == "production":
+        _apply_sqlite_profile(engine.sync_engine)
+    return engine
+
+def make_async_sessionmaker(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
 # --- Keep Async Engine & Session for FastAPI ---
-async_engine = create_async_engine(settings.DATABASE_URL)
-AsyncSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
-)
+async_engine = make_async_engine()
+AsyncSessionLocal = make_async_sessionmaker(async_engine)
 
 # --- Add Sync Engine & Session for Celery Tasks ---
 # Create a standard synchronous engine using the same URL
@@ -66,12 +130,15 @@ AsyncSessionLocal = sessionmaker(
 # (e.g., pip install psycopg2-binary for postgres, mysql-connector-python for mysql)
 # For SQLite, the built-in driver works. Remove +aiosqlite part for sync.
 sync_db_url = settings.DATABASE_URL.replace("+aiosqlite", "")
-sync_engine = create_engine(
-    sync_db_url,
-    # Add pool settings if needed for non-SQLite DBs
-    # pool_pre_ping=True, # Example
-    # connect_args={"check_same_thread": False} # REQUIRED FOR SQLITE SYNC IN THREADS
-)
+
+def make_sync_engine(**engine_kwargs):
+    engine = create_engine(sync_db_url, **{**_engine_kwargs(is_async=False), **engine_kwargs})
+    if IS_SQLITE and settings.SQLITE_PROFILE == "production":
+        # Sync sessions are the worker write path: take the write lock up front
+        _apply_sqlite_profile(engine, begin_immediate=settings.SQLITE_SYNC_BEGIN_IMMEDIATE)
+    return engine
+
+sync_engine = make_sync_engine()
 SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
 # --- Base remains the same ---
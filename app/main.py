@@ -83,6 +83,7 @@ from app.core.logging_config import setup_logging
 # Import routers later when they are created
 from app.routers import input_processor, topic_generator # Add topic_generator import later
 from app.database import Base # Import Base and engine for Alembic check
+from app.services.job_events import job_event_hub
 #from app.database import Base
 
 # Setup logging *before* creating FastAPI app instance
@@ -132,7 +133,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutdown...")
-    pass
+    await job_event_hub.stop() # Stop the job status listener task
 
 # --- Health Check Endpoint --- (Keep as before)
 @app.get("/health", tags=["Health"])
@@ -143,4 +144,6 @@ async def health_check():
 
 # Add the routers here once created in routers/
 from app.routers import jobs # We'll create this router file next
-app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
\ No newline at end of file
+app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
+from app.routers import search
+app.include_router(search.router, prefix="/api/v1", tags=["Search"])
\ No newline at end of file
@@ -1,4 +1,4 @@
 
 # Import all models here so Alembic can find them via Base.metadata
-from .video_job import VideoJob
+from .video_job import VideoJob, VideoJobContent
 # from .topic import Topic # Import when created
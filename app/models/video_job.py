@@ -56,7 +56,8 @@
 import datetime
 import enum
 # Make sure Boolean is imported if you use it
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, Text, JSON
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum, Text, JSON, Index, ForeignKey
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -69,29 +70,67 @@ class JobStatus(enum.Enum):
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
 
+# Large per-job values, stored in video_job_contents (see VideoJobContent) instead of the video_jobs row
+CONTENT_COLUMNS = ("transcript", "condensed_transcript", "topics", "editor_data")
+
+
+class VideoJobContent(Base):
+    """Large values of a job, one row per job (created on first write), so video_jobs only holds small hot columns."""
+    __tablename__ = "video_job_contents"
+
+    job_id = Column(Integer, ForeignKey("video_jobs.id", ondelete="CASCADE"), primary_key=True)
+    transcript = Column(Text, nullable=True) # Store the generated transcript
+    # Extractive summary of the transcript under the LLM token budget (see transcript_condenser); reset with the transcript
+    condensed_transcript = Column(Text, nullable=True)
+    topics = Column(JSON, nullable=True) # Store list of generated topics
+    editor_data = Column(JSON, nullable=True)
+
+    def __repr__(self):
+        return f"<VideoJobContent(job_id={self.job_id})>"
+
+
+def _content_proxy(name: str):
+    """VideoJob.<name> reads/writes VideoJob.content.<name>, creating the content row on first write."""
+    return association_proxy("content", name, creator=lambda value: VideoJobContent(**{name: value}))
+
+
 class VideoJob(Base):
     __tablename__ = "video_jobs"
+    __table_args__ = (
+        # Composite indexes backing keyset pagination of GET /jobs (ORDER BY created_at DESC, id DESC)
+        Index("ix_video_jobs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_video_jobs_source_type_created_at_id", "source_type", "created_at", "id"),
+        Index("ix_video_jobs_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    # Bumped by every DatabaseService update; pass expected_version to update only an unchanged row
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     source_type = Column(String, index=True) # e.g., "prompt", "youtube_url", "audio_file"
     source_value = Column(Text) # The actual prompt, URL, or file path
 
-    transcript = Column(Text, nullable=True) # Store the generated transcript
+    # Large values live in video_job_contents, so status queries only touch small rows. The relationship
+    # loads lazily in sync code; async code fetches it via DatabaseService.get_job(..., columns=...).
+    content = relationship(VideoJobContent, uselist=False, lazy="select", cascade="all, delete-orphan", passive_deletes=True)
+    transcript = _content_proxy("transcript")
+    condensed_transcript = _content_proxy("condensed_transcript")
     # --- ADD THIS COLUMN BACK ---
     transcript_fetched = Column(Boolean, default=False, nullable=False) # Flag if transcript step is done
 
     status = Column(Enum(JobStatus), default=JobStatus.PENDING, index=True)
     status_message = Column(String, nullable=True) # Store error messages or progress info
+    # Stages done so far and what they handed on (see app/services/pipeline.py), so a rerun resumes after them
+    pipeline_state = Column(JSON, nullable=True)
 
     # --- ADD THESE COLUMNS BACK ---
     script_genre = Column(String, nullable=True) # Determined by LLM
-    topics = Column(JSON, nullable=True) # Store list of generated topics
+    topics = _content_proxy("topics")
 
     # --- Fields for Phase 2 ---
-    editor_data = Column(JSON, nullable=True)
+    editor_data = _content_proxy("editor_data")
     selected_music = Column(String, nullable=True) # Path or identifier for chosen music
 
     # --- Fields for Phase 3 ---
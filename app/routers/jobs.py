@@ -1,8 +1,13 @@
+import asyncio
+import base64
+import json
 import logging
+from datetime import datetime
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     status,
     UploadFile,
     File,
@@ -10,13 +15,22 @@ from fastapi import (
     Request, # Import Request
     BackgroundTasks # Import BackgroundTasks if needed for simple tasks
 )
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Union
+from pydantic import ValidationError
 
-from app.database import get_db
+from app.core.config import settings
+from app.core.exceptions import StaleJobVersionError, UploadTooLargeError
+from app.database import get_db, AsyncSessionLocal
 from app.services.database_service import DatabaseService
 from app.services.input_handler import InputHandler
 from app.services.llm_service import LLMService # For triggering topic task
+from app.services.transcript_cache import transcript_cache
+from app.services.llm_cache import llm_cache
+from app.services.job_events import job_event_hub, publish_job_event
+from app.services.pipeline import job_payload, pipeline_running, pipeline_signature, remaining_steps, stage_names, step_label
 from app.schemas import job as job_schemas # Use alias to avoid name conflicts
 from app.models.video_job import JobStatus # Import enum
 
@@ -25,6 +39,9 @@ logger = logging.getLogger(__name__)
 # Define router
 router = APIRouter()
 
+# PENDING counts as running: its canvas may be queued and not picked up yet
+RUNNING_STATUSES = (JobStatus.PENDING, JobStatus.PROCESSING, JobStatus.RENDERING, JobStatus.UPLOADING)
+
 # Instantiate services (dependency injection could be used later if needed)
 # These could also be dependencies if they had state or complex setup
 input_handler = InputHandler()
@@ -85,6 +102,8 @@ async def create_new_job(
             status=job.status
         )
 
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except (ValueError, IOError) as e: # Catch specific errors from input handler
          logger.error(f"Input processing error: {e}", exc_info=True)
          # Rollback is handled by get_db dependency wrapper
@@ -95,57 +114,307 @@ async def create_new_job(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error processing job request.")
 
 
+@router.post("/jobs/audio",
+             response_model=job_schemas.JobSubmissionResponse,
+             status_code=status.HTTP_202_ACCEPTED,
+             summary="Submit an audio_file job with the audio as the raw request body")
+async def create_audio_job(
+    request: Request,
+    filename: Optional[str] = Query(None, description="Original file name; its extension is kept (e.g. episode.mp3)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Streaming alternative to the multipart `audio_file` upload of POST /jobs, for large files:
+    send the audio bytes as the body (any Content-Type, e.g. `curl --data-binary @episode.mp3`).
+    The body is written straight to disk without blocking the server, bodies over the size limit
+    are rejected with 413 (from Content-Length when given), and audio that was transcribed before
+    is answered from the transcript cache.
+    """
+    content_length = request.headers.get("content-length")
+    declared_size = int(content_length) if content_length and content_length.isdigit() else None
+    logger.info(f"Received streamed audio upload {filename!r} ({declared_size} bytes declared)")
+    try:
+        job = await input_handler.process_audio_stream(db, request.stream(), filename, declared_size)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ClientDisconnect:
+        logger.warning(f"Client disconnected during audio upload {filename!r}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload incomplete: client disconnected.")
+    except OSError as e:
+        logger.error(f"Failed to store streamed upload {filename!r}: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not store the uploaded file.")
+    return job_schemas.JobSubmissionResponse(job_id=job.id, status=job.status)
+
+
+def _encode_cursor(job) -> str:
+    raw = json.dumps([job.created_at.isoformat(), job.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(job_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
+
+@router.get("/jobs",
+            response_model=job_schemas.JobListResponse,
+            summary="List jobs, newest first (cursor-paginated)")
+async def list_jobs(
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    source_type: Optional[str] = Query(None),
+    created_after: Optional[datetime] = Query(None, description="Only jobs created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only jobs created before this time"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Lists jobs filtered by status, source type and creation time range.
+    Uses keyset pagination: follow `next_cursor` instead of an offset, so every page
+    costs the same regardless of how many jobs come before it.
+    """
+    jobs = await db_service.list_jobs(
+        db,
+        limit=limit + 1, # One extra row tells us whether there is a next page
+        status=status_filter,
+        source_type=source_type,
+        created_after=created_after,
+        created_before=created_before,
+        after=_decode_cursor(cursor) if cursor else None,
+    )
+    page = jobs[:limit]
+    return job_schemas.JobListResponse(
+        items=[job_schemas.JobSummary.model_validate(job) for job in page],
+        next_cursor=_encode_cursor(page[-1]) if len(jobs) > limit else None,
+    )
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    """Parses a JSON array or NDJSON (one spec per line) request body into a list of raw items."""
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = []
+        for line_no, line in enumerate(body.decode("utf-8").splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON on line {line_no}: {e}")
+        return items
+    try:
+        items = json.loads(body or b"[]")
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON body: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array of job specs.")
+    return items
+
+
+@router.post("/jobs/bulk",
+             response_model=job_schemas.BulkJobSubmissionResponse,
+             status_code=status.HTTP_202_ACCEPTED,
+             summary="Submit many prompt/YouTube jobs in one request")
+async def create_jobs_bulk(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Accepts a JSON array (or NDJSON, with Content-Type application/x-ndjson) of job specs:
+
+    - `{"source_type": "prompt", "prompt_text": "..."}`
+    - `{"source_type": "youtube_url", "youtube_url": "https://..."}`
+
+    Valid specs are inserted together and their follow-up tasks enqueued as one group.
+    Each result carries the index of its spec; invalid specs get an `error` instead of a job_id.
+    Audio uploads are not supported here, use POST /jobs.
+    """
+    items = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > settings.BULK_JOB_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"At most {settings.BULK_JOB_MAX_ITEMS} job specs per request.")
+    logger.info(f"Received bulk job request with {len(items)} specs.")
+
+    results: List[job_schemas.BulkJobItemResult] = []
+    valid_indexes, specs = [], []
+    for index, item in enumerate(items):
+        try:
+            spec = job_schemas.JobCreate.model_validate(item)
+        except ValidationError as e:
+            results.append(job_schemas.BulkJobItemResult(index=index, error=f"Invalid job spec: {e.errors()[0]['msg']}"))
+            continue
+        if spec.source_type == "prompt" and spec.prompt_text:
+            specs.append((spec.source_type, spec.prompt_text))
+        elif spec.source_type == "youtube_url" and spec.youtube_url:
+            specs.append((spec.source_type, spec.youtube_url))
+        elif spec.source_type in ("prompt", "youtube_url"):
+            field = "prompt_text" if spec.source_type == "prompt" else "youtube_url"
+            results.append(job_schemas.BulkJobItemResult(index=index, error=f"{field} is required for source_type '{spec.source_type}'"))
+            continue
+        else:
+            results.append(job_schemas.BulkJobItemResult(index=index, error=f"Unsupported source_type for bulk submission: {spec.source_type}"))
+            continue
+        valid_indexes.append(index)
+
+    try:
+        created = await input_handler.process_bulk_jobs(db, specs)
+    except Exception as e:
+        logger.error(f"Unexpected error creating bulk jobs: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error processing bulk job request.")
+
+    results.extend(
+        job_schemas.BulkJobItemResult(index=index, job_id=job_id, status=job_status)
+        for index, (job_id, job_status) in zip(valid_indexes, created)
+    )
+    results.sort(key=lambda r: r.index)
+    return job_schemas.BulkJobSubmissionResponse(
+        submitted=len(created),
+        failed=len(items) - len(created),
+        results=results,
+    )
+
+
+# Optional parts of the status response (job_id and status are always returned)
+STATUS_OPTIONAL_FIELDS = ("status_message", "transcript", "topics", "pipeline_running")
+
+
+def _parse_fields(fields: Optional[str], allowed) -> Optional[List[str]]:
+    """Parses a comma-separated `fields` query param, rejecting names outside `allowed`."""
+    if fields is None:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}")
+    return requested
+
+
 @router.get("/jobs/{job_id}/status",
             response_model=job_schemas.JobStatusResponse,
+            response_model_exclude_unset=True,
             summary="Get the status and basic details of a job")
-async def get_job_status(job_id: int, db: AsyncSession = Depends(get_db)):
+async def get_job_status(
+    job_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of: status_message, transcript, topics, pipeline_running. "
+                                                    "Omit for all. Pollers should use fields=status_message."),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Retrieves the current status, status message, and potentially
     the transcript or topics if available for a given job ID.
     """
     logger.debug(f"Fetching status for job_id: {job_id}")
-    job = await db_service.get_job(db, job_id)
+    requested = _parse_fields(fields, STATUS_OPTIONAL_FIELDS)
+    if requested is None:
+        requested = list(STATUS_OPTIONAL_FIELDS)
+    columns = ["status", *(f for f in requested if f != "pipeline_running")]
+    if "transcript" in requested:
+        columns.append("transcript_fetched")
+    if "pipeline_running" in requested:
+        columns.append("pipeline_state")
+    job = await db_service.get_job(db, job_id, columns=columns)
     if not job:
         logger.warning(f"Job status request for non-existent job_id: {job_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with ID {job_id} not found.")
 
-    # Prepare topics list if available
-    topics_list = job.topics if isinstance(job.topics, list) else None
+    response = {"job_id": job.id, "status": job.status}
+    if "status_message" in requested:
+        response["status_message"] = job.status_message
+    if "transcript" in requested:
+        response["transcript"] = job.transcript if job.transcript_fetched else None # Only show if fetched
+    if "topics" in requested:
+        # Prepare topics list if available
+        response["topics"] = job.topics if isinstance(job.topics, list) else None
+    if "pipeline_running" in requested:
+        response["pipeline_running"] = pipeline_running(job.pipeline_state)
+    return job_schemas.JobStatusResponse(**response)
+
+
+def _sse(event: dict) -> str:
+    return f"event: status\ndata: {json.dumps(event)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events",
+            summary="Stream status transitions of a job (Server-Sent Events)")
+async def stream_job_events(job_id: int, request: Request):
+    """
+    Server-Sent Events stream of a job's status. The current status is sent first,
+    then every transition published by the workers, until the client disconnects.
+    Replaces polling GET /jobs/{job_id}/status: one DB query per stream instead of per poll.
+    """
+    # Subscribe before reading the current state so no transition can slip in between
+    queue = await job_event_hub.subscribe(job_id)
+    try:
+        async with AsyncSessionLocal() as db: # Not Depends(get_db): don't hold a session for the stream's lifetime
+            job = await db_service.get_job(db, job_id, columns=["status", "status_message"])
+            current = {"job_id": job_id, "status": job.status.value, "status_message": job.status_message} if job else None
+    except Exception:
+        job_event_hub.unsubscribe(job_id, queue)
+        raise
+    if current is None:
+        job_event_hub.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with ID {job_id} not found.")
+
+    async def event_stream():
+        try:
+            yield _sse(current)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.JOB_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n" # Comment line keeps proxies from closing the stream
+                    continue
+                yield _sse(event)
+        finally:
+            job_event_hub.unsubscribe(job_id, queue)
 
-    return job_schemas.JobStatusResponse(
-        job_id=job.id,
-        status=job.status,
-        status_message=job.status_message,
-        transcript=job.transcript if job.transcript_fetched else None, # Only show if fetched
-        topics=topics_list
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/jobs/{job_id}",
-            response_model=job_schemas.Job, # Returns the full job details
+            response_model=job_schemas.JobPartial, # Full job details unless fields= narrows it
+            response_model_exclude_unset=True,
             summary="Get full details of a specific job")
-async def get_job_details(job_id: int, db: AsyncSession = Depends(get_db)):
+async def get_job_details(
+    job_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated list of job fields to return. Omit for all."),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Retrieves all details for a specific job ID.
+    Retrieves all details for a specific job ID, or only the requested `fields`.
+    Only the requested columns are read from the database.
     """
-    logger.debug(f"Fetching full details for job_id: {job_id}")
-    job = await db_service.get_job(db, job_id)
+    logger.debug(f"Fetching details for job_id: {job_id} (fields={fields})")
+    requested = _parse_fields(fields, job_schemas.JobPartial.model_fields.keys())
+    job = await db_service.get_job(db, job_id, columns=requested)
     if not job:
         logger.warning(f"Full details request for non-existent job_id: {job_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with ID {job_id} not found.")
 
-    # Pydantic's from_attributes will handle the conversion
-    return job
+    if requested is None:
+        # Pydantic's from_attributes will handle the conversion
+        return job
+    return job_schemas.JobPartial(**{f: getattr(job, f) for f in requested})
 
 
 @router.post("/jobs/{job_id}/generate_topics",
              response_model=job_schemas.JobStatusResponse, # Return current status after triggering
              status_code=status.HTTP_202_ACCEPTED,
              summary="Trigger topic generation for a job")
-async def trigger_topic_generation(job_id: int, db: AsyncSession = Depends(get_db)):
+async def trigger_topic_generation(
+    job_id: int,
+    single_call: Optional[bool] = Query(None, description="Determine genre and topics in one structured LLM call (default from settings)"),
+    force: bool = Query(False, description="Trigger even though the job or its pipeline looks running (e.g. its worker died)"),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Triggers the background task to generate topics for a job
-    that has a completed transcript.
+    that has a completed transcript. 409 while the job, or the pipeline that generates its topics, is still running.
     """
     logger.info(f"Received request to generate topics for job_id: {job_id}")
     job = await db_service.get_job(db, job_id)
@@ -157,7 +426,11 @@ async def trigger_topic_generation(job_id: int, db: AsyncSession = Depends(get_d
     if not job.transcript or not job.transcript_fetched:
          logger.warning(f"Attempted topic generation for job {job_id} without transcript.")
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Transcript is not ready for this job.")
-    if job.status not in [JobStatus.COMPLETED, JobStatus.EDITING]: # Allow triggering if transcript is ready (COMPLETED after transcription)
+    if (job.status in RUNNING_STATUSES or pipeline_running(job.pipeline_state)) and not force:
+        logger.warning(f"Topic generation request for job {job_id} while it is still running ({job.status.value}).")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Job is still running (status {job.status.value}); its pipeline generates the topics. Pass force=true if it is stuck.")
+    if job.status not in [JobStatus.COMPLETED, JobStatus.EDITING] and not force: # Allow triggering if transcript is ready (COMPLETED after transcription)
         logger.warning(f"Attempted topic generation for job {job_id} with invalid status: {job.status.value}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot generate topics when job status is {job.status.value}. Transcript must be ready.")
     if job.topics is not None: # Check if topics already exist (simple check)
@@ -171,24 +444,102 @@ async def trigger_topic_generation(job_id: int, db: AsyncSession = Depends(get_d
         # raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Topics have already been generated for this job.")
 
     try:
-        # Update status immediately to show topic generation is starting
-        updated_job = await db_service.update_job_status(db, job_id, JobStatus.PROCESSING, "Topic generation initiated...")
-        #await db.commit() # Commit this status update before triggering task
-
-        # Trigger the background task
-        LLMService.generate_topics_task.delay(job_id)
-        logger.info(f"Topic generation task triggered for job_id: {job_id}")
-
-        # Return the status reflecting that topic generation has started
-        return job_schemas.JobStatusResponse(
+        # Update status immediately to show topic generation is starting. Only if the job is still the
+        # version checked above: two concurrent requests must not both start a topics task
+        updated_job = await db_service.update_job_status(db, job_id, JobStatus.PROCESSING, "Topic generation initiated...",
+                                                         expected_version=job.version)
+        response = job_schemas.JobStatusResponse(
              job_id=updated_job.id,
              status=updated_job.status,
              status_message=updated_job.status_message,
-             transcript=updated_job.transcript, # Include transcript
+             transcript=job.transcript, # Include transcript (loaded above, not part of the UPDATE ... RETURNING)
              topics=None # Topics are not ready yet
          )
+        await db.commit() # Commit this status update before triggering task (expires the ORM objects)
+        publish_job_event(job_id, JobStatus.PROCESSING, "Topic generation initiated...")
+
+        # Trigger the background task
+        LLMService.generate_topics_task.delay(job_id, single_call)
+        logger.info(f"Topic generation task triggered for job_id: {job_id}")
+
+        # Return the status reflecting that topic generation has started
+        return response
 
+    except StaleJobVersionError as e:
+        logger.warning(f"Topic generation for job {job_id} not triggered: {e}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The job changed while topic generation was being triggered; check its status and retry.")
     except Exception as e:
         logger.error(f"Error triggering topic generation for job {job_id}: {e}", exc_info=True)
         # Rollback handled by get_db
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to trigger topic generation.")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to trigger topic generation.")
+
+
+@router.post("/jobs/{job_id}/pipeline",
+             response_model=job_schemas.PipelineResponse,
+             status_code=status.HTTP_202_ACCEPTED,
+             summary="Resume a job's pipeline from its last completed stage")
+async def resume_pipeline(
+    job_id: int,
+    force: bool = Query(False, description="Resume even though the job looks queued or running (e.g. its worker died mid-stage)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Re-runs the stages of a failed or interrupted job that haven't completed yet, as one Celery canvas.
+    Completed stages are skipped, unless what a later stage needs is gone (a failed transcription
+    deletes the audio, so the job is downloaded again). Nothing is enqueued when every stage is done.
+    """
+    logger.info(f"Received pipeline resume request for job_id: {job_id}")
+    job = await db_service.get_job(db, job_id, columns=["source_type", "source_value", "status", "status_message",
+                                                        "transcript", "topics", "pipeline_state", "version"])
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with ID {job_id} not found.")
+    # A canvas between stages can leave the job COMPLETED for a moment; its saved state still has steps left
+    if (job.status in RUNNING_STATUSES or pipeline_running(job.pipeline_state)) and not force:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Job is still running (status {job.status.value}); pass force=true if it is stuck.")
+
+    try:
+        payload = job_payload(job)
+        steps = remaining_steps(payload)
+        if not steps:
+            return job_schemas.PipelineResponse(job_id=job_id, status=job.status, status_message=job.status_message,
+                                                completed=list(payload.get("completed") or ()), remaining=[])
+        rerun = {name for step in steps for name in stage_names(step)}
+        workflow = pipeline_signature(payload)
+        message = f"Pipeline resumed at stage {step_label(steps[0])}..."
+        completed = [name for name in payload.get("completed") or () if name not in rerun]
+        # Versioned: of two concurrent resumes (or a resume racing a worker's status write) only one enqueues a canvas.
+        # The state is saved without the failure, so the job counts as running until the canvas is done.
+        updated_job = await db_service.update_job(db, job_id, {
+            "status": JobStatus.PROCESSING, "status_message": message, "pipeline_state": {**payload, "completed": completed},
+        }, expected_version=job.version)
+        response = job_schemas.PipelineResponse(
+            job_id=job_id, status=updated_job.status, status_message=message,
+            completed=completed, remaining=[step_label(step) for step in steps],
+        )
+        await db.commit() # The stages read the job
+        publish_job_event(job_id, JobStatus.PROCESSING, message)
+        workflow.apply_async()
+        logger.info(f"Pipeline for job {job_id} resumed: {' -> '.join(response.remaining)}")
+        return response
+    except StaleJobVersionError as e:
+        logger.warning(f"Pipeline for job {job_id} not resumed: {e}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The job changed while the pipeline was being resumed; check its status and retry.")
+    except Exception as e:
+        logger.error(f"Error resuming pipeline for job {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to resume the pipeline.")
+
+
+@router.get("/cache/stats",
+            summary="Get hit/miss counters for the shared caches")
+async def get_cache_stats():
+    """
+    Returns the counters of the caches shared by the API and the workers.
+    Caches disabled in settings are reported as null.
+    """
+    async def stats(cache):
+        # Blocking sqlite3 (and, on first use, the WAL/table setup): off the event loop
+        return await asyncio.to_thread(cache.stats) if cache else None
+
+    transcripts, llm_responses = await asyncio.gather(stats(transcript_cache), stats(llm_cache))
+    return {"transcripts": transcripts, "llm_responses": llm_responses}
@@ -0,0 +1,42 @@
+import logging
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import SearchUnavailableError
+from app.database import get_db
+from app.schemas import job as job_schemas
+from app.services.search_service import SearchService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+search_service = SearchService()
+
+
+@router.get("/search",
+            response_model=job_schemas.SearchResponse,
+            summary="Full-text search over job transcripts, topics and genre")
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=500, description='Words must all match; use "quotes" for phrases and a trailing * for prefixes.'),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Finds jobs by what was said in them. Results are ranked by BM25 on SQLite (FTS5)
+    and by ts_rank_cd on Postgres, each with a highlighted snippet of the best match.
+    """
+    try:
+        hits = await search_service.search(db, q, limit=limit + 1, offset=offset) # One extra row tells us if there's a next page
+    except SearchUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    has_more = len(hits) > limit
+    return job_schemas.SearchResponse(
+        query=q,
+        items=[job_schemas.SearchHit(**asdict(hit)) for hit in hits[:limit]],
+        next_offset=offset + limit if has_more else None,
+    )
@@ -1 +1 @@
-from .job import Job, JobCreate, JobBase, JobStatusResponse, JobSubmissionResponse
+from .job import Job, JobCreate, JobBase, JobPartial, JobStatusResponse, JobSubmissionResponse, JobSummary, JobListResponse, BulkJobItemResult, BulkJobSubmissionResponse
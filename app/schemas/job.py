@@ -36,6 +36,24 @@ class Job(JobBase):
     class Config:
         from_attributes = True # Pydantic V2 way to enable ORM mode
 
+# --- Schema for Sparse Job Responses (GET /jobs/{id}?fields=...) ---
+# Same fields as Job, all optional; the router excludes the ones that weren't requested.
+class JobPartial(BaseModel):
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    source_type: Optional[str] = None
+    source_value: Optional[str] = None
+    status: Optional[JobStatus] = None
+    status_message: Optional[str] = None
+    transcript: Optional[str] = None
+    transcript_fetched: Optional[bool] = None
+    script_genre: Optional[str] = None
+    topics: Optional[List[str]] = None
+
+    class Config:
+        from_attributes = True
+
 # --- Schema for Basic Job Status Response ---
 class JobStatusResponse(BaseModel):
     job_id: int
@@ -44,9 +62,64 @@ class JobStatusResponse(BaseModel):
     # Optionally include transcript/topics if available at this status check
     transcript: Optional[str] = None
     topics: Optional[List[str]] = None
+    pipeline_running: Optional[bool] = None # True while the job's pipeline still has stages to run (topics not written yet)
 
 # --- Schema for Job Submission Response ---
 class JobSubmissionResponse(BaseModel):
     message: str = "Job submitted successfully"
     job_id: int
-    status: JobStatus
\ No newline at end of file
+    status: JobStatus
+# --- Schemas for Job Listing (GET /jobs) ---
+class JobSummary(BaseModel):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    source_type: str
+    status: JobStatus
+    status_message: Optional[str] = None
+    transcript_fetched: bool = False
+    script_genre: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class JobListResponse(BaseModel):
+    items: List[JobSummary]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page; null on the last page
+
+# --- Schemas for Bulk Job Submission ---
+class BulkJobItemResult(BaseModel):
+    index: int # Position of the spec in the submitted array
+    job_id: Optional[int] = None
+    status: Optional[JobStatus] = None
+    error: Optional[str] = None # Set when this item was rejected
+
+class BulkJobSubmissionResponse(BaseModel):
+    submitted: int
+    failed: int
+    results: List[BulkJobItemResult]
+
+# --- Schema for Pipeline Resume (POST /jobs/{id}/pipeline) ---
+class PipelineResponse(BaseModel):
+    job_id: int
+    status: JobStatus
+    status_message: Optional[str] = None
+    completed: List[str] # Stages already done, skipped by this run
+    remaining: List[str] # Steps this run executes, in order ("a+b": side by side); empty when nothing is left
+
+# --- Schemas for Full-Text Search (GET /search) ---
+class SearchHit(BaseModel):
+    job_id: int
+    status: JobStatus
+    script_genre: Optional[str] = None
+    created_at: Optional[datetime] = None
+    score: float # Higher is better; only comparable within one response
+    snippet: Optional[str] = None # Best matching fragment, matches wrapped in <mark></mark>
+
+    class Config:
+        from_attributes = True
+
+class SearchResponse(BaseModel):
+    query: str
+    items: List[SearchHit]
+    next_offset: Optional[int] = None # Pass as ?offset= for the next page; null on the last page
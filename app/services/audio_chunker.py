@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import re
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+_WORD_STRIP_RE = re.compile(r"[^\w']+")
+
+
+class AudioChunkingError(RuntimeError):
+    """Raised when ffmpeg/ffprobe fail while preparing audio chunks."""
+
+
+async def _run(*cmd: str) -> Tuple[bytes, bytes]:
+    """Runs a subprocess without blocking the event loop and returns (stdout, stderr)."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await proc.communicate()
+    except BaseException: # Cancelled (e.g. a sibling chunk failed): don't leave ffmpeg running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise AudioChunkingError(f"{cmd[0]} exited with {proc.returncode}: {stderr.decode(errors='ignore')[-500:]}")
+    return stdout, stderr
+
+
+async def probe_duration(path: Path) -> float:
+    """Returns the duration of an audio file in seconds using ffprobe."""
+    stdout, _ = await _run(
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(path),
+    )
+    try:
+        return float(stdout.strip())
+    except ValueError:
+        raise AudioChunkingError(f"Could not read duration of {path}: {stdout!r}")
+
+
+async def detect_silences(path: Path, noise_db: float = -35.0, min_silence: float = 0.4) -> List[Tuple[float, float]]:
+    """Returns (start, end) pairs of silent stretches found by ffmpeg's silencedetect filter."""
+    _, stderr = await _run(
+        "ffmpeg", "-hide_banner", "-nostats", "-i", str(path),
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-",
+    )
+    silences: List[Tuple[float, float]] = []
+    start: Optional[float] = None
+    for line in stderr.decode(errors="ignore").splitlines():
+        if (m := _SILENCE_START_RE.search(line)):
+            start = max(0.0, float(m.group(1)))
+        elif (m := _SILENCE_END_RE.search(line)) and start is not None:
+            silences.append((start, float(m.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(
+    duration: float,
+    silences: Sequence[Tuple[float, float]],
+    max_chunk_seconds: float,
+    overlap_seconds: float = 1.0,
+    min_chunk_seconds: Optional[float] = None,
+) -> List[Tuple[float, float]]:
+    """
+    Splits [0, duration] into segments no longer than max_chunk_seconds.
+    Each cut is placed at the middle of the latest silence that keeps the segment in bounds
+    (and at least min_chunk_seconds long). When no silence is available we cut hard and
+    overlap the next segment by overlap_seconds so a word split at the boundary is still
+    heard whole by one of the two requests.
+    """
+    if duration <= max_chunk_seconds:
+        return [(0.0, duration)]
+    if min_chunk_seconds is None:
+        min_chunk_seconds = max_chunk_seconds / 2
+
+    midpoints = sorted((s + e) / 2 for s, e in silences)
+    chunks: List[Tuple[float, float]] = []
+    start = 0.0
+    while duration - start > max_chunk_seconds:
+        limit = start + max_chunk_seconds
+        cut = None
+        for mid in midpoints:
+            if mid > limit:
+                break
+            if mid - start >= min_chunk_seconds:
+                cut = mid # Keep the latest silence within bounds
+        if cut is not None:
+            chunks.append((start, cut))
+            start = cut
+        else:
+            chunks.append((start, limit))
+            start = max(limit - overlap_seconds, start + 1.0)
+    chunks.append((start, duration))
+    return chunks
+
+
+# Compact mono encodings Whisper accepts: codec name -> (file suffix, ffmpeg encoder args)
+ENCODERS = {
+    "mp3": (".mp3", ["-c:a", "libmp3lame"]),
+    "opus": (".ogg", ["-c:a", "libopus", "-application", "voip"]), # Tuned for speech
+}
+
+
+async def export_chunk(src: Path, start: float, end: float, dst: Path, bitrate: str = "64k", codec: str = "mp3") -> Path:
+    """Cuts [start, end) out of src into a compact mono 16 kHz file at dst (codec from ENCODERS)."""
+    await _run(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", str(src),
+        "-vn", "-ac", "1", "-ar", "16000", *ENCODERS[codec][1], "-b:a", bitrate, str(dst),
+    )
+    return dst
+
+
+def _normalize_words(words: Sequence[str]) -> List[str]:
+    return [_WORD_STRIP_RE.sub("", w).lower() for w in words]
+
+
+def merge_overlap(left: str, right: str, max_overlap_words: int = 30, min_overlap_words: int = 3) -> str:
+    """
+    Joins two consecutive transcripts, dropping the words at the start of `right` that repeat
+    the end of `left` (the audio overlap). Tolerates one mismatch per five words because Whisper
+    rarely transcribes a cut word identically on both sides.
+    """
+    left_words, right_words = left.split(), right.split()
+    if not left_words or not right_words:
+        return " ".join(left_words + right_words)
+
+    left_norm = _normalize_words(left_words[-max_overlap_words:])
+    right_norm = _normalize_words(right_words[:max_overlap_words])
+    for k in range(min(len(left_norm), len(right_norm)), min_overlap_words - 1, -1):
+        mismatches = sum(a != b for a, b in zip(left_norm[-k:], right_norm[:k]))
+        if mismatches <= k // 5:
+            right_words = right_words[k:]
+            break
+    return " ".join(left_words + right_words)
+
+
+def stitch_transcripts(
+    texts: Sequence[str],
+    overlapped: Optional[Sequence[bool]] = None,
+    max_overlap_words: int = 30,
+) -> str:
+    """
+    Stitches per-chunk transcripts (in order) into one transcript.
+    overlapped[i] tells whether chunk i overlaps the audio of chunk i-1; only those joins are de-duplicated.
+    """
+    result = ""
+    for i, text in enumerate(texts):
+        text = (text or "").strip()
+        if not text:
+            continue
+        if not result:
+            result = text
+        elif overlapped is None or overlapped[i]:
+            result = merge_overlap(result, text, max_overlap_words)
+        else:
+            result = f"{result} {text}"
+    return result
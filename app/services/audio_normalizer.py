@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+import numpy as np
+
+from app.celery_app import celery, AsyncTask
+from app.core.config import settings
+from app.models.video_job import JobStatus
+from app.services.audio_chunker import ENCODERS
+from app.services.status_coalescer import get_status_coalescer
+from app.services.transcript_cache import transcript_cache
+from app.services.transcription_service import TranscriptionService, WHISPER_MODEL, WHISPER_RESPONSE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000 # What Whisper resamples to anyway
+SAMPLE_BYTES = 2 # s16le
+FRAME_MS = 20 # VAD frame
+READ_BYTES = SAMPLE_RATE * SAMPLE_BYTES * 2 # ~2s of PCM per read from the decoder
+
+
+class AudioNormalizationError(RuntimeError):
+    """Raised when ffmpeg fails or the audio has no speech left to transcribe."""
+
+
+@dataclass
+class NormalizedAudio:
+    path: Path
+    input_bytes: int
+    output_bytes: int
+    input_seconds: float # Decoded duration
+    output_seconds: float # After silence trimming
+    seconds: float # Wall time
+
+
+class SilenceTrimmer:
+    """
+    Energy VAD over mono s16le PCM, fed in blocks of any size; memory stays bounded by max_pause_seconds.
+    Frames whose RMS is below threshold_db are silence. Leading and trailing silence is cut down to
+    pad_seconds, and pauses inside the audio to max_pause_seconds (keeping their start and end),
+    since the plain-text transcript carries no timing and long silences only cost upload bytes.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        threshold_db: float = -45.0,
+        pad_seconds: float = 0.3,
+        max_pause_seconds: float = 5.0,
+        frame_ms: int = FRAME_MS,
+    ):
+        self.frame = sample_rate * frame_ms // 1000
+        self._threshold = (32768.0 * 10 ** (threshold_db / 20)) ** 2 # Mean square of a frame at threshold_db
+        self._pad = int(pad_seconds * sample_rate)
+        self._max_pause = max(int(max_pause_seconds * sample_rate), 2 * self._pad)
+        self._carry = np.empty(0, dtype=np.int16) # Samples short of a whole frame
+        self._pending = np.empty(0, dtype=np.int16) # Silence since the last speech (or the start)
+        self._speech_seen = False
+        self.input_samples = 0
+        self.output_samples = 0
+
+    def _emit(self, out: List[bytes], samples: np.ndarray) -> None:
+        if samples.size:
+            out.append(samples.tobytes())
+            self.output_samples += samples.size
+
+    def _hold(self, silence: np.ndarray) -> None:
+        pending = np.concatenate((self._pending, silence))
+        if not self._speech_seen:
+            pending = pending[-self._pad:] if self._pad else pending[:0] # Leading: only the pad before the first speech
+        elif pending.size > self._max_pause: # Keep the start and end of the pause, drop its middle
+            pending = np.concatenate((pending[:self._max_pause - self._pad], pending[pending.size - self._pad:]))
+        self._pending = pending
+
+    def feed(self, pcm: bytes) -> List[bytes]:
+        """Takes whole s16le samples; returns the PCM blocks to keep, in order."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        self.input_samples += samples.size
+        if self._carry.size:
+            samples = np.concatenate((self._carry, samples))
+        n_frames = samples.size // self.frame
+        self._carry = samples[n_frames * self.frame:].copy()
+        out: List[bytes] = []
+        if not n_frames:
+            return out
+
+        frames = samples[:n_frames * self.frame].reshape(n_frames, self.frame).astype(np.float32)
+        voiced = np.einsum("ij,ij->i", frames, frames) / self.frame > self._threshold
+        # Walk runs of equal frames instead of single frames
+        edges = np.flatnonzero(voiced[1:] != voiced[:-1]) + 1
+        starts = np.concatenate(([0], edges))
+        ends = np.concatenate((edges, [n_frames]))
+        for start, end in zip(starts, ends):
+            run = samples[start * self.frame:end * self.frame]
+            if voiced[start]:
+                self._emit(out, self._pending)
+                self._pending = self._pending[:0]
+                self._speech_seen = True
+                self._emit(out, run)
+            else:
+                self._hold(run)
+        return out
+
+    def finish(self) -> List[bytes]:
+        """Flushes the end of the stream: trailing silence is cut down to the pad."""
+        out: List[bytes] = []
+        if self._carry.size:
+            self._hold(self._carry)
+            self._carry = self._carry[:0]
+        if self._speech_seen:
+            self._emit(out, self._pending[:self._pad])
+        self._pending = self._pending[:0]
+        return out
+
+
+def _encoder_command(dst: Path, codec: str, bitrate: str) -> List[str]:
+    """ffmpeg reading 16 kHz mono s16le PCM on stdin and encoding it to dst."""
+    return [
+        "ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error", "-y",
+        "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "-",
+        *ENCODERS[codec][1], "-b:a", bitrate, str(dst),
+    ]
+
+
+async def start_decoder(*input_args: str) -> asyncio.subprocess.Process:
+    """ffmpeg decoding input_args (input options, then -i and a path or URL) to 16 kHz mono s16le on stdout."""
+    return await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error", *input_args,
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-",
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+
+
+async def pcm_blocks(stream: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    """Yields a decoder's output in blocks of about READ_BYTES, each holding whole samples."""
+    carry = b""
+    while block := await stream.read(READ_BYTES):
+        if carry:
+            block = carry + block
+        carry = block[len(block) - len(block) % SAMPLE_BYTES:] # A read can end mid-sample
+        if len(block) > len(carry):
+            yield block[:len(block) - len(carry)]
+
+
+async def wait_process(proc: asyncio.subprocess.Process, stderr: "asyncio.Future[bytes]", what: str) -> None:
+    """Waits for an ffmpeg process whose stderr is being drained by the stderr future; raises on failure."""
+    error = await stderr
+    if await proc.wait() != 0:
+        raise AudioNormalizationError(f"ffmpeg could not {what}: {error.decode(errors='ignore')[-500:]}")
+
+
+async def kill_process(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        proc.kill()
+        await proc.wait()
+
+
+async def encode_pcm(pcm: bytes, dst: Path, codec: str = "opus", bitrate: str = "24k") -> Path:
+    """Encodes a block of 16 kHz mono s16le PCM (e.g. one transcription chunk) into dst."""
+    proc = await asyncio.create_subprocess_exec(
+        *_encoder_command(dst, codec, bitrate), stdin=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate(pcm)
+    if proc.returncode != 0:
+        dst.unlink(missing_ok=True)
+        raise AudioNormalizationError(f"ffmpeg could not encode {dst.name}: {stderr.decode(errors='ignore')[-500:]}")
+    return dst
+
+
+async def normalize_file(
+    src: Path,
+    dst: Path,
+    codec: str = "opus",
+    bitrate: str = "24k",
+    trimmer: Optional[SilenceTrimmer] = None,
+) -> NormalizedAudio:
+    """
+    Streams src through ffmpeg as 16 kHz mono PCM, optionally through trimmer, and into a second
+    ffmpeg that encodes dst with codec/bitrate. Only one read block (plus what the trimmer holds)
+    is in memory at a time, whatever the length of the audio; writes wait for the encoder to drain.
+    """
+    started = time.perf_counter()
+    decoder = await start_decoder("-i", str(src))
+    encoder = await asyncio.create_subprocess_exec(
+        *_encoder_command(dst, codec, bitrate), stdin=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    # Drained all along: a full stderr pipe would stall ffmpeg
+    decoder_stderr = asyncio.ensure_future(decoder.stderr.read())
+    encoder_stderr = asyncio.ensure_future(encoder.stderr.read())
+    input_samples = output_samples = 0
+    try:
+        async for block in pcm_blocks(decoder.stdout):
+            input_samples += len(block) // SAMPLE_BYTES
+            for piece in (trimmer.feed(block) if trimmer else [block]):
+                output_samples += len(piece) // SAMPLE_BYTES
+                encoder.stdin.write(piece)
+                await encoder.stdin.drain() # Backpressure: never run ahead of the encoder
+        for piece in (trimmer.finish() if trimmer else []):
+            output_samples += len(piece) // SAMPLE_BYTES
+            encoder.stdin.write(piece)
+        await encoder.stdin.drain()
+        encoder.stdin.close()
+        await wait_process(decoder, decoder_stderr, f"decode {src.name}")
+        await wait_process(encoder, encoder_stderr, f"encode {dst.name}")
+        if not output_samples:
+            raise AudioNormalizationError(f"No speech found in {src.name}")
+    except BaseException:
+        for proc in (decoder, encoder):
+            await kill_process(proc)
+        for stderr in (decoder_stderr, encoder_stderr):
+            stderr.cancel()
+        dst.unlink(missing_ok=True)
+        raise
+
+    result = NormalizedAudio(
+        path=dst,
+        input_bytes=src.stat().st_size,
+        output_bytes=dst.stat().st_size,
+        input_seconds=input_samples / SAMPLE_RATE,
+        output_seconds=output_samples / SAMPLE_RATE,
+        seconds=time.perf_counter() - started,
+    )
+    logger.info(
+        f"Normalized {src.name}: {result.input_bytes / 2**20:.1f}MB -> {result.output_bytes / 2**20:.1f}MB, "
+        f"{result.input_seconds:.0f}s -> {result.output_seconds:.0f}s of audio in {result.seconds:.1f}s"
+    )
+    return result
+
+
+def build_trimmer() -> Optional[SilenceTrimmer]:
+    if not settings.AUDIO_TRIM_SILENCE:
+        return None
+    return SilenceTrimmer(
+        threshold_db=settings.AUDIO_SILENCE_THRESHOLD_DB,
+        pad_seconds=settings.AUDIO_SILENCE_PAD_SECONDS,
+        max_pause_seconds=settings.AUDIO_MAX_PAUSE_SECONDS,
+    )
+
+
+def enqueue_transcription(job_id: int, audio_file_path: str, cache_aliases: Optional[List[str]] = None, content_key: Optional[str] = None) -> None:
+    """Hands a downloaded/uploaded file on to transcription, through the normalization stage when it is enabled."""
+    if settings.AUDIO_NORMALIZE_ENABLED:
+        AudioNormalizer.normalize_audio_task.delay(job_id, audio_file_path, cache_aliases, content_key)
+    else:
+        TranscriptionService.transcribe_audio_task.delay(job_id, audio_file_path, cache_aliases, content_key)
+
+
+class AudioNormalizer:
+    """Shrinks audio to what Whisper needs before it is uploaded for transcription."""
+
+    @staticmethod
+    @celery.task(name="tasks.normalize_audio", bind=True, base=AsyncTask)
+    async def normalize_audio_task(
+        self, job_id: int, audio_file_path_str: str, cache_aliases: Optional[List[str]] = None, content_key: Optional[str] = None, handoff: bool = True,
+    ):
+        """
+        Celery task: re-encodes the job's audio as compact 16 kHz mono (silence trimmed) and triggers
+        transcription of the result (unless handoff is False, see pipeline.py). The transcript cache
+        stays keyed by the original file's content, so cached audio skips the work here and a failure
+        falls back to transcribing the original.
+        """
+        logger.info(f"Starting audio normalization for job_id: {job_id}")
+        src = Path(audio_file_path_str)
+        transcribe_path = src
+        status_writer = get_status_coalescer()
+        try:
+            if transcript_cache and content_key is None:
+                # The key of the original audio, before normalization changes the bytes
+                content_key = await asyncio.to_thread(transcript_cache.key_for_file, src, WHISPER_MODEL, WHISPER_RESPONSE_FORMAT)
+            cached = transcript_cache and await asyncio.to_thread(transcript_cache.get_any, [content_key, *(cache_aliases or [])]) # SQLite I/O off the worker loop
+            if cached:
+                logger.info(f"Job {job_id}: transcript already cached, skipping normalization.")
+            else:
+                status_writer.submit(job_id, JobStatus.PROCESSING, "Preparing audio for transcription...") # Write-behind
+                dst = src.with_name(f"{src.stem}.normalized{ENCODERS[settings.AUDIO_NORMALIZE_CODEC][0]}")
+                result = await normalize_file(
+                    src, dst, settings.AUDIO_NORMALIZE_CODEC, settings.AUDIO_NORMALIZE_BITRATE, build_trimmer(),
+                )
+                if result.output_bytes < result.input_bytes:
+                    transcribe_path = dst
+                    await asyncio.to_thread(src.unlink, missing_ok=True)
+                else: # Already compact: upload the original
+                    await asyncio.to_thread(dst.unlink, missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Audio normalization failed for job {job_id} ({e}); transcribing the original file.", exc_info=True)
+
+        if handoff:
+            TranscriptionService.transcribe_audio_task.delay(job_id, str(transcribe_path), cache_aliases, content_key)
+        return {
+            "job_id": job_id,
+            "audio_file_path": str(transcribe_path),
+            "normalized": transcribe_path != src,
+            "cache_aliases": cache_aliases,
+            "content_key": content_key,
+        }
@@ -97,14 +97,83 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # --- Import Sync Session ---
 from sqlalchemy.orm import Session as SyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, inspect # Import inspect
-from typing import Optional, List, Dict, Any
-
-from app.models.video_job import VideoJob, JobStatus
+from sqlalchemy import update, insert, inspect, tuple_ # Import inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import joinedload, load_only
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Union
+import datetime
+
+from app.core.exceptions import StaleJobVersionError
+from app.models.video_job import CONTENT_COLUMNS, VideoJob, VideoJobContent, JobStatus
 from app.schemas.job import JobCreate
 
 logger = logging.getLogger(__name__)
 
+# Columns of the video_jobs row itself; the large values (CONTENT_COLUMNS) live in video_job_contents
+HOT_COLUMNS = frozenset(VideoJob.__table__.columns.keys())
+# Column names that can be requested through get_job(..., columns=...)
+JOB_COLUMNS = HOT_COLUMNS | frozenset(CONTENT_COLUMNS)
+
+_DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _job_load_options(columns: Optional[Sequence[str]]):
+    """Loader options: only `columns` (plus the primary key) if given, otherwise the full row and its content row."""
+    if not columns:
+        return [joinedload(VideoJob.content)]
+    unknown = set(columns) - JOB_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown VideoJob column(s): {', '.join(sorted(unknown))}")
+    hot = [getattr(VideoJob, c) for c in columns if c in HOT_COLUMNS] or [VideoJob.id]
+    content = [getattr(VideoJobContent, c) for c in columns if c in CONTENT_COLUMNS]
+    options = [load_only(*hot)]
+    if content: # One LEFT OUTER JOIN, only when a large value was asked for
+        options.append(joinedload(VideoJob.content).load_only(*content))
+    return options
+
+
+def split_job_values(values: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Splits VideoJob values into (video_jobs columns, video_job_contents columns)."""
+    hot = {k: v for k, v in values.items() if k not in CONTENT_COLUMNS}
+    content = {k: v for k, v in values.items() if k in CONTENT_COLUMNS}
+    return hot, content
+
+
+def content_upsert_stmt(dialect_name: str, columns: Sequence[str]):
+    """
+    INSERT ... ON CONFLICT (job_id) DO UPDATE of the given content columns (executemany-safe:
+    parameters are job_id plus `columns`). Content rows are created on first write.
+    """
+    dialect_insert = _DIALECT_INSERTS.get(dialect_name)
+    if dialect_insert is None:
+        raise ValueError(f"Content upserts are not supported on {dialect_name}.")
+    stmt = dialect_insert(VideoJobContent.__table__)
+    return stmt.on_conflict_do_update(index_elements=["job_id"], set_={c: stmt.excluded[c] for c in columns})
+
+
+def _content_rows(job_ids: Sequence[int], rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """video_job_contents rows for newly inserted jobs; jobs without any content value get no row."""
+    return [
+        {"job_id": job_id, **content}
+        for job_id, content in ((job_id, split_job_values(row)[1]) for job_id, row in zip(job_ids, rows))
+        if any(v is not None for v in content.values())
+    ]
+
+
+# Small columns returned by job listings (never the transcript/topics blobs)
+JOB_SUMMARY_COLUMNS = ("created_at", "updated_at", "source_type", "status", "status_message",
+                       "transcript_fetched", "script_genre")
+
+
+def _job_update_stmt(job_id: int, values: Dict[str, Any], expected_version: Optional[int] = None):
+    """Single UPDATE of one job that bumps its version, optionally only if the version is still expected_version."""
+    stmt = update(VideoJob).where(VideoJob.id == job_id)
+    if expected_version is not None:
+        stmt = stmt.where(VideoJob.version == expected_version)
+    return stmt.values(**values, version=VideoJob.version + 1)
+
+
 class DatabaseService:
     """Handles database operations for VideoJob. Includes async and sync methods."""
 
@@ -145,10 +214,64 @@ class DatabaseService:
             await db.rollback()
             raise
 
-    async def get_job(self, db: AsyncSession, job_id: int) -> Optional[VideoJob]:
-        # ... (keep existing async implementation) ...
+    async def create_job_with_values(self, db: AsyncSession, values: Dict[str, Any]) -> VideoJob:
+        """
+        Creates a VideoJob whose final state is already known (e.g. prompt jobs) with a single
+        INSERT ... RETURNING, instead of create + flush + refresh + update + select.
+        """
+        try:
+            hot, content = split_job_values(values)
+            stmt = insert(VideoJob).values(**hot).returning(VideoJob)
+            new_job = (await db.execute(stmt)).scalar_one()
+            content_rows = _content_rows([new_job.id], [values])
+            if content_rows:
+                await db.execute(insert(VideoJobContent), content_rows)
+            logger.info(f"ASYNC: Created VideoJob {new_job.id} in state {new_job.status.value}")
+            return new_job
+        except Exception as e:
+            logger.error(f"ASYNC Error creating VideoJob: {e}", exc_info=True)
+            await db.rollback()
+            raise
+
+    async def bulk_create_jobs(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Inserts many VideoJob rows with one multi-row INSERT ... RETURNING (plus one executemany
+        INSERT of the content rows). Every dict must have the same keys.
+        Returns (id, status) rows in the same order as `rows`.
+        """
+        if not rows:
+            return []
         try:
-            result = await db.execute(select(VideoJob).where(VideoJob.id == job_id))
+            stmt = insert(VideoJob).returning(VideoJob.id, VideoJob.status, sort_by_parameter_order=True)
+            result = await db.execute(stmt, [split_job_values(row)[0] for row in rows])
+            created = result.all()
+            content_rows = _content_rows([row.id for row in created], rows)
+            if content_rows:
+                await db.execute(insert(VideoJobContent), content_rows)
+            logger.info(f"ASYNC: Bulk created {len(created)} VideoJobs")
+            return created
+        except Exception as e:
+            logger.error(f"ASYNC Error bulk creating VideoJobs: {e}", exc_info=True)
+            await db.rollback()
+            raise
+
+    async def mark_jobs_failed(self, db: AsyncSession, job_ids: List[int], message: str) -> None:
+        """Sets many jobs to FAILED with one UPDATE."""
+        if not job_ids:
+            return
+        await db.execute(
+            update(VideoJob).where(VideoJob.id.in_(job_ids))
+            .values(status=JobStatus.FAILED, status_message=message, version=VideoJob.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_job(self, db: AsyncSession, job_id: int, columns: Optional[Sequence[str]] = None) -> Optional[VideoJob]:
+        """
+        Retrieves a VideoJob by its ID. With `columns`, only those columns are SELECTed
+        (other attributes stay unloaded and must not be accessed in async code).
+        """
+        try:
+            result = await db.execute(select(VideoJob).where(VideoJob.id == job_id).options(*_job_load_options(columns)))
             job = result.scalar_one_or_none()
             # ... logging ...
             return job
@@ -156,15 +279,44 @@ class DatabaseService:
             # ... error logging ...
             return None
 
-    async def update_job_status(self, db: AsyncSession, job_id: int, status: JobStatus, message: Optional[str] = None) -> Optional[VideoJob]:
-        return await self._update_job_async(db, job_id, {"status": status, "status_message": message})
-
-    async def update_job(self, db: AsyncSession, job_id: int, update_data: Dict[str, Any]) -> Optional[VideoJob]:
-        return await self._update_job_async(db, job_id, update_data)
-
-    async def _update_job_async(self, db: AsyncSession, job_id: int, update_data: Dict[str, Any]) -> Optional[VideoJob]:
-        # ... (keep existing async implementation) ...
-        filtered_data = {k: v for k, v in update_data.items() if v is not None or k in ['topics','script_genre']} # Allow setting back to None for these
+    async def list_jobs(
+        self,
+        db: AsyncSession,
+        limit: int,
+        status: Optional[JobStatus] = None,
+        source_type: Optional[str] = None,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+        after: Optional[Tuple[datetime.datetime, int]] = None,
+    ) -> List[VideoJob]:
+        """
+        Lists jobs newest first using keyset pagination: `after` is the (created_at, id) of the
+        last job of the previous page, so each page is an index range scan of `limit` rows
+        no matter how deep it is (backed by the (status|source_type, created_at, id) indexes).
+        """
+        stmt = select(VideoJob).options(load_only(*(getattr(VideoJob, c) for c in JOB_SUMMARY_COLUMNS)))
+        if status is not None:
+            stmt = stmt.where(VideoJob.status == status)
+        if source_type is not None:
+            stmt = stmt.where(VideoJob.source_type == source_type)
+        if created_after is not None:
+            stmt = stmt.where(VideoJob.created_at >= created_after)
+        if created_before is not None:
+            stmt = stmt.where(VideoJob.created_at < created_before)
+        if after is not None:
+            stmt = stmt.where(tuple_(VideoJob.created_at, VideoJob.id) < tuple_(*after))
+        stmt = stmt.order_by(VideoJob.created_at.desc(), VideoJob.id.desc()).limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def update_job_status(self, db: AsyncSession, job_id: int, status: JobStatus, message: Optional[str] = None, expected_version: Optional[int] = None) -> Optional[VideoJob]:
+        return await self._update_job_async(db, job_id, {"status": status, "status_message": message}, expected_version)
+
+    async def update_job(self, db: AsyncSession, job_id: int, update_data: Dict[str, Any], expected_version: Optional[int] = None) -> Optional[VideoJob]:
+        return await self._update_job_async(db, job_id, update_data, expected_version)
+
+    async def _update_job_async(self, db: AsyncSession, job_id: int, update_data: Dict[str, Any], expected_version: Optional[int] = None) -> Optional[VideoJob]:
+        filtered_data = {k: v for k, v in update_data.items() if v is not None or k in ['topics','script_genre','condensed_transcript']} # Allow setting back to None for these
         if not filtered_data: # Handle empty update
             logger.warning(f"ASYNC: No fields provided to update for job {job_id}.")
             # Check if job exists before trying to return it
@@ -172,15 +324,24 @@ class DatabaseService:
             return existing_job
 
         try:
-            stmt = update(VideoJob).where(VideoJob.id == job_id).values(**filtered_data).returning(VideoJob)
+            hot, content = split_job_values(filtered_data)
+            stmt = _job_update_stmt(job_id, hot, expected_version).returning(VideoJob)
             result = await db.execute(stmt)
             updated_job = result.scalar_one_or_none()
             if updated_job:
+                 if content: # Only once the version check passed; the job row is locked by the UPDATE
+                     await db.execute(content_upsert_stmt(db.get_bind().dialect.name, list(content)), {"job_id": job_id, **content})
+                     db.expire(updated_job, ["content"])
                  logger.info(f"ASYNC: Updated VideoJob {job_id} with data: {filtered_data}")
                  return updated_job
-            else:
-                 logger.warning(f"ASYNC: Attempted to update non-existent job ID: {job_id}")
-                 return None
+            if expected_version is not None:
+                actual_version = (await db.execute(select(VideoJob.version).where(VideoJob.id == job_id))).scalar_one_or_none()
+                if actual_version is not None:
+                    raise StaleJobVersionError(job_id, expected_version, actual_version)
+            logger.warning(f"ASYNC: Attempted to update non-existent job ID: {job_id}")
+            return None
+        except StaleJobVersionError:
+            raise
         except Exception as e:
             logger.error(f"ASYNC Error updating job {job_id}: {e}", exc_info=True)
             raise
@@ -192,7 +353,7 @@ class DatabaseService:
         try:
             # Use Session.get() for primary key lookup if preferred, or select
             # job = db.get(VideoJob, job_id) # Simpler way for primary key
-            job = db.execute(select(VideoJob).where(VideoJob.id == job_id)).scalar_one_or_none()
+            job = db.execute(select(VideoJob).where(VideoJob.id == job_id).options(joinedload(VideoJob.content))).scalar_one_or_none()
             if job:
                 logger.debug(f"SYNC: Retrieved VideoJob with ID: {job_id}")
             else:
@@ -206,32 +367,66 @@ class DatabaseService:
         """Updates the status and optional message of a VideoJob synchronously."""
         return self._update_job_sync(db, job_id, {"status": status, "status_message": message})
 
-    def _update_job_sync(self, db: SyncSession, job_id: int, update_data: Dict[str, Any]) -> Optional[VideoJob]:
-        """Internal helper to update VideoJob fields synchronously."""
-        filtered_data = {k: v for k, v in update_data.items() if v is not None or k in ['topics','script_genre']}
+    def update_job_sync(
+        self,
+        db: SyncSession,
+        job_id: int,
+        update_data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        returning: Optional[Sequence[str]] = None,
+    ) -> Union[VideoJob, Row, None]:
+        """
+        Updates VideoJob fields synchronously with one UPDATE ... RETURNING statement.
+        returning=None returns the updated VideoJob; a list of column names returns only a Row
+        of (id, version, *returning). Raises StaleJobVersionError if expected_version is given
+        and another writer has updated the row since the caller read it.
+        """
+        return self._update_job_sync(db, job_id, update_data, expected_version, returning)
+
+    def _update_job_sync(
+        self,
+        db: SyncSession,
+        job_id: int,
+        update_data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        returning: Optional[Sequence[str]] = None,
+    ) -> Union[VideoJob, Row, None]:
+        """Internal helper to update VideoJob fields synchronously (same statement as _update_job_async)."""
+        filtered_data = {k: v for k, v in update_data.items() if v is not None or k in ['topics','script_genre','condensed_transcript']}
         if not filtered_data:
             logger.warning(f"SYNC: No fields provided to update for job {job_id}.")
             return self.get_job_sync(db, job_id)
 
-        try:
-            # Fetch the object first for sync update (alternative to update().returning())
-            job = self.get_job_sync(db, job_id)
-            if not job:
-                 logger.warning(f"SYNC: Attempted to update non-existent job ID: {job_id}")
-                 return None
-
-            # Update attributes directly
-            for key, value in filtered_data.items():
-                 setattr(job, key, value)
+        if returning is not None:
+            unknown = set(returning) - HOT_COLUMNS
+            if unknown:
+                raise ValueError(f"Unknown or non-returnable VideoJob column(s): {', '.join(sorted(unknown))}")
 
-            db.add(job) # Add to session to mark dirty
-            db.flush() # Persist changes
-            db.refresh(job) # Refresh object state
-
-            logger.info(f"SYNC: Updated VideoJob {job_id} with data: {filtered_data}")
-            return job
+        try:
+            hot, content = split_job_values(filtered_data)
+            stmt = _job_update_stmt(job_id, hot, expected_version)
+            if returning is None:
+                updated = db.execute(stmt.returning(VideoJob)).scalar_one_or_none()
+            else:
+                columns = [VideoJob.id, VideoJob.version] + [getattr(VideoJob, c) for c in returning if c not in ("id", "version")]
+                updated = db.execute(stmt.returning(*columns)).one_or_none()
+            if updated is not None:
+                if content:
+                    db.execute(content_upsert_stmt(db.get_bind().dialect.name, list(content)), {"job_id": job_id, **content})
+                    if returning is None:
+                        db.expire(updated, ["content"])
+                logger.info(f"SYNC: Updated VideoJob {job_id} with data: {filtered_data}")
+                return updated
+            if expected_version is not None:
+                actual_version = db.execute(select(VideoJob.version).where(VideoJob.id == job_id)).scalar_one_or_none()
+                if actual_version is not None:
+                    raise StaleJobVersionError(job_id, expected_version, actual_version)
+            logger.warning(f"SYNC: Attempted to update non-existent job ID: {job_id}")
+            return None
 
+        except StaleJobVersionError:
+            raise
         except Exception as e:
             logger.error(f"SYNC Error updating job {job_id}: {e}", exc_info=True)
             db.rollback() # Rollback on error
-            raise
\ No newline at end of file
+            raise
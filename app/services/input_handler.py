@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from sqlalchemy import text
@@ -6,11 +7,20 @@ import uuid # For generating unique filenames
 from pathlib import Path
 import yt_dlp # For downloading YouTube audio
 from fastapi import UploadFile
-from typing import Optional, Union # Add Union here
-from app.celery_app import celery
+from typing import AsyncIterable, Optional, Union, List, Tuple # Add Union here
+from celery import group
+from app.celery_app import celery, AsyncTask, broker_priority
 from app.core.config import settings
+from app.core.exceptions import UploadTooLargeError
 from app.services.database_service import DatabaseService
-from app.services.transcription_service import TranscriptionService # Import the service
+from app.services.transcription_service import WHISPER_MODEL, WHISPER_RESPONSE_FORMAT, get_client
+from app.services.transcript_cache import transcript_cache, normalize_youtube_video_id
+from app.services.status_coalescer import get_status_coalescer
+from app.services.upload_writer import StoredUpload, check_declared_size, copy_to_file, stream_to_file
+from app.services.youtube_ingest import get_youtube_ingest
+from app.services.audio_normalizer import enqueue_transcription
+from app.services.streaming_transcription import transcribe_youtube_stream
+from app.services.pipeline import new_payload, pipeline_signature, start_pipeline
 from app.models.video_job import JobStatus
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import AsyncSessionLocal # For tasks
@@ -26,6 +36,21 @@ class InputHandler:
         # Ensure download directory exists (should be done by config loader, but double check)
         settings.DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def _prompt_job_values(prompt_text: str) -> dict:
+        """Column values of a prompt job in its final state (before topics)."""
+        # Transcript is effectively 'fetched' (it's the prompt itself)
+        values = {
+            "source_type": "prompt",
+            "source_value": prompt_text,
+            "transcript": prompt_text,
+            "transcript_fetched": True,
+        }
+        if settings.PIPELINE_AUTORUN: # The pipeline generates the topics: still running until it has
+            return {**values, "status": JobStatus.PROCESSING, "status_message": "Prompt processed. Generating topics..."}
+        # Mark as COMPLETED to allow topic generation right away for prompts
+        return {**values, "status": JobStatus.COMPLETED, "status_message": "Prompt processed. Ready for topic generation."}
+
     async def process_new_job(self, db: AsyncSession, source_type: str, source_value: Union[str, UploadFile]) -> VideoJob:
         """
         Main entry point to process a new job request.
@@ -39,28 +64,27 @@ class InputHandler:
                 if isinstance(prompt_text, bytes): # Decode if needed (though should be str)
                      prompt_text = prompt_text.decode('utf-8')
 
-                job = await self.db_service.create_job(db, source_type, prompt_text)
-
-                # Update status: Transcript is effectively 'fetched' (it's the prompt itself)
-                # Mark as COMPLETED to allow topic generation right away for prompts
-                await self.db_service.update_job(db, job.id, {
-                    "transcript": prompt_text,
-                    "transcript_fetched": True,
-                    "status": JobStatus.COMPLETED, # Ready for next step (topics)
-                    "status_message": "Prompt processed. Ready for topic generation."
-                 })
-                #await db.commit() # Commit changes for prompt job
+                # The final state of a prompt job is known up front, so write it with one INSERT ... RETURNING
+                job = await self.db_service.create_job_with_values(db, self._prompt_job_values(prompt_text))
                 logger.info(f"Processed prompt directly for job {job.id}")
-                return await self.db_service.get_job(db, job.id) # Return the updated job
+                if settings.PIPELINE_AUTORUN:
+                    db.expunge(job) # Keeps the RETURNING values readable after the commit, without a refresh SELECT
+                    await db.commit() # The topics stage reads the job
+                    start_pipeline(job.id, "prompt")
+                return job
 
             elif source_type == "youtube_url":
                 if not isinstance(source_value, str):
                     raise ValueError("YouTube URL source value must be a string.")
                 job = await self.db_service.create_job(db, source_type, source_value)
+                db.expunge(job) # Keeps id and status readable after the commit (callers read both)
                 await db.commit() # Commit the initial job creation
                 logger.info(f"Created job {job.id} for YouTube URL. Triggering download task.")
-                # Trigger Celery task for download and subsequent transcription
-                self.download_youtube_audio_task.delay(job.id, source_value)
+                if settings.PIPELINE_AUTORUN: # Download, normalize, transcribe and topics as one canvas
+                    start_pipeline(job.id, source_type, source_value)
+                else:
+                    # Trigger Celery task for download and subsequent transcription
+                    self.download_youtube_audio_task.delay(job.id, source_value)
                 # Status remains PENDING until download task updates it
 
             elif source_type == "audio_file":
@@ -68,17 +92,15 @@ class InputHandler:
                      raise ValueError("Audio file source value must be an UploadFile.")
                 # Save the uploaded file first
                 original_filename = source_value.filename or "uploaded_audio"
-                # Create a unique filename to avoid conflicts
-                file_ext = Path(original_filename).suffix or ".tmp"
-                unique_filename = f"{uuid.uuid4()}{file_ext}"
-                audio_file_path = settings.DOWNLOAD_DIR / unique_filename
+                audio_file_path = self._upload_path(original_filename)
 
                 try:
-                    with open(audio_file_path, "wb") as buffer:
-                        # Read chunk by chunk to handle large files
-                        while content := await source_value.read(1024 * 1024): # Read 1MB chunks
-                            buffer.write(content)
+                    check_declared_size(source_value.size, settings.UPLOAD_MAX_BYTES)
+                    # Starlette has already spooled the upload: copy it off the event loop (hashed later by the transcription task)
+                    stored = await asyncio.to_thread(copy_to_file, source_value.file, audio_file_path)
                     logger.info(f"Saved uploaded audio file to: {audio_file_path}")
+                except UploadTooLargeError:
+                    raise
                 except Exception as e:
                     logger.error(f"Failed to save uploaded file {original_filename}: {e}", exc_info=True)
                     # Create job with error status? Or raise error? Let's raise for now.
@@ -86,15 +108,8 @@ class InputHandler:
                 finally:
                     await source_value.close() # Close the upload file stream
 
-
                 # Create job record after successful file save
-                job = await self.db_service.create_job(db, source_type, str(audio_file_path)) # Store path as source_value
-                await db.commit() # Commit initial job creation
-                logger.info(f"Created job {job.id} for uploaded audio file. Triggering transcription task.")
-
-                # Trigger Celery task for transcription directly
-                TranscriptionService.transcribe_audio_task.delay(job.id, str(audio_file_path))
-                # Status remains PENDING until transcription task updates it
+                job = await self._create_audio_job(db, stored)
 
             else:
                 raise ValueError(f"Unsupported source type: {source_type}")
@@ -119,141 +134,264 @@ class InputHandler:
             raise # Re-raise the exception to be caught by the router
 
 
+    async def process_audio_stream(
+        self, db: AsyncSession, chunks: AsyncIterable[bytes], filename: Optional[str], declared_size: Optional[int] = None
+    ) -> VideoJob:
+        """
+        Creates an audio_file job from a raw request body: the bytes go straight to DOWNLOAD_DIR
+        (no multipart spooling, so they're written once), hashed on the way, and a transcript
+        cache hit skips Whisper entirely. Raises UploadTooLargeError before or while reading.
+        """
+        check_declared_size(declared_size, settings.UPLOAD_MAX_BYTES)
+        audio_file_path = self._upload_path(filename or "uploaded_audio")
+        stored = await stream_to_file(chunks, audio_file_path)
+        try:
+            return await self._create_audio_job(db, stored)
+        except Exception:
+            await asyncio.to_thread(audio_file_path.unlink, missing_ok=True)
+            raise
+
+    @staticmethod
+    def _upload_path(original_filename: str) -> Path:
+        # Create a unique filename to avoid conflicts
+        file_ext = Path(original_filename).suffix or ".tmp"
+        return settings.DOWNLOAD_DIR / f"{uuid.uuid4()}{file_ext}"
+
+    async def _create_audio_job(self, db: AsyncSession, stored: StoredUpload) -> VideoJob:
+        """Job for a stored upload: served from the transcript cache when the same audio was seen before, else transcribed."""
+        content_key = None
+        if transcript_cache and stored.sha256: # Multipart copies aren't hashed: the transcription task looks the cache up
+            content_key = transcript_cache.content_key(stored.sha256, WHISPER_MODEL, WHISPER_RESPONSE_FORMAT)
+            cached_transcript = await asyncio.to_thread(transcript_cache.get, content_key)
+            if cached_transcript:
+                if settings.PIPELINE_AUTORUN: # The pipeline's topics stage is still to run
+                    status, message = JobStatus.PROCESSING, "Transcription successful (cached). Generating topics..."
+                else:
+                    status, message = JobStatus.COMPLETED, "Transcription successful (cached). Ready for topic generation."
+                job = await self.db_service.create_job_with_values(db, {
+                    "source_type": "audio_file",
+                    "source_value": str(stored.path),
+                    "transcript": cached_transcript,
+                    "transcript_fetched": True,
+                    "status": status,
+                    "status_message": message,
+                }) # No task to hand off to: get_db commits
+                await asyncio.to_thread(stored.path.unlink, missing_ok=True) # Same audio already transcribed
+                logger.info(f"Job {job.id}: uploaded audio {stored.sha256[:12]} served from the transcript cache.")
+                if settings.PIPELINE_AUTORUN: # Straight on to topics
+                    db.expunge(job) # Keeps the RETURNING values readable after the commit
+                    await db.commit()
+                    start_pipeline(job.id, "audio_file", str(stored.path), transcribed=True)
+                return job
+
+        job = await self.db_service.create_job(db, "audio_file", str(stored.path)) # Store path as source_value
+        db.expunge(job) # Keeps id and status readable after the commit (callers read both)
+        await db.commit() # Commit initial job creation
+        logger.info(f"Created job {job.id} for uploaded audio file. Triggering transcription task.")
+
+        # Trigger transcription (through normalization when enabled); it reuses the digest instead of re-reading the file
+        if settings.PIPELINE_AUTORUN:
+            start_pipeline(job.id, "audio_file", str(stored.path), audio_file_path=str(stored.path), content_key=content_key)
+        else:
+            enqueue_transcription(job.id, str(stored.path), content_key=content_key)
+        # Status remains PENDING until transcription task updates it
+        return job
+
+    async def process_bulk_jobs(self, db: AsyncSession, specs: List[Tuple[str, str]]) -> List[Tuple[int, JobStatus]]:
+        """
+        Creates many jobs at once from (source_type, source_value) pairs ('prompt' or 'youtube_url').
+        All rows go in with a single multi-row INSERT ... RETURNING; prompt jobs are written
+        directly in their final state and YouTube downloads (with PIPELINE_AUTORUN, every job's
+        pipeline) are enqueued as one Celery group.
+        Returns (job_id, status) in the same order as specs.
+        """
+        rows = []
+        for source_type, source_value in specs:
+            if source_type == "prompt":
+                rows.append(self._prompt_job_values(source_value))
+            elif source_type == "youtube_url":
+                rows.append({
+                    "source_type": source_type,
+                    "source_value": source_value,
+                    "transcript": None,
+                    "transcript_fetched": False,
+                    "status": JobStatus.PENDING,
+                    "status_message": "Job submitted. Waiting for processing...",
+                })
+            else:
+                raise ValueError(f"Unsupported source type for bulk submission: {source_type}")
+
+        created = await self.db_service.bulk_create_jobs(db, rows)
+        await db.commit() # Rows must be visible before workers pick up the tasks
+
+        downloads = [
+            (row.id, source_value)
+            for row, (source_type, source_value) in zip(created, specs)
+            if source_type == "youtube_url"
+        ]
+        # Lower priority than single submissions, so a big batch doesn't hold up someone waiting on one video
+        priority = broker_priority(settings.CELERY_BULK_PRIORITY)
+        if settings.PIPELINE_AUTORUN: # Every job's pipeline (prompts straight to topics) in one group
+            workflows = [
+                pipeline_signature(new_payload(row.id, source_type, source_value if source_type == "youtube_url" else None), priority)
+                for row, (source_type, source_value) in zip(created, specs)
+            ]
+        else:
+            workflows = [self.download_youtube_audio_task.s(job_id, url).set(priority=priority) for job_id, url in downloads]
+        if workflows:
+            try:
+                group(workflows).apply_async()
+                logger.info(f"Enqueued {len(workflows)} bulk job tasks as one group ({len(downloads)} YouTube downloads).")
+            except Exception as e:
+                logger.error(f"Failed to enqueue bulk download tasks: {e}", exc_info=True)
+                failed_ids = [job_id for job_id, _ in downloads]
+                await self.db_service.mark_jobs_failed(db, failed_ids, f"Could not enqueue download task: {e}")
+                await db.commit()
+                failed = set(failed_ids)
+                return [(row.id, JobStatus.FAILED if row.id in failed else row.status) for row in created]
+
+        return [(row.id, row.status) for row in created]
+
+    @staticmethod
+    async def _stream_youtube_job(job_id: int, youtube_url: str, cache_aliases: List[str], status_writer) -> Optional[dict]:
+        """
+        Streaming pipeline mode: chunks are transcribed while the rest of the audio is still downloading,
+        with no transcription task to enqueue and no status flush between the two stages.
+        Returns the task result, or None when the source can't be streamed.
+        """
+        transcript_text = None
+        final_status = JobStatus.FAILED
+        try:
+            if not get_client():
+                raise ValueError("OpenAI client not initialized. Check API Key.")
+            status_writer.submit(job_id, JobStatus.PROCESSING, f"Streaming audio from {youtube_url}...") # Write-behind
+            streamed = await transcribe_youtube_stream(
+                job_id, youtube_url,
+                on_chunk=lambda done: status_writer.submit(job_id, JobStatus.PROCESSING, f"Transcribed {done} audio chunks..."),
+            )
+            if streamed is None:
+                return None
+            transcript_text = streamed.text
+            final_status = JobStatus.COMPLETED
+            status_message = "Transcription successful. Ready for topic generation."
+            if transcript_cache and cache_aliases:
+                await asyncio.to_thread(transcript_cache.put, cache_aliases, transcript_text)
+        except yt_dlp.utils.DownloadError as e:
+            logger.error(f"YouTube Download Error (Job {job_id}): {e}", exc_info=True)
+            status_message = f"YouTube download failed: {e}"
+        except Exception as e:
+            logger.error(f"Streaming transcription error (Job {job_id}): {e}", exc_info=True)
+            status_message = f"Transcription failed: {e}"
+
+        try:
+            await asyncio.to_thread(
+                status_writer.submit, job_id, final_status, status_message,
+                transcript=transcript_text, condensed_transcript=None, transcript_fetched=True,
+            ) # Terminal, written now
+        except Exception as db_err:
+            logger.error(f"Failed to update job status for job {job_id} after streaming: {db_err}", exc_info=True)
+        logger.info(f"Final status for job {job_id} after streaming: {final_status.value}")
+        return {"job_id": job_id, "status": final_status.value, "download_path": None, "streamed": True}
+
     @staticmethod
-    @celery.task(name="tasks.download_youtube_audio", bind=True)
-    async def download_youtube_audio_task(self, job_id: int, youtube_url: str):
+    @celery.task(name="tasks.download_youtube_audio", bind=True, base=AsyncTask)
+    async def download_youtube_audio_task(self, job_id: int, youtube_url: str, handoff: bool = True):
         """
         Celery task to download audio from YouTube URL using yt-dlp.
-        Triggers transcription task upon successful download.
+        Triggers transcription task upon successful download (unless handoff is False: a pipeline
+        runs the next stage itself, from the returned download_path and cache_aliases).
         """
         logger.info(f"Starting YouTube download task for job_id: {job_id}, URL: {youtube_url}")
-        db_service = DatabaseService() # Instantiate service inside task
+        status_writer = get_status_coalescer() # Status writes are merged and batched per worker process
         download_path = None
         final_status = JobStatus.FAILED
         status_message = "YouTube download failed"
         trigger_transcription = False
+        cache_aliases = []
+
+        # Same video submitted again (any URL shape)? Skip the download and Whisper entirely.
+        video_id = normalize_youtube_video_id(youtube_url)
+        if transcript_cache and video_id:
+            cache_aliases.append(transcript_cache.video_key(video_id, WHISPER_MODEL, WHISPER_RESPONSE_FORMAT))
+            cached_transcript = await asyncio.to_thread(transcript_cache.get, cache_aliases[0]) # SQLite I/O off the worker loop
+            if cached_transcript:
+                try:
+                    await asyncio.to_thread(
+                        status_writer.submit, job_id, JobStatus.COMPLETED,
+                        "Transcription successful (cached). Ready for topic generation.",
+                        transcript=cached_transcript, condensed_transcript=None, transcript_fetched=True,
+                    )
+                    logger.info(f"Job {job_id}: served transcript for video {video_id} from cache.")
+                    return {"job_id": job_id, "status": JobStatus.COMPLETED.value, "download_path": None, "cached": True}
+                except Exception as db_err:
+                    # Fall through to the normal download path
+                    logger.error(f"Failed to store cached transcript for job {job_id}: {db_err}", exc_info=True)
 
-        # Use AsyncSessionLocal for database operations within the async task
-        async with AsyncSessionLocal() as db:
-            try:
-                # 1. Update Job Status to PROCESSING
-                await db_service.update_job_status(db, job_id, JobStatus.PROCESSING, f"Downloading audio from {youtube_url}...")
-                await db.commit() # Commit status update
-
-                # 2. Setup yt-dlp options
-                # Create a unique filename for the download
-                unique_filename_base = f"youtube_{job_id}_{uuid.uuid4()}"
-                output_template = str(settings.DOWNLOAD_DIR / f"{unique_filename_base}.%(ext)s")
-
-                ydl_opts = {
-                    'format': 'bestaudio/best', # Download best audio quality
-                    'outtmpl': output_template, # Output path template
-                    'noplaylist': True, # Don't download playlists if URL points to one
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio', # Extract audio
-                        'preferredcodec': 'mp3', # Convert to mp3 (Whisper prefers this)
-                        'preferredquality': '192', # Audio quality
-                    }],
-                    'logger': logging.getLogger('yt_dlp'), # Integrate with our logging
-                    'progress_hooks': [lambda d: InputHandler._yt_dlp_hook(d, job_id)], # Optional progress hook
-                    # Consider adding limits: max_filesize, download_timeout etc.
-                }
-
-                logger.info(f"yt-dlp options for job {job_id}: {ydl_opts}")
-
-                # 3. Run yt-dlp download (synchronous library, run in threadpool)
-                # yt-dlp doesn't have a native async API, so we run it in Celery's thread pool
-                # or use asyncio.to_thread if not in Celery context. Celery handles this.
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # The actual download happens here. This can block.
-                    ydl.download([youtube_url])
-
-                # After download, figure out the exact output filename
-                # The output template might result in .mp3 or other audio extension
-                # Let's find the file based on the unique base name
-                possible_extensions = ['.mp3', '.m4a', '.wav', '.ogg'] # Add more if needed
-                downloaded_file = None
-                for ext in possible_extensions:
-                    potential_path = settings.DOWNLOAD_DIR / f"{unique_filename_base}{ext}"
-                    if potential_path.is_file():
-                        downloaded_file = potential_path
-                        break
-
-                if downloaded_file and downloaded_file.is_file():
-                    download_path = str(downloaded_file)
-                    logger.info(f"YouTube audio downloaded successfully for job {job_id} to: {download_path}")
-                    # Don't change status yet, transcription will handle it
-                    status_message = "Download successful. Starting transcription..."
-                    trigger_transcription = True
-                else:
-                     logger.error(f"Download for job {job_id} completed, but output file not found with base: {unique_filename_base}")
-                     status_message = "Download succeeded but output file not found."
-                     final_status = JobStatus.FAILED
-
+        # Streaming mode: transcribe while downloading, in this task (falls back to the staged path if the source can't be streamed)
+        if settings.YOUTUBE_PIPELINE_MODE == "streaming":
+            streamed = await InputHandler._stream_youtube_job(job_id, youtube_url, cache_aliases, status_writer)
+            if streamed is not None:
+                return streamed
 
-            except yt_dlp.utils.DownloadError as e:
-                 logger.error(f"YouTube Download Error (Job {job_id}): {e}", exc_info=True)
-                 status_message = f"YouTube download failed: {e}"
-                 final_status = JobStatus.FAILED
-                 await db.rollback() # Rollback DB if commit wasn't reached
-            except Exception as e:
-                logger.error(f"Generic Error during YouTube download (Job {job_id}): {e}", exc_info=True)
-                status_message = f"YouTube download failed: {e}"
-                final_status = JobStatus.FAILED
-                await db.rollback() # Rollback DB if commit wasn't reached
+        try:
+            # 1. Update Job Status to PROCESSING
+            status_writer.submit(job_id, JobStatus.PROCESSING, f"Downloading audio from {youtube_url}...") # Write-behind
+
+            # 2. Metadata, then the download, on the worker's warm yt-dlp pool (blocking library, own threads)
+            # The exact output path comes from yt-dlp's hooks; m4a/webm-opus audio is not re-encoded.
+            result = await get_youtube_ingest().download_audio(job_id, youtube_url)
+            download_path = str(result.path)
+            logger.info(
+                f"YouTube audio downloaded successfully for job {job_id} to: {download_path} "
+                f"({result.size / 2**20:.1f}MB {result.ext}, {'transcoded' if result.transcoded else 'not re-encoded'}, "
+                f"metadata {result.metadata_seconds:.2f}s, download {result.download_seconds:.2f}s)"
+            )
+            # Don't change status yet, transcription will handle it
+            status_message = "Download successful. Starting transcription..."
+            trigger_transcription = True
+
+        except FileNotFoundError as e:
+             logger.error(f"Download for job {job_id} completed, but output file not found: {e}")
+             status_message = "Download succeeded but output file not found."
+             final_status = JobStatus.FAILED
+        except yt_dlp.utils.DownloadError as e:
+             logger.error(f"YouTube Download Error (Job {job_id}): {e}", exc_info=True)
+             status_message = f"YouTube download failed: {e}"
+             final_status = JobStatus.FAILED
+        except Exception as e:
+            logger.error(f"Generic Error during YouTube download (Job {job_id}): {e}", exc_info=True)
+            status_message = f"YouTube download failed: {e}"
+            final_status = JobStatus.FAILED
 
-            finally:
-                # 4. Update status before triggering next task or setting final state
-                try:
-                    # Only update status if transcription isn't being triggered
-                    # Otherwise, let the transcription task handle the next status update
-                    if not trigger_transcription:
-                        await db_service.update_job_status(db, job_id, final_status, status_message)
-                        await db.commit()
-                        logger.info(f"Final status for job {job_id} after download attempt: {final_status.value}")
-                    else:
-                         # Update status message to indicate transcription start
-                         await db_service.update_job_status(db, job_id, JobStatus.PROCESSING, status_message)
-                         await db.commit()
+        finally:
+            # 3. Update status before triggering next task or setting final state
+            try:
+                # Only update status if transcription isn't being triggered
+                # Otherwise, let the transcription task handle the next status update
+                if not trigger_transcription:
+                    await asyncio.to_thread(status_writer.submit, job_id, final_status, status_message) # Terminal, written now
+                    logger.info(f"Final status for job {job_id} after download attempt: {final_status.value}")
+                else:
+                     # Update status message to indicate transcription start.
+                     # Flushed before the hand-off so it cannot land after the transcription task's writes.
+                     await asyncio.to_thread(status_writer.submit, job_id, JobStatus.PROCESSING, status_message, flush=True)
 
-                except Exception as db_err:
-                     logger.error(f"Failed to update job status for job {job_id} after download: {db_err}", exc_info=True)
-                     await db.rollback()
+            except Exception as db_err:
+                 logger.error(f"Failed to update job status for job {job_id} after download: {db_err}", exc_info=True)
 
 
-        # 5. Trigger transcription task if download was successful
+        # 4. Trigger transcription task if download was successful
         if trigger_transcription and download_path:
-            logger.info(f"Triggering transcription task for job {job_id} with file: {download_path}")
-            TranscriptionService.transcribe_audio_task.delay(job_id, download_path)
+            if handoff:
+                logger.info(f"Triggering transcription task for job {job_id} with file: {download_path}")
+                enqueue_transcription(job_id, download_path, cache_aliases)
         elif not trigger_transcription:
              logger.warning(f"Transcription not triggered for job {job_id} due to download failure.")
 
 
-        return {"job_id": job_id, "status": final_status.value if not trigger_transcription else JobStatus.PROCESSING.value, "download_path": download_path}
-
-
-    @staticmethod
-    def _yt_dlp_hook(d, job_id):
-        """Progress hook for yt-dlp."""
-        if d['status'] == 'downloading':
-            # Can log progress, but be careful not to flood logs
-             total_bytes_est = d.get('total_bytes_estimate')
-             downloaded_bytes = d.get('downloaded_bytes')
-             speed = d.get('speed')
-             eta = d.get('eta')
-             if downloaded_bytes and total_bytes_est and speed and eta:
-                 percent = (downloaded_bytes / total_bytes_est) * 100
-                 # Log only every ~10% to avoid flooding? Or update DB? Be cautious.
-                 if int(percent) % 10 == 0:
-                      logger.debug(f"Job {job_id} Download Progress: {percent:.1f}% at {speed:.2f} B/s, ETA: {eta}s")
-            # Potentially update DB status message with progress here, but adds overhead
-            # db_service = DatabaseService()
-            # async with AsyncSessionLocal() as db:
-            #    await db_service.update_job_status(db, job_id, JobStatus.PROCESSING, f"Downloading: {percent:.1f}%")
-            #    await db.commit() -> This adds many commits, maybe not ideal.
-
-        elif d['status'] == 'finished':
-            logger.info(f"yt-dlp finished downloading for job {job_id}. Filename: {d.get('filename')}")
-        elif d['status'] == 'error':
-            logger.error(f"yt-dlp reported an error for job {job_id}.")
-
+        return {
+            "job_id": job_id,
+            "status": final_status.value if not trigger_transcription else JobStatus.PROCESSING.value,
+            "download_path": download_path,
+            "cache_aliases": cache_aliases,
+        }
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.models.video_job import JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_CHANNEL = "job_events"
+
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def _get_redis():
+    """Sync Redis client for publishing (redis-py reconnects by itself after a fork)."""
+    global _redis_client
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                import redis
+                _redis_client = redis.Redis.from_url(settings.JOB_EVENTS_REDIS_URL or settings.CELERY_BROKER_URL)
+    return _redis_client
+
+
+def publish_job_event(job_id: int, status: JobStatus, message: Optional[str] = None, **extra: Any) -> None:
+    """
+    Publishes a job status transition to every API process streaming this job.
+    Called by workers after their status commit; never raises (status is still in the DB for pollers).
+    """
+    event = {
+        "job_id": job_id,
+        "status": status.value if isinstance(status, JobStatus) else status,
+        "status_message": message,
+        "ts": time.time(),
+        **extra,
+    }
+    try:
+        if settings.JOB_EVENTS_BACKEND == "memory":
+            job_event_hub.dispatch_threadsafe(event)
+        else:
+            _get_redis().publish(JOB_EVENTS_CHANNEL, json.dumps(event))
+    except Exception as e:
+        logger.warning(f"Failed to publish status event for job {job_id}: {e}")
+
+
+class JobEventHub:
+    """
+    Per-process fan-out of job status events to streaming clients.
+    A single listener task reads the pub/sub channel and pushes each event into the
+    bounded queues of the subscribers of that job, so thousands of open streams cost
+    one Redis subscription and no DB queries.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def subscribe(self, job_id: int) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        if settings.JOB_EVENTS_BACKEND != "memory" and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen(), name="job-event-listener")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        """Delivers an event to this job's subscribers. Must run on the hub's loop."""
+        for queue in list(self._subscribers.get(event.get("job_id"), ())):
+            if queue.full(): # Slow consumer: drop its oldest event, the latest status matters most
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def dispatch_threadsafe(self, event: Dict[str, Any]) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.dispatch, event)
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+        backoff = 1.0
+        while True:
+            client = aioredis.Redis.from_url(settings.JOB_EVENTS_REDIS_URL or settings.CELERY_BROKER_URL)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(JOB_EVENTS_CHANNEL)
+                    logger.info(f"Listening for job events on Redis channel '{JOB_EVENTS_CHANNEL}'")
+                    backoff = 1.0
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            self.dispatch(json.loads(message["data"]))
+                        except (ValueError, TypeError) as e:
+                            logger.warning(f"Ignoring malformed job event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job event listener error: {e}. Reconnecting in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                await client.aclose()
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+
+# One hub per API process
+job_event_hub = JobEventHub()
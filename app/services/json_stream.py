@@ -0,0 +1,56 @@
+import json
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class StringArrayStreamParser:
+    """
+    Incrementally extracts the string elements of the first JSON array in a text stream.
+    feed() takes arbitrary chunks (e.g. streamed LLM tokens) and returns the strings whose closing
+    quote arrived in that chunk, so callers can act on each topic as soon as it is complete.
+    Strings before the array (prose, or the other keys of a JSON object) are skipped correctly,
+    nested arrays/objects inside the array are ignored.
+    """
+
+    def __init__(self):
+        self.done = False # Closing bracket of the array seen
+        self._depth = 0 # Bracket depth; the array we want is depth 1
+        self._in_string = False
+        self._escape = False
+        self._buffer: List[str] = [] # Raw (still escaped) characters of the current string
+
+    def feed(self, chunk: str) -> List[str]:
+        completed: List[str] = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1: # Element of the target array
+                        raw = "".join(self._buffer)
+                        try:
+                            completed.append(json.loads(f'"{raw}"'))
+                        except ValueError:
+                            logger.warning(f"Skipping undecodable streamed JSON string: {raw[:80]!r}")
+                    self._buffer = []
+                    continue
+                if self._depth == 1:
+                    self._buffer.append(ch)
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                if ch == "[" or self._depth > 0:
+                    self._depth += 1
+            elif ch in "]}":
+                if self._depth > 0:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self.done = True
+        return completed
@@ -0,0 +1,222 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4 # 4 x 16-bit bands: any two hashes within 3 bits share at least one band exactly
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Unicode-normalizes and collapses whitespace so formatting-only differences share a cache key."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash of the word shingles of text; near-identical texts differ in only a few bits."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def _bands(fingerprint: int) -> Tuple[int, ...]:
+    return tuple((fingerprint >> (i * _BAND_BITS)) & _BAND_MASK for i in range(SIMHASH_BANDS))
+
+
+class LLMResponseCache(SQLiteStore):
+    """
+    Chat completion cache stored in SQLite so every worker process shares it.
+    Exact tier: keyed by model, sampling params and the normalized prompt.
+    Near-duplicate tier (optional): prompts built from the same template whose script text has a
+    SimHash within max_distance bits reuse the cached response. Entries expire after ttl_seconds
+    and are evicted least-recently-used once the stored responses exceed max_bytes.
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_bytes: int, ttl_seconds: float, near_duplicates: bool = True, max_distance: int = 3):
+        super().__init__(db_path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicates = near_duplicates
+        self.max_distance = min(max_distance, SIMHASH_BANDS - 1) # Banding only guarantees recall up to bands-1 bits
+
+    # --- Key builders ---
+
+    @staticmethod
+    def exact_key(model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+        digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"chat:{model}:{temperature}:{max_tokens}:{digest}"
+
+    @staticmethod
+    def scope(model: str, temperature: float, max_tokens: int, prompt: str, script_text: str) -> str:
+        """Near-duplicate scope: same model/params and the same prompt once the script text is taken out."""
+        template = normalize_prompt(prompt.replace(script_text, "\x00"))
+        digest = hashlib.sha256(template.encode("utf-8")).hexdigest()
+        return f"{model}:{temperature}:{max_tokens}:{digest}"
+
+    # --- Storage ---
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " scope TEXT,"
+            " simhash TEXT," # hex, SQLite integers are signed
+            + "".join(f" band{i} INTEGER," for i in range(SIMHASH_BANDS))
+            + " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " latency REAL NOT NULL," # Seconds the original API call took
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)")
+        for i in range(SIMHASH_BANDS):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_responses_scope_band{i} ON responses (scope, band{i})")
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _hit(self, conn: sqlite3.Connection, key: str, response: str, latency: float, counter: str) -> str:
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._bump_counter(conn, counter)
+        self._bump_counter(conn, "saved_latency_seconds", latency)
+        return response
+
+    def get(self, key: str, scope: Optional[str] = None, script_text: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the cached response for key, else (if scope/script_text are given and the near-duplicate
+        tier is on) the response of the closest fresh entry in scope within max_distance bits, else None.
+        """
+        try:
+            conn = self._connect()
+            try:
+                oldest = time.time() - self.ttl_seconds
+                row = conn.execute("SELECT response, latency FROM responses WHERE key = ? AND created_at >= ?", (key, oldest)).fetchone()
+                if row:
+                    logger.info(f"LLM cache HIT for key {key}")
+                    return self._hit(conn, key, row[0], row[1], "hits")
+
+                if self.near_duplicates and scope and script_text:
+                    fingerprint = simhash(script_text)
+                    bands = _bands(fingerprint)
+                    candidates = conn.execute(
+                        "SELECT key, simhash, response, latency FROM responses WHERE scope = ? AND created_at >= ? AND ("
+                        + " OR ".join(f"band{i} = ?" for i in range(SIMHASH_BANDS)) + ")",
+                        (scope, oldest, *bands),
+                    ).fetchall()
+                    best = None
+                    for cand_key, cand_hash, response, latency in candidates:
+                        distance = bin(int(cand_hash, 16) ^ fingerprint).count("1")
+                        if distance <= self.max_distance and (best is None or distance < best[0]):
+                            best = (distance, cand_key, response, latency)
+                    if best:
+                        logger.info(f"LLM cache NEAR HIT for key {key} ({best[0]} bits from {best[1]})")
+                        return self._hit(conn, best[1], best[2], best[3], "near_hits")
+
+                self._bump_counter(conn, "misses")
+                logger.debug(f"LLM cache MISS for key {key}")
+                return None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # The cache is an optimisation only, never fail the job because of it
+            logger.error(f"LLM cache lookup failed for key {key}: {e}")
+            return None
+
+    def put(self, key: str, response: str, latency: float, scope: Optional[str] = None, script_text: Optional[str] = None) -> None:
+        """Stores response (and the SimHash of script_text for the near-duplicate tier), then evicts expired and LRU entries."""
+        if not response:
+            return
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"LLM response of {size} bytes exceeds cache budget; not caching.")
+            return
+        fingerprint = simhash(script_text) if self.near_duplicates and scope and script_text else None
+        bands = _bands(fingerprint) if fingerprint is not None else (None,) * SIMHASH_BANDS
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, scope, simhash, "
+                    + "".join(f"band{i}, " for i in range(SIMHASH_BANDS))
+                    + "response, size, latency, created_at, last_access) VALUES ("
+                    + ", ".join("?" * (SIMHASH_BANDS + 8)) + ")",
+                    (key, scope if fingerprint is not None else None, f"{fingerprint:016x}" if fingerprint is not None else None,
+                     *bands, response, size, latency, now, now),
+                )
+                self._evict(conn, now)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store LLM response in cache: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        evicted = conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        evicted += self._evict_lru(conn, "responses", self.max_bytes)
+        if evicted:
+            self._bump_counter(conn, "evictions", evicted)
+            logger.info(f"LLM cache evicted {evicted} expired/LRU entries")
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Hit/miss counters and saved API latency shared across all processes using this cache file."""
+        try:
+            conn = self._connect()
+            try:
+                counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+                entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read LLM cache stats: {e}")
+            return {}
+        hits, near_hits, misses = int(counters.get("hits", 0)), int(counters.get("near_hits", 0)), int(counters.get("misses", 0))
+        lookups = hits + near_hits + misses
+        return {
+            "hits": hits,
+            "near_hits": near_hits,
+            "misses": misses,
+            "evictions": int(counters.get("evictions", 0)),
+            "hit_rate": round((hits + near_hits) / lookups, 4) if lookups else 0.0,
+            "saved_latency_seconds": round(counters.get("saved_latency_seconds", 0.0), 3),
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Shared instance (None when disabled in settings)
+llm_cache: Optional[LLMResponseCache] = (
+    LLMResponseCache(
+        settings.LLM_CACHE_PATH,
+        settings.LLM_CACHE_MAX_BYTES,
+        settings.LLM_CACHE_TTL_SECONDS,
+        near_duplicates=settings.LLM_CACHE_NEAR_DUPLICATES,
+        max_distance=settings.LLM_CACHE_SIMHASH_MAX_DISTANCE,
+    )
+    if settings.LLM_CACHE_ENABLED else None
+)
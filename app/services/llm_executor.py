@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, RateLimitError
+
+from app.celery_app import worker_resource
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4 # Cheap token estimate for rate limiting; the quota only needs to be approximately right
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at rate_per_minute, holding at most one minute of budget."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Waits until amount tokens are available and takes them. Returns the time spent waiting."""
+        amount = min(amount, self.capacity) # A single huge request must not wait forever
+        waited = 0.0
+        async with self._lock: # FIFO: later callers queue behind the one waiting for a refill
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+@dataclass
+class ChatResult:
+    content: Optional[str]
+    latency: float # Seconds, including retries and rate-limit waits
+    attempts: int
+    first_token_latency: Optional[float] = None # Streaming only
+
+
+class AsyncLLMExecutor:
+    """
+    Multiplexes many in-flight chat completions over one pooled (HTTP/2 when available) connection.
+    A semaphore caps concurrent requests, token buckets keep us under the RPM/TPM quotas and
+    429/5xx/connection errors are retried with jittered exponential backoff.
+    Limits apply per worker process: size them as the org quota divided by the LLM worker processes.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 32,
+        rpm_limit: int = 3500,
+        tpm_limit: int = 90000,
+        max_retries: int = 5,
+        timeout: float = 120.0,
+        http2: bool = True,
+    ):
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(rpm_limit)
+        self._tokens = TokenBucket(tpm_limit)
+        self._http_client = self._build_http_client(max_concurrency, timeout, http2)
+        # Retries are ours (they must go back through the rate limiter), so the SDK's are off
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self._http_client, max_retries=0)
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "in_flight": 0, "rate_limit_wait_seconds": 0.0}
+
+    @staticmethod
+    def _build_http_client(max_concurrency: int, timeout: float, http2: bool) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency, keepalive_expiry=60.0)
+        try:
+            return httpx.AsyncClient(http2=http2, limits=limits, timeout=httpx.Timeout(timeout, connect=10.0))
+        except ImportError:
+            # httpx[http2] (h2) not installed: fall back to pooled HTTP/1.1 keep-alive connections
+            logger.warning("h2 is not installed; LLM executor falls back to HTTP/1.1 connection pooling.")
+            return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(timeout, connect=10.0))
+
+    @staticmethod
+    def _retry_delay(attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(60.0, 1.0 * 2 ** attempt))
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("retry-after", 0)))
+            except ValueError:
+                pass
+        return delay
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        on_delta: Optional[Callable[[str], None]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        Runs one chat completion under the concurrency and rate limits. Raises after max_retries.
+        With on_delta the completion is streamed and on_delta(text) is called for every content delta;
+        a stream that already produced output is not retried (the caller has acted on it).
+        """
+        estimated_tokens = sum(len(m.get("content") or "") for m in messages) / CHARS_PER_TOKEN + max_tokens
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                waited = await self._requests.acquire(1)
+                waited += await self._tokens.acquire(estimated_tokens)
+                self._stats["rate_limit_wait_seconds"] += waited
+                self._stats["requests"] += 1
+                self._stats["in_flight"] += 1
+                parts: List[str] = []
+                first_token_latency = None
+                try:
+                    if on_delta is None:
+                        response = await self.client.chat.completions.create(
+                            model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, **kwargs
+                        )
+                        return ChatResult(response.choices[0].message.content, time.perf_counter() - started, attempt + 1)
+
+                    stream = await self.client.chat.completions.create(
+                        model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True, **kwargs
+                    )
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            if first_token_latency is None:
+                                first_token_latency = time.perf_counter() - started
+                            parts.append(delta)
+                            on_delta(delta)
+                    return ChatResult("".join(parts), time.perf_counter() - started, attempt + 1, first_token_latency)
+                except Exception as e:
+                    if parts or not self._is_retryable(e) or attempt >= self.max_retries:
+                        self._stats["failures"] += 1
+                        raise
+                    error = e
+                finally:
+                    self._stats["in_flight"] -= 1
+            # Back off outside the semaphore so other requests keep flowing
+            delay = self._retry_delay(attempt, error)
+            attempt += 1
+            self._stats["retries"] += 1
+            logger.warning(f"LLM request failed ({error.__class__.__name__}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "rate_limit_wait_seconds": round(self._stats["rate_limit_wait_seconds"], 3)}
+
+    async def aclose(self) -> None:
+        await self._http_client.aclose()
+
+
+def _build_executor() -> AsyncLLMExecutor:
+    return AsyncLLMExecutor(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        rpm_limit=settings.LLM_RPM_LIMIT,
+        tpm_limit=settings.LLM_TPM_LIMIT,
+        max_retries=settings.LLM_MAX_RETRIES,
+        timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        http2=settings.LLM_HTTP2,
+    )
+
+
+def get_llm_executor() -> Optional[AsyncLLMExecutor]:
+    """The worker loop's shared executor (None without an API key). Call from coroutines on the worker loop."""
+    if not settings.OPENAI_API_KEY:
+        return None
+    return worker_resource("llm_executor", _build_executor, lambda executor: executor.aclose())
@@ -276,101 +276,300 @@
 #         # This return value is ignored by Celery due to ignore_result=True
 #         return f"Job {job_id} processing finished with status {final_status.value}"
 
+import asyncio
 import logging
 import json
-from typing import List, Optional, Tuple
-# --- Import Only Sync OpenAI client and Base Error ---
-from openai import OpenAI, OpenAIError
+import time
+from typing import Callable, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from openai import OpenAIError
 
-# --- Database Imports for Sync ---
-from sqlalchemy.orm import Session as SyncSession # Import synchronous Session
-from app.database import SyncSessionLocal # Import synchronous Session factory
-
-from app.celery_app import celery
+from app.celery_app import celery, AsyncTask, worker_session
 from app.core.config import settings
 from app.services.database_service import DatabaseService # Still need the service class
 from app.models.video_job import JobStatus
+from app.services.status_coalescer import get_status_coalescer
+from app.services.llm_cache import llm_cache
+from app.services.llm_executor import get_llm_executor
+from app.services.json_stream import StringArrayStreamParser
+from app.services.transcript_condenser import transcript_condenser
+from app.services.topic_ranker import topic_ranker
 
 logger = logging.getLogger(__name__)
 
-# --- Initialize ONLY Sync client ---
-sync_client: Optional[OpenAI] = None
 if not settings.OPENAI_API_KEY:
     logger.warning("OPENAI_API_KEY not found. LLM features will fail.")
-else:
-    sync_client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=120.0) # Use Sync client
 
 # --- Constants (keep as before) ---
-GENRE_DETERMINATION_PROMPT_TEMPLATE = """...""" # Keep prompt templates
-TOPIC_GENERATION_PROMPT_TEMPLATE = """..."""
+GENRE_CHOICES = (
+    "Storytelling / Narrative",
+    "Educational / Explainer",
+    "Historical Fact / Analysis",
+    "Current Events / News Commentary",
+    "Product Review / Tutorial",
+    "Opinion / Rant",
+    "Comedy / Sketch",
+    "Inspirational / Motivational",
+    "Science / Technology Update",
+    "Travel / Exploration",
+    "Personal Vlog / Update",
+)
+
+GENRE_DETERMINATION_PROMPT_TEMPLATE = """
+Analyze the following script and determine its primary genre or category from the list below.
+Focus on the overall theme, style, and content.
+
+Possible Genres:
+- Storytelling / Narrative
+- Educational / Explainer
+- Historical Fact / Analysis
+- Current Events / News Commentary
+- Product Review / Tutorial
+- Opinion / Rant
+- Comedy / Sketch
+- Inspirational / Motivational
+- Science / Technology Update
+- Travel / Exploration
+- Personal Vlog / Update
+
+Script:
+\"\"\"
+{script_text}
+\"\"\"
+
+Output only the *single most fitting genre* from the list above.
+Genre:"""
+
+TOPIC_GENERATION_PROMPT_TEMPLATE = """
+Based on the following script and its identified genre, generate {topic_count} unique and engaging YouTube video topic ideas that are closely related or follow-up logically.
+The topics should be suitable for short-form or medium-length faceless YouTube videos.
+
+Script Genre: {genre}
+
+Script Content:
+\"\"\"
+{script_text}
+\"\"\"
+
+Generate exactly {topic_count} topics. Format the output as a JSON list of strings.
+Example JSON Output:
+["Topic Idea 1", "Topic Idea 2", "Topic Idea 3"]
+
+JSON Topic List:"""
+
+# Single-call mode: genre and topics in one JSON-mode request (the script is only sent once)
+SCRIPT_ANALYSIS_PROMPT_TEMPLATE = """
+Analyze the following script.
+1. Determine its primary genre or category from the list below, focusing on the overall theme, style, and content.
+2. Based on the script and that genre, generate {topic_count} unique and engaging YouTube video topic ideas that are closely related or follow-up logically.
+   The topics should be suitable for short-form or medium-length faceless YouTube videos.
+
+Possible Genres:
+{genre_list}
+
+Script:
+\"\"\"
+{script_text}
+\"\"\"
+
+Respond with a JSON object with exactly two keys:
+- "genre": the single most fitting genre, copied verbatim from the list above
+- "topics": a JSON list of exactly {topic_count} topic strings
+Example JSON Output:
+{{"genre": "Educational / Explainer", "topics": ["Topic Idea 1", "Topic Idea 2", "Topic Idea 3"]}}"""
+
+
+class ScriptAnalysis(BaseModel):
+    """Strict schema of the single-call analysis reply."""
+    model_config = ConfigDict(extra="forbid", strict=True)
+
+    genre: str
+    topics: List[str] = Field(min_length=1)
+
+    @field_validator("genre")
+    @classmethod
+    def _known_genre(cls, value: str) -> str:
+        if value not in GENRE_CHOICES:
+            raise ValueError(f"genre must be one of GENRE_CHOICES, got {value!r}")
+        return value
+
+    @field_validator("topics")
+    @classmethod
+    def _non_empty_topics(cls, value: List[str]) -> List[str]:
+        topics = [t.strip() for t in value if t.strip()]
+        if not topics:
+            raise ValueError("topics must contain at least one non-empty string")
+        return topics
+
+# Sampling params (part of the LLM cache key)
+CHAT_TEMPERATURE = 0.7
+CHAT_MAX_TOKENS = 1500
+SCRIPT_FALLBACK_CHARS = 4000 # Script excerpt when transcript condensation is disabled
+
+
+class _PartialTopicWriter:
+    """
+    on_topics callback for streamed generation: collects topics as they complete and writes the list
+    so far to VideoJob.topics every LLM_STREAM_PERSIST_EVERY topics (or LLM_STREAM_PERSIST_INTERVAL_SECONDS),
+    through the status coalescer, so status polls show partial results.
+    """
+
+    def __init__(self, job_id: int, status_writer):
+        self.job_id = job_id
+        self.status_writer = status_writer
+        self.started = time.perf_counter()
+        self.time_to_first_topic: Optional[float] = None
+        self.topics: List[str] = []
+        self.persisted_any = False # Some topics reached VideoJob.topics; not cleared by reset()
+        self._persisted = 0
+        self._persisted_at = self.started
+
+    def reset(self) -> None:
+        """
+        Drops collected topics (e.g. before falling back to another generation path), and the ones
+        already written to the job: they came from a reply that was rejected.
+        """
+        if self._persisted:
+            self.status_writer.submit(self.job_id, JobStatus.PROCESSING, "Discarding partial topics...", topics=None)
+        self.topics = []
+        self._persisted = 0
+
+    def __call__(self, new_topics: List[str]) -> None:
+        now = time.perf_counter()
+        if self.time_to_first_topic is None:
+            self.time_to_first_topic = now - self.started
+        self.topics.extend(new_topics)
+        if (len(self.topics) - self._persisted >= settings.LLM_STREAM_PERSIST_EVERY
+                or now - self._persisted_at >= settings.LLM_STREAM_PERSIST_INTERVAL_SECONDS):
+            self.status_writer.submit(
+                self.job_id, JobStatus.PROCESSING, f"Generating topics... {len(self.topics)} so far",
+                topics=list(self.topics),
+            )
+            self._persisted, self._persisted_at = len(self.topics), now
+            self.persisted_any = True
 
 
 class LLMService:
-    """Interacts with LLMs for script analysis and topic generation (SYNC Methods)."""
-
-    # --- Kept SYNCHRONOUS ---
-    def _call_openai_api_sync(self, prompt: str, model: str = "gpt-3.5-turbo") -> Optional[str]:
-        """Helper function to call the OpenAI ChatCompletion API SYNCHRONOUSLY."""
-        if not sync_client:
-            logger.error("OpenAI sync client not initialized. Cannot call API.")
+    """Interacts with LLMs for script analysis and topic generation (async, on the worker loop)."""
+
+    async def _call_openai_api(
+        self,
+        prompt: str,
+        model: str = "gpt-3.5-turbo",
+        script_text: Optional[str] = None,
+        json_mode: bool = False,
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Optional[str]:
+        """
+        Helper function to call the OpenAI ChatCompletion API through the worker's shared AsyncLLMExecutor.
+        Responses are served from / stored in the shared LLM cache; script_text (the part of the prompt
+        taken from the transcript) enables its near-duplicate tier. json_mode forces a JSON object reply.
+        on_delta streams the completion: it receives each text delta (a cached reply arrives as one delta).
+        """
+        cache_key = scope = None
+        if llm_cache:
+            cache_key = llm_cache.exact_key(model, CHAT_TEMPERATURE, CHAT_MAX_TOKENS, prompt)
+            scope = llm_cache.scope(model, CHAT_TEMPERATURE, CHAT_MAX_TOKENS, prompt, script_text) if script_text else None
+            # SQLite lookups go to a thread; other jobs share this loop
+            cached = await asyncio.to_thread(llm_cache.get, cache_key, scope, script_text)
+            if cached is not None:
+                if on_delta:
+                    on_delta(cached)
+                return cached
+
+        executor = get_llm_executor()
+        if not executor:
+            logger.error("LLM executor not initialized (no OpenAI API key). Cannot call API.")
             return None
         try:
-            logger.debug(f"Calling SYNC OpenAI API with model {model}. Prompt length: {len(prompt)}")
-            response = sync_client.chat.completions.create(
+            logger.debug(f"Calling OpenAI API with model {model}. Prompt length: {len(prompt)}")
+            response = await executor.chat(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant analyzing video scripts."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.7,
-                max_tokens=1500,
+                temperature=CHAT_TEMPERATURE,
+                max_tokens=CHAT_MAX_TOKENS,
+                on_delta=on_delta,
+                **({"response_format": {"type": "json_object"}} if json_mode else {}),
             )
-            result = response.choices[0].message.content
-            logger.debug(f"Received SYNC response from OpenAI. Length: {len(result or '')}")
-            return result.strip() if result else None
+            if response.first_token_latency is not None:
+                logger.debug(f"First streamed token after {response.first_token_latency:.2f}s")
+            result = response.content
+            logger.debug(f"Received response from OpenAI in {response.latency:.2f}s ({response.attempts} attempt(s)). Length: {len(result or '')}")
+            result = result.strip() if result else None
+            if result and llm_cache:
+                await asyncio.to_thread(llm_cache.put, cache_key, result, response.latency, scope, script_text)
+            return result
         except OpenAIError as e:
-            logger.error(f"SYNC OpenAI API Error: {str(e)}")
+            logger.error(f"OpenAI API Error: {str(e)}")
             return None
         except Exception as e:
-            logger.error(f"Unexpected error calling SYNC OpenAI API: {str(e)}")
+            logger.error(f"Unexpected error calling OpenAI API: {str(e)}")
             return None
 
-    # --- Changed to SYNCHRONOUS (def, no await) ---
-    def determine_genre(self, script_text: str) -> Optional[str]:
-        """Determines the genre of the script using an LLM (via sync call)."""
+    async def prepare_script(self, script_text: str) -> str:
+        """
+        The part of the transcript sent to the LLM: an extractive summary of all of it under
+        TRANSCRIPT_CONDENSE_TOKEN_BUDGET (text that fits is returned unchanged, so this is cheap on an
+        already condensed script), or the first SCRIPT_FALLBACK_CHARS when condensation is disabled.
+        """
+        if not transcript_condenser:
+            return script_text[:SCRIPT_FALLBACK_CHARS]
+        # CPU-bound on multi-hour transcripts: keep it off the worker loop
+        condensed = await asyncio.to_thread(transcript_condenser.condense_text, script_text)
+        return condensed or script_text[:SCRIPT_FALLBACK_CHARS]
+
+    async def determine_genre(self, script_text: str) -> Optional[str]:
+        """Determines the genre of the script using an LLM."""
         if not script_text:
             logger.warning("Cannot determine genre from empty script.")
             return None
 
-        prompt = GENRE_DETERMINATION_PROMPT_TEMPLATE.format(script_text=script_text[:4000])
-        genre = self._call_openai_api_sync(prompt, model="gpt-3.5-turbo")
+        script_slice = await self.prepare_script(script_text)
+        prompt = GENRE_DETERMINATION_PROMPT_TEMPLATE.format(script_text=script_slice)
+        genre = await self._call_openai_api(prompt, model="gpt-3.5-turbo", script_text=script_slice)
 
-        if genre and genre in [ # Keep genre list
-            "Storytelling / Narrative", "Educational / Explainer", "Historical Fact / Analysis",
-            "Current Events / News Commentary", "Product Review / Tutorial", "Opinion / Rant",
-            "Comedy / Sketch", "Inspirational / Motivational", "Science / Technology Update",
-            "Travel / Exploration", "Personal Vlog / Update"
-        ]:
+        if genre and genre in GENRE_CHOICES:
             logger.info(f"Determined genre: {genre}")
             return genre
         else:
             logger.warning(f"Could not determine a valid genre. LLM response: {genre}")
             return "Unknown"
 
-    # --- Changed to SYNCHRONOUS (def, no await) ---
-    def generate_topics(self, script_text: str, genre: str, topic_count: int = 10) -> Optional[List[str]]:
-        """Generates related video topics using an LLM (via sync call)."""
+    @staticmethod
+    def _topic_stream(on_topics: Optional[Callable[[List[str]], None]]) -> Optional[Callable[[str], None]]:
+        """Wraps on_topics (called with each batch of newly completed topics) as a text-delta callback."""
+        if on_topics is None:
+            return None
+        parser = StringArrayStreamParser()
+
+        def on_delta(delta: str) -> None:
+            topics = [t.strip() for t in parser.feed(delta) if t.strip()]
+            if topics:
+                on_topics(topics)
+        return on_delta
+
+    async def generate_topics(
+        self, script_text: str, genre: str, topic_count: int = 10, on_topics: Optional[Callable[[List[str]], None]] = None
+    ) -> Optional[List[str]]:
+        """
+        Generates related video topics using an LLM.
+        With on_topics the completion is streamed and on_topics(new_topics) fires as array elements complete.
+        """
         if not script_text or not genre:
             logger.warning("Cannot generate topics without script or genre.")
             return None
 
+        script_slice = await self.prepare_script(script_text)
         prompt = TOPIC_GENERATION_PROMPT_TEMPLATE.format(
-            script_text=script_text[:4000],
+            script_text=script_slice,
             genre=genre,
             topic_count=topic_count
         )
         model="gpt-3.5-turbo"
-        raw_response = self._call_openai_api_sync(prompt, model=model)
+        raw_response = await self._call_openai_api(prompt, model=model, script_text=script_slice, on_delta=self._topic_stream(on_topics))
 
         if not raw_response:
             logger.error("Failed to get response from LLM for topic generation.")
@@ -401,24 +600,70 @@ class LLMService:
              return None
 
 
+    async def analyze_script(
+        self, script_text: str, topic_count: int = 10, on_topics: Optional[Callable[[List[str]], None]] = None
+    ) -> Optional[ScriptAnalysis]:
+        """
+        Determines genre and generates topics with ONE JSON-mode call. Returns None if the reply fails validation.
+        on_topics streams topics as in generate_topics (the full reply is still validated at the end).
+        """
+        if not script_text:
+            logger.warning("Cannot analyze an empty script.")
+            return None
+
+        script_slice = await self.prepare_script(script_text)
+        prompt = SCRIPT_ANALYSIS_PROMPT_TEMPLATE.format(
+            script_text=script_slice,
+            genre_list="\n".join(f"- {g}" for g in GENRE_CHOICES),
+            topic_count=topic_count,
+        )
+        raw_response = await self._call_openai_api(
+            prompt, model="gpt-3.5-turbo", script_text=script_slice, json_mode=True, on_delta=self._topic_stream(on_topics)
+        )
+        if not raw_response:
+            logger.error("Failed to get response from LLM for script analysis.")
+            return None
+
+        try:
+            analysis = ScriptAnalysis.model_validate_json(raw_response)
+        except ValidationError as e:
+            logger.warning(f"Script analysis reply failed schema validation: {e}\nResponse snippet: {raw_response[:200]}")
+            return None
+        if abs(len(analysis.topics) - topic_count) > topic_count * 0.5:
+            logger.warning(f"LLM returned {len(analysis.topics)} topics, expected around {topic_count}.")
+        analysis.topics = analysis.topics[:topic_count]
+        logger.info(f"Single-call analysis: genre '{analysis.genre}', {len(analysis.topics)} topics.")
+        return analysis
+
+
     # --- Celery Task Definition ---
     @staticmethod
-    # --- Changed to def, kept ignore_result=True ---
-    @celery.task(name="tasks.generate_topics", bind=True, ignore_result=True)
-    def generate_topics_task(self, job_id: int): # Changed async def to def
-        logger.info(f"Starting SYNC topic generation task for job_id: {job_id}")
+    # Async on the worker loop: with a thread pool (e.g. --pool threads --concurrency 50) one worker
+    # process keeps dozens of jobs' LLM calls in flight through the shared executor.
+    @celery.task(name="tasks.generate_topics", bind=True, ignore_result=True, base=AsyncTask)
+    async def generate_topics_task(self, job_id: int, single_call: Optional[bool] = None):
+        """
+        Determines the genre and generates topics for a transcribed job.
+        single_call (default: settings.LLM_SINGLE_CALL_ANALYSIS) asks for both in one JSON-mode request
+        and falls back to the two-call path if the reply does not validate.
+        """
+        if single_call is None:
+            single_call = settings.LLM_SINGLE_CALL_ANALYSIS
+        logger.info(f"Starting topic generation task for job_id: {job_id} (single_call={single_call})")
         db_service = DatabaseService() # Instantiate service
         llm_service = LLMService()   # Instantiate service
+        status_writer = get_status_coalescer() # Status writes are merged and batched per worker process
         final_status = JobStatus.FAILED
         status_message = "Topic generation failed"
         generated_topics = None
         determined_genre = None
+        # Streaming mode: partial topics are persisted in batches while the completion is still running
+        partial_topics = _PartialTopicWriter(job_id, status_writer) if settings.LLM_STREAM_TOPICS else None
 
-        # --- Use Sync Session ---
-        session: SyncSession = SyncSessionLocal()
         try:
-            # 1. Get job using SYNC method
-            job = db_service.get_job_sync(session, job_id) # Use sync method
+            # 1. Get job (short-lived session: don't hold a connection across LLM calls)
+            async with worker_session() as db:
+                job = await db_service.get_job(db, job_id, columns=("status", "transcript", "condensed_transcript", "topics", "script_genre"))
             if not job:
                 raise ValueError(f"Job {job_id} not found.")
             if not job.transcript:
@@ -431,29 +676,53 @@ class LLMService:
                 generated_topics = job.topics
                 determined_genre = job.script_genre
             else:
-                # 2. Update status using SYNC method
-                db_service.update_job_status_sync(session, job_id, JobStatus.PROCESSING, "Determining script genre...")
-                session.commit() # Sync commit
-
-                # 3. Determine Genre using SYNC method (NO await)
-                determined_genre = llm_service.determine_genre(job.transcript)
-                if not determined_genre or determined_genre == "Unknown":
-                    status_message = "Could not determine script genre."
-                    final_status = JobStatus.FAILED
-                    raise ValueError(status_message)
-
-                # Update status after genre determination using SYNC method
-                db_service.update_job_sync(session, job_id, { # Use sync method
-                    "status": JobStatus.PROCESSING,
-                    "status_message": f"Genre determined: {determined_genre}. Generating topics...",
-                    "script_genre": determined_genre
-                })
-                session.commit() # Sync commit
-
-                # 4. Generate Topics using SYNC method (NO await)
-                logger.info(f"Generating topics for job {job_id} with genre '{determined_genre}'")
-                generated_topics = llm_service.generate_topics(job.transcript, determined_genre, topic_count=60) # Use correct topic_count
-
+                # Condense once per transcript; every LLM call below (and reruns of this task) reuses it
+                script = job.condensed_transcript
+                if not script:
+                    script = await llm_service.prepare_script(job.transcript)
+                    status_writer.submit(job_id, JobStatus.PROCESSING, "Transcript condensed for analysis.", condensed_transcript=script)
+
+                # 2-4a. Single-call mode: genre and topics from one structured request
+                if single_call:
+                    status_writer.submit(job_id, JobStatus.PROCESSING, "Analyzing script: genre and topics...") # Write-behind
+                    analysis = await llm_service.analyze_script(script, topic_count=60, on_topics=partial_topics)
+                    if analysis is not None:
+                        determined_genre, generated_topics = analysis.genre, analysis.topics
+                    else:
+                        logger.warning(f"Single-call analysis failed for job {job_id}; falling back to separate genre and topic calls.")
+                        if partial_topics:
+                            partial_topics.reset()
+
+                # 2-4b. Two-call path (default, or fallback)
+                if determined_genre is None:
+                    # 2. Update status
+                    status_writer.submit(job_id, JobStatus.PROCESSING, "Determining script genre...") # Write-behind
+
+                    # 3. Determine Genre
+                    determined_genre = await llm_service.determine_genre(script)
+                    if not determined_genre or determined_genre == "Unknown":
+                        status_message = "Could not determine script genre."
+                        final_status = JobStatus.FAILED
+                        raise ValueError(status_message)
+
+                    # Update status after genre determination
+                    status_writer.submit(
+                        job_id, JobStatus.PROCESSING, f"Genre determined: {determined_genre}. Generating topics...",
+                        script_genre=determined_genre,
+                    )
+
+                    # 4. Generate Topics
+                    logger.info(f"Generating topics for job {job_id} with genre '{determined_genre}'")
+                    generated_topics = await llm_service.generate_topics(
+                        script, determined_genre, topic_count=60, on_topics=partial_topics # Use correct topic_count
+                    )
+
+                if partial_topics and partial_topics.time_to_first_topic is not None:
+                    logger.info(f"Job {job_id}: time to first topic {partial_topics.time_to_first_topic:.2f}s")
+                if generated_topics and topic_ranker:
+                    # Drop near-duplicates, most novel (vs. every earlier job) first; CPU and SQLite work, so in a thread
+                    ranked = await asyncio.to_thread(topic_ranker.process, job_id, generated_topics)
+                    generated_topics = ranked.topics or generated_topics
                 if generated_topics is not None:
                     logger.info(f"Successfully generated {len(generated_topics)} topics for job {job_id}.")
                     final_status = JobStatus.COMPLETED
@@ -462,47 +731,27 @@ class LLMService:
                     status_message = "Failed to generate topics from LLM."
                     final_status = JobStatus.FAILED
 
-                # 5. Final Update within try block IF SUCCESSFUL using SYNC method
-                update_data = {
-                    "status": final_status,
-                    "status_message": status_message,
-                    "script_genre": determined_genre,
-                    "topics": generated_topics
-                }
-                update_data_cleaned = {k: v for k, v in update_data.items() if v is not None or k in ['topics','script_genre']}
-                if update_data_cleaned:
-                    db_service.update_job_sync(session, job_id, update_data_cleaned) # Use sync method
-                    session.commit() # Sync commit
-                    logger.info(f"Final status update committed successfully for job {job_id}")
+                # 5. Final Update (terminal, so written before submit returns; blocking, hence the thread)
+                await asyncio.to_thread(
+                    status_writer.submit, job_id, final_status, status_message,
+                    script_genre=determined_genre, topics=generated_topics,
+                )
+                logger.info(f"Final status update committed successfully for job {job_id}")
 
         except Exception as e:
             logger.error(f"Exception caught in generate_topics_task for job {job_id}: {str(e)}")
             status_message = "Topic generation failed due to an internal error."
             final_status = JobStatus.FAILED
-            try:
-                session.rollback() # Sync rollback
-                logger.info(f"Session rolled back for job {job_id} due to exception.")
-            except Exception as rb_err:
-                logger.error(f"Error during session rollback for job {job_id}: {str(rb_err)}")
 
             # Attempt to update DB status to FAILED in a final try
             try:
                  logger.warning(f"Attempting to mark job {job_id} as FAILED in DB after exception.")
-                 db_service.update_job_status_sync(session, job_id, JobStatus.FAILED, status_message) # Use sync method
-                 session.commit() # Sync commit
+                 # Clear streamed partial topics, otherwise the job would look like it already has topics
+                 clear_partial = {"topics": None} if partial_topics and partial_topics.persisted_any else {}
+                 await asyncio.to_thread(status_writer.submit, job_id, JobStatus.FAILED, status_message, **clear_partial)
             except Exception as final_db_err:
                  logger.error(f"CRITICAL: Failed even to update job {job_id} status to FAILED: {str(final_db_err)}")
-                 session.rollback() # Sync rollback
 
-        finally:
-            # Ensure session is always closed
-            try:
-                session.close() # Sync close
-                logger.info(f"Session closed for job {job_id}")
-            except Exception as close_err:
-                 logger.error(f"Error closing session for job {job_id}: {str(close_err)}")
-        # --- END Sync Session Management ---
-
-        logger.info(f"SYNC Task generate_topics_task completing for job {job_id}. Final determined status: {final_status.value}")
-        # Return value is ignored by Celery anyway
-        return f"Job {job_id} processing finished with status {final_status.value}"
\ No newline at end of file
+        logger.info(f"Task generate_topics_task completing for job {job_id}. Final determined status: {final_status.value}")
+        # Not stored (ignore_result), but a pipeline reads it when it runs this stage
+        return {"job_id": job_id, "status": final_status.value}
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from celery import chain, chord
+from celery.canvas import Signature
+from sqlalchemy import case, literal
+
+from app.celery_app import celery, AsyncTask, worker_session
+from app.core.config import settings
+from app.models.video_job import JobStatus, VideoJob
+from app.services.audio_normalizer import AudioNormalizer
+from app.services.database_service import DatabaseService
+from app.services.job_events import publish_job_event
+from app.services.llm_service import LLMService
+from app.services.status_coalescer import get_status_coalescer
+from app.services.transcription_service import TranscriptionService
+
+logger = logging.getLogger(__name__)
+
+Step = Union[str, Tuple[str, ...]] # One stage, or stages that only need earlier steps' output (run side by side)
+
+# Stages per source type, in order. Render and upload get appended once they exist; stages that don't
+# depend on each other go in one tuple and run as a chord, their payloads merged before the next step.
+PIPELINES: Dict[str, Tuple[Step, ...]] = {
+    "youtube_url": ("download", "normalize", "transcribe", "topics"),
+    "audio_file": ("normalize", "transcribe", "topics"),
+    "prompt": ("topics",),
+}
+
+
+# Stages that only exist to produce the transcript: done once the job has one (e.g. from the transcript cache)
+TRANSCRIPT_STAGES = ("download", "normalize", "transcribe")
+
+
+class PipelineStageError(Exception):
+    """A stage ended without what the next one needs (the stage has already marked the job FAILED)."""
+
+
+@dataclass(frozen=True)
+class Stage:
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]] # payload -> values added to the payload
+    inputs_ready: Callable[[Dict[str, Any]], bool] = lambda payload: True # False: resume from an earlier stage
+
+
+def _audio_ready(payload: Dict[str, Any]) -> bool:
+    # A failed transcription deletes the audio, so resuming there means downloading it again
+    return bool(payload.get("transcribed")) or bool(payload.get("audio_file_path")) and Path(payload["audio_file_path"]).is_file()
+
+
+def _check(stage: str, job_id: int, result: Dict[str, Any]) -> None:
+    if result.get("status") == JobStatus.FAILED.value:
+        raise PipelineStageError(f"Stage {stage} failed for job {job_id}")
+
+
+async def _download(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.input_handler import InputHandler # input_handler starts pipelines, so not at import time
+    if payload.get("transcribed"):
+        return {}
+    result = await InputHandler.download_youtube_audio_task.run(payload["job_id"], payload["source_value"], handoff=False)
+    _check("download", payload["job_id"], result)
+    if result.get("download_path") is None: # Served from the transcript cache, or streamed straight into Whisper
+        return {"transcribed": True}
+    return {"audio_file_path": result["download_path"], "cache_aliases": result["cache_aliases"]}
+
+
+async def _normalize(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload.get("transcribed"):
+        return {}
+    result = await AudioNormalizer.normalize_audio_task.run(
+        payload["job_id"], payload["audio_file_path"], payload.get("cache_aliases"), payload.get("content_key"), handoff=False,
+    )
+    return {"audio_file_path": result["audio_file_path"], "content_key": result["content_key"]}
+
+
+async def _transcribe(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload.get("transcribed"):
+        return {}
+    result = await TranscriptionService.transcribe_audio_task.run(
+        payload["job_id"], payload["audio_file_path"], payload.get("cache_aliases"), payload.get("content_key"),
+    )
+    _check("transcribe", payload["job_id"], result)
+    return {"transcribed": True, "audio_file_path": None} # The task deleted the audio
+
+
+async def _topics(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result = await LLMService.generate_topics_task.run(payload["job_id"], payload.get("single_call"))
+    _check("topics", payload["job_id"], result)
+    return {}
+
+
+STAGES: Dict[str, Stage] = {
+    "download": Stage(_download),
+    "normalize": Stage(_normalize, _audio_ready),
+    "transcribe": Stage(_transcribe, _audio_ready),
+    "topics": Stage(_topics),
+}
+
+
+def stage_names(step: Step) -> Tuple[str, ...]:
+    """The stages of one step."""
+    return (step,) if isinstance(step, str) else step
+
+
+def step_label(step: Step) -> str:
+    """"transcribe", or "a+b" for stages that run side by side."""
+    return "+".join(stage_names(step))
+
+
+def pipeline_steps(source_type: str) -> List[Step]:
+    """The steps of source_type's pipeline under the current settings."""
+    if source_type not in PIPELINES:
+        raise ValueError(f"No pipeline for source type: {source_type}")
+    skipped = set() if settings.AUDIO_NORMALIZE_ENABLED else {"normalize"}
+    steps = []
+    for step in PIPELINES[source_type]:
+        names = tuple(name for name in stage_names(step) if name not in skipped)
+        if names:
+            steps.append(names[0] if len(names) == 1 else names)
+    return steps
+
+
+def remaining_steps(payload: Dict[str, Any]) -> List[Step]:
+    """
+    Steps still to run for payload: from the first one not completed, moved back to the latest
+    step whose inputs still exist.
+    """
+    steps = pipeline_steps(payload["source_type"])
+    done = set(payload.get("completed") or ()) | (set(TRANSCRIPT_STAGES) if payload.get("transcribed") else set())
+    start = next((i for i, step in enumerate(steps) if not set(stage_names(step)) <= done), len(steps))
+    while 0 < start < len(steps) and not all(STAGES[name].inputs_ready(payload) for name in stage_names(steps[start])):
+        start -= 1
+    return steps[start:]
+
+
+def pipeline_running(state: Optional[Dict[str, Any]]) -> bool:
+    """
+    True while a job's canvas still has steps queued or running: its saved pipeline_state (written
+    when the canvas starts and after every stage) has no failed stage and steps left to run.
+    """
+    return bool(state) and not state.get("failed") and bool(remaining_steps(state))
+
+
+def new_payload(job_id: int, source_type: str, source_value: Optional[str] = None, **values: Any) -> Dict[str, Any]:
+    """
+    What travels from stage to stage (and is saved as the job's pipeline_state): the job, the stages
+    completed so far and what they produced (audio_file_path, cache_aliases, content_key, transcribed).
+    """
+    return {"job_id": job_id, "source_type": source_type, "source_value": source_value, "completed": [], "failed": None, **values}
+
+
+def job_payload(job: VideoJob) -> Dict[str, Any]:
+    """Payload to (re)run job's pipeline with: its saved state, or one built from the job's columns."""
+    if job.pipeline_state:
+        return {**job.pipeline_state, "failed": None}
+    if job.source_type == "youtube_url":
+        payload = new_payload(job.id, job.source_type, job.source_value)
+    elif job.source_type == "audio_file":
+        payload = new_payload(job.id, job.source_type, job.source_value, audio_file_path=job.source_value)
+    else:
+        payload = new_payload(job.id, job.source_type)
+    if job.transcript: # Transcribed before this job had a pipeline
+        payload["transcribed"] = True
+    if job.topics is not None:
+        payload["completed"] = ["topics"]
+    return payload
+
+
+def pipeline_signature(payload: Dict[str, Any], priority: Optional[int] = None) -> Optional[Signature]:
+    """
+    The canvas running payload's remaining steps: a chain of stage tasks, with a chord (stages, then
+    join) for each parallel step. Stages of a re-run step are cleared from payload["completed"].
+    None when every step is done. priority (a broker priority) applies to every task.
+    """
+    steps = remaining_steps(payload)
+    if not steps:
+        return None
+    rerun = {name for step in steps for name in stage_names(step)}
+    payload = {**payload, "completed": [name for name in payload.get("completed") or () if name not in rerun]}
+    options = {"priority": priority} if priority is not None else {}
+
+    signatures = []
+    for i, step in enumerate(steps):
+        args = (payload,) if i == 0 else () # The later steps get the previous step's result
+        if isinstance(step, str):
+            signatures.append(STAGE_TASKS[step].s(*args).set(**options))
+        else:
+            signatures.append(chord([STAGE_TASKS[name].s(*args).set(**options) for name in step], PipelineStages.join_task.s().set(**options)))
+    return chain(*signatures)
+
+
+def start_pipeline(job_id: int, source_type: str, source_value: Optional[str] = None, priority: Optional[int] = None, **values: Any) -> List[Step]:
+    """Starts a new job's pipeline (the job row must already be committed). Returns the steps it will run."""
+    payload = new_payload(job_id, source_type, source_value, **values)
+    workflow = pipeline_signature(payload, priority)
+    if workflow is None:
+        return []
+    workflow.apply_async()
+    steps = remaining_steps(payload)
+    logger.info(f"Started {source_type} pipeline for job {job_id}: {' -> '.join(step_label(s) for s in steps)}")
+    return steps
+
+
+async def _save_state(job_id: int, payload: Dict[str, Any], stage: Optional[str] = None) -> None:
+    """
+    Saves payload as the job's pipeline_state. While steps remain after stage's own, a job a stage
+    left COMPLETED ("Ready for topic generation") goes back to PROCESSING: the canvas isn't done
+    with it yet. (Stage's own step is still left while a side-by-side sibling runs; join decides.)
+    """
+    values: Dict[str, Any] = {"pipeline_state": payload}
+    steps = remaining_steps(payload)
+    if stage is not None: # What the canvas runs after stage's step (remaining_steps may also move back before it)
+        own = next((i for i, step in enumerate(steps) if stage in stage_names(step)), None)
+        steps = steps[own + 1:] if own is not None else steps
+    message = f"Running pipeline stage {step_label(steps[0])}..." if steps else None
+    if message:
+        finished = VideoJob.status == JobStatus.COMPLETED # Old value: both SET expressions see the row before the UPDATE
+        values["status"] = case((finished, literal(JobStatus.PROCESSING, VideoJob.status.type)), else_=VideoJob.status)
+        values["status_message"] = case((finished, message), else_=VideoJob.status_message)
+    async with worker_session() as db:
+        job = await DatabaseService().update_job(db, job_id, values)
+        reopened = job is not None and message is not None and job.status_message == message
+        await db.commit()
+    if reopened:
+        publish_job_event(job_id, JobStatus.PROCESSING, message)
+
+
+async def run_stage(stage: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs one stage of payload's pipeline and records it as completed, so a later run resumes after it.
+    Raises PipelineStageError (which stops the canvas) when the stage failed.
+    """
+    job_id = payload["job_id"]
+    if stage in payload.get("completed", ()):
+        return payload
+    logger.info(f"Job {job_id}: pipeline stage {stage}")
+    if not payload.get("completed"):
+        await _save_state(job_id, payload, stage) # A new canvas: from now on the API sees it as running (see pipeline_running)
+    try:
+        values = await STAGES[stage].run(payload)
+    except PipelineStageError:
+        await _save_state(job_id, {**payload, "failed": stage})
+        raise
+    except Exception as e:
+        logger.error(f"Pipeline stage {stage} crashed for job {job_id}: {e}", exc_info=True)
+        await asyncio.to_thread(
+            get_status_coalescer().submit, job_id, JobStatus.FAILED, f"Pipeline stage {stage} failed: {e}",
+            pipeline_state={**payload, "failed": stage},
+        ) # Terminal, written now
+        raise
+    payload = {**payload, **values, "completed": [*payload.get("completed", ()), stage], "failed": None}
+    await _save_state(job_id, payload, stage)
+    return payload
+
+
+class PipelineStages:
+    """One Celery task per stage, so each stage is routed to its own queue (see app/celery_app.py)."""
+
+    @staticmethod
+    @celery.task(name="tasks.pipeline.download", bind=True, base=AsyncTask)
+    async def download_task(self, payload: Dict[str, Any]):
+        return await run_stage("download", payload)
+
+    @staticmethod
+    @celery.task(name="tasks.pipeline.normalize", bind=True, base=AsyncTask)
+    async def normalize_task(self, payload: Dict[str, Any]):
+        return await run_stage("normalize", payload)
+
+    @staticmethod
+    @celery.task(name="tasks.pipeline.transcribe", bind=True, base=AsyncTask)
+    async def transcribe_task(self, payload: Dict[str, Any]):
+        return await run_stage("transcribe", payload)
+
+    @staticmethod
+    @celery.task(name="tasks.pipeline.topics", bind=True, base=AsyncTask)
+    async def topics_task(self, payload: Dict[str, Any]):
+        return await run_stage("topics", payload)
+
+    @staticmethod
+    @celery.task(name="tasks.pipeline.join", bind=True, base=AsyncTask)
+    async def join_task(self, payloads: List[Dict[str, Any]]):
+        """Chord body: merges the payloads of stages that ran side by side and saves the result."""
+        merged: Dict[str, Any] = {}
+        for payload in payloads:
+            merged.update(payload)
+        merged["completed"] = list(dict.fromkeys(name for payload in payloads for name in payload["completed"]))
+        await _save_state(merged["job_id"], merged)
+        return merged
+
+
+STAGE_TASKS = {
+    "download": PipelineStages.download_task,
+    "normalize": PipelineStages.normalize_task,
+    "transcribe": PipelineStages.transcribe_task,
+    "topics": PipelineStages.topics_task,
+}
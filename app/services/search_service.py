@@ -0,0 +1,117 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Float, Text, column, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import SearchUnavailableError
+from app.models.video_job import JobStatus, VideoJob
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_TOKENS = 16
+# bm25() column weights: a match in the genre or topics says more about the video than one in the transcript
+BM25_WEIGHTS = {"transcript": 1.0, "topics": 4.0, "script_genre": 2.0}
+
+# Quoted phrases, or single terms (with an optional trailing * for prefix search)
+_QUERY_TERM_RE = re.compile(r'"([^"]+)"|(\w+\*?)', re.UNICODE)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Typed result columns, so status comes back as JobStatus and created_at as datetime on every backend
+_jobs = VideoJob.__table__
+_RESULT_COLUMNS = (_jobs.c.id, _jobs.c.status, _jobs.c.script_genre, _jobs.c.created_at, column("score", Float), column("snippet", Text))
+
+_SQLITE_SEARCH = text(
+    "SELECT j.id, j.status, j.script_genre, j.created_at,"
+    f" -bm25(video_jobs_fts, {BM25_WEIGHTS['transcript']}, {BM25_WEIGHTS['topics']}, {BM25_WEIGHTS['script_genre']}) AS score,"
+    f" snippet(video_jobs_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '...', {SNIPPET_TOKENS}) AS snippet"
+    " FROM video_jobs_fts JOIN video_jobs j ON j.id = video_jobs_fts.rowid"
+    " WHERE video_jobs_fts MATCH :query"
+    " ORDER BY score DESC, j.id DESC LIMIT :limit OFFSET :offset"
+).columns(*_RESULT_COLUMNS)
+
+# The index lives on video_job_contents (see VideoJobContent); the genre is folded into it by triggers.
+# Postgres has no BM25: ts_rank_cd (cover density) over the weighted tsvector is the closest built-in.
+# ts_headline re-parses the document, so it only runs on the page of hits.
+_PG_SEARCH = text(
+    "SELECT hits.id, hits.status, hits.script_genre, hits.created_at, hits.score,"
+    " ts_headline('english', coalesce(hits.transcript, hits.topics::text, ''), hits.query,"
+    f" 'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_TOKENS + 4}, MinWords={SNIPPET_TOKENS // 2}') AS snippet"
+    " FROM (SELECT j.id, j.status, j.script_genre, j.created_at, c.transcript, c.topics, q.query,"
+    " ts_rank_cd(c.search_vector, q.query) AS score"
+    " FROM video_job_contents c JOIN video_jobs j ON j.id = c.job_id, websearch_to_tsquery('english', :query) AS q(query)"
+    " WHERE c.search_vector @@ q.query"
+    " ORDER BY score DESC, j.id DESC LIMIT :limit OFFSET :offset) AS hits"
+    " ORDER BY hits.score DESC, hits.id DESC"
+).columns(*_RESULT_COLUMNS)
+
+
+@dataclass
+class SearchHit:
+    job_id: int
+    status: JobStatus
+    script_genre: Optional[str]
+    created_at: Optional[datetime]
+    score: float # Higher is better; comparable only within one result list
+    snippet: Optional[str]
+
+
+def build_fts5_query(query: str) -> Optional[str]:
+    """
+    Turns free text into a safe FTS5 MATCH expression: every term/phrase must match (implicit AND),
+    "quoted phrases" and trailing-* prefixes are kept, and FTS5 operators/punctuation in user input
+    can't cause syntax errors. Returns None if the query has no searchable terms.
+    """
+    parts = []
+    for phrase, term in _QUERY_TERM_RE.findall(query):
+        if phrase:
+            words = _WORD_RE.findall(phrase)
+            if words:
+                parts.append('"' + " ".join(words) + '"')
+        elif term.endswith("*"):
+            parts.append(f'"{term[:-1]}"*')
+        else:
+            parts.append(f'"{term}"')
+    return " ".join(parts) or None
+
+
+class SearchService:
+    """Full-text search over job transcripts, topics and genre (SQLite FTS5 or Postgres tsvector)."""
+
+    async def search(self, db: AsyncSession, query: str, limit: int = 20, offset: int = 0) -> List[SearchHit]:
+        dialect = db.bind.dialect.name
+        if dialect == "sqlite":
+            statement, match = _SQLITE_SEARCH, build_fts5_query(query)
+        elif dialect == "postgresql":
+            statement, match = _PG_SEARCH, query.strip() or None # websearch_to_tsquery never raises on user input
+        else:
+            raise SearchUnavailableError(f"Full-text search is not supported on {dialect}.")
+        if match is None:
+            return []
+
+        try:
+            result = await db.execute(statement, {"query": match, "limit": limit, "offset": offset})
+        except (OperationalError, ProgrammingError) as e:
+            if "video_jobs_fts" in str(e) or "search_vector" in str(e):
+                logger.error(f"Full-text index missing: {e}")
+                raise SearchUnavailableError("Full-text index not found. Run 'alembic upgrade head'.") from e
+            raise
+        hits = [
+            SearchHit(
+                job_id=row.id,
+                status=row.status,
+                script_genre=row.script_genre,
+                created_at=row.created_at,
+                score=round(float(row.score), 4),
+                snippet=row.snippet,
+            )
+            for row in result
+        ]
+        logger.debug(f"Search {query!r} ({dialect}) returned {len(hits)} hits")
+        return hits
@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Union
+
+
+class SQLiteStore:
+    """
+    Base for the SQLite files shared by every API and worker process (transcript cache,
+    LLM cache, topic index). Subclasses create their tables in _create_schema, which runs
+    once per process on the first connection.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        raise NotImplementedError
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True) # Before connecting, SQLite won't create it
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None) # Autocommit; we BEGIN explicitly
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    self._create_schema(conn)
+                    self._initialized = True
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Cache helpers (counters table + LRU eviction by a size column) ---
+
+    @staticmethod
+    def _bump_counter(conn: sqlite3.Connection, name: str, amount: float = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    @staticmethod
+    def _evict_lru(conn: sqlite3.Connection, table: str, max_bytes: int) -> int:
+        """Deletes the least recently used rows of table until their sizes fit in max_bytes. Returns the count."""
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        evicted = 0
+        # Walk from least recently used until we are back under budget
+        for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY last_access ASC").fetchall():
+            if total <= max_bytes:
+                break
+            conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        return evicted
@@ -0,0 +1,270 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session as SyncSession
+
+from app.core.config import settings
+from app.database import SyncSessionLocal
+from app.models.video_job import JobStatus, VideoJob
+from app.services.database_service import content_upsert_stmt, split_job_values
+from app.services.job_events import publish_job_event
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+# Same rule as DatabaseService: None means "leave unchanged", except for these
+_NULLABLE_FIELDS = ("topics", "script_genre", "condensed_transcript")
+
+
+class StatusWriteError(RuntimeError):
+    """A terminal or flush=True update could not be committed (raised to the submitter)."""
+
+
+class _PendingJob:
+    """Merged, not yet written update for one job."""
+
+    __slots__ = ("values", "events", "submitted_at", "waiters")
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.events: List[Tuple[JobStatus, Optional[str]]] = []
+        self.submitted_at: List[float] = []
+        self.waiters: List[int] = [] # Seqs of submits blocked until the write, told if it fails
+
+
+class StatusUpdateCoalescer:
+    """
+    Write-behind buffer for job status/progress updates made by workers.
+    Updates for the same job are merged into one row update and a single writer thread
+    flushes all pending jobs in one transaction every flush_interval seconds (or earlier
+    once max_batch jobs are pending). Terminal statuses are flushed before submit() returns.
+    Status events are published after the commit, in submission order.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], SyncSession] = SyncSessionLocal,
+        flush_interval: float = 0.2,
+        max_batch: int = 100,
+        enabled: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.enabled = enabled
+        self.pid = os.getpid()
+        self._cond = threading.Condition()
+        self._pending: Dict[int, _PendingJob] = {}
+        self._submitted_seq = 0 # Bumped by every submit()
+        self._flushed_seq = 0 # Highest submit seq known to be written
+        self._flush_requested = False
+        self._errors: Dict[int, Exception] = {} # Waiting submit seq -> why its write failed
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # Stats
+        self._updates = 0
+        self._rows_written = 0
+        self._commits = 0
+        self._jobs_seen: set = set()
+        self._latencies: deque = deque(maxlen=10000) # submit -> commit, seconds
+
+    # --- Public API ---
+
+    def submit(self, job_id: int, status: JobStatus, message: Optional[str] = None, *, flush: bool = False, **fields: Any) -> None:
+        """
+        Queues an update of status/status_message (plus any other VideoJob columns in fields).
+        Blocks until it is committed when status is terminal or flush=True (use the latter before
+        handing the job to another task, so a stale pending write cannot land after the next stage's),
+        and then raises StatusWriteError if the write failed.
+        """
+        values = {"status": status, "status_message": message, **fields}
+        values = {k: v for k, v in values.items() if v is not None or k in _NULLABLE_FIELDS}
+        wait = not self.enabled or flush or status in TERMINAL_STATUSES
+        with self._cond:
+            self._ensure_thread()
+            pending = self._pending.get(job_id)
+            if pending is None:
+                pending = self._pending[job_id] = _PendingJob()
+            pending.values.update(values) # Later values win
+            pending.events.append((status, message))
+            pending.submitted_at.append(time.perf_counter())
+            self._submitted_seq += 1
+            self._updates += 1
+            seq = self._submitted_seq
+            if wait:
+                pending.waiters.append(seq)
+            if wait or len(self._pending) >= self.max_batch:
+                self._flush_requested = True
+                self._cond.notify_all()
+        if wait:
+            self._wait_for(seq, raise_error=True)
+
+    def flush(self) -> None:
+        """Writes everything submitted so far and waits for the commit."""
+        with self._cond:
+            if not self._pending:
+                return
+            seq = self._submitted_seq
+            self._flush_requested = True
+            self._cond.notify_all()
+        self._wait_for(seq)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            jobs = len(self._jobs_seen)
+            return {
+                "updates": self._updates,
+                "rows_written": self._rows_written,
+                "commits": self._commits,
+                "jobs": jobs,
+                "commits_per_job": round(self._commits / jobs, 3) if jobs else 0.0,
+                "pending_jobs": len(self._pending),
+                "p50_write_latency_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+                "p99_write_latency_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+            }
+
+    def close(self) -> None:
+        """Flushes pending updates and stops the writer thread."""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        logger.info(f"Status coalescer stopped in process {self.pid}: {self.stats()}")
+
+    # --- Writer thread ---
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="status-coalescer", daemon=True)
+            self._thread.start()
+
+    def _wait_for(self, seq: int, raise_error: bool = False) -> None:
+        with self._cond:
+            while self._flushed_seq < seq and not self._closed:
+                self._cond.wait()
+            error = self._errors.pop(seq, None) if raise_error else None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._flush_requested and not self._closed:
+                    self._cond.wait(timeout=self.flush_interval)
+                if self._closed and not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                seq = self._submitted_seq
+                self._flush_requested = False
+            if batch:
+                self._write(batch)
+            with self._cond:
+                self._flushed_seq = max(self._flushed_seq, seq)
+                self._cond.notify_all()
+
+    def _write(self, batch: Dict[int, _PendingJob]) -> None:
+        failed = set()
+        try:
+            self._write_rows(list(batch.items()))
+        except Exception as e:
+            # One bad row must not drop the whole batch: retry each job in its own transaction
+            logger.error(f"Batched status write of {len(batch)} jobs failed ({e}); retrying per job.")
+            for job_id, pending in batch.items():
+                try:
+                    self._write_rows([(job_id, pending)])
+                except Exception as row_err:
+                    logger.error(f"Failed to write status for job {job_id}: {row_err}", exc_info=True)
+                    failed.add(job_id)
+                    error = StatusWriteError(f"Status update for job {job_id} was not written: {row_err}")
+                    error.__cause__ = row_err
+                    with self._cond: # Before _flushed_seq moves past them, so the waiters see it
+                        for seq in pending.waiters:
+                            self._errors[seq] = error
+
+        for job_id, pending in batch.items():
+            if job_id in failed: # Nothing changed, so nothing to announce
+                continue
+            for status, message in pending.events:
+                publish_job_event(job_id, status, message)
+
+    def _write_rows(self, items: List[Tuple[int, _PendingJob]]) -> None:
+        # executemany needs identical key sets, so group jobs by the columns they update
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        content_groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for job_id, pending in items:
+            hot, content = split_job_values(pending.values)
+            groups.setdefault(tuple(sorted(hot)), []).append({"_job_id": job_id, **hot})
+            if content: # transcript/topics/... go to video_job_contents
+                content_groups.setdefault(tuple(sorted(content)), []).append({"job_id": job_id, **content})
+
+        table = VideoJob.__table__
+        session = self.session_factory()
+        try:
+            for rows in groups.values():
+                # SET columns come from the parameter keys; updated_at's onupdate still applies.
+                # Unversioned on purpose: these are blind writes from the task that owns the job, not
+                # read-modify-writes, and other paths (pipeline_state saves, the API) bump the version
+                # too, so a version remembered here would go stale between our own writes. The
+                # check-then-act callers (generate_topics, pipeline resume) pass expected_version.
+                stmt = update(table).where(table.c.id == bindparam("_job_id")).values(version=table.c.version + 1)
+                session.execute(stmt, rows)
+            dialect_name = session.get_bind().dialect.name
+            for columns, rows in content_groups.items():
+                session.execute(content_upsert_stmt(dialect_name, columns), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        now = time.perf_counter()
+        with self._cond:
+            self._commits += 1
+            self._rows_written += len(items)
+            for job_id, pending in items:
+                self._jobs_seen.add(job_id)
+                self._latencies.extend(now - t for t in pending.submitted_at)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+_coalescer: Optional[StatusUpdateCoalescer] = None
+_coalescer_lock = threading.Lock()
+
+
+def get_status_coalescer() -> StatusUpdateCoalescer:
+    """Returns this process's coalescer (a new one after a fork; the writer thread does not survive it)."""
+    global _coalescer
+    if _coalescer is None or _coalescer.pid != os.getpid():
+        with _coalescer_lock:
+            if _coalescer is None or _coalescer.pid != os.getpid():
+                _coalescer = StatusUpdateCoalescer(
+                    flush_interval=settings.STATUS_FLUSH_INTERVAL_MS / 1000,
+                    max_batch=settings.STATUS_FLUSH_MAX_BATCH,
+                    enabled=settings.STATUS_COALESCER_ENABLED,
+                )
+    return _coalescer
+
+
+@worker_process_shutdown.connect # Prefork children
+@worker_shutdown.connect # Thread pool workers submit from the main process; the daemon writer thread would drop pending updates
+def _close_status_coalescer(**kwargs):
+    global _coalescer
+    if _coalescer is not None and _coalescer.pid == os.getpid():
+        _coalescer.close()
+        _coalescer = None
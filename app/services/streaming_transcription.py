@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import audio_chunker
+from app.services.audio_normalizer import (
+    FRAME_MS, SAMPLE_BYTES, SAMPLE_RATE, AudioNormalizationError,
+    build_trimmer, encode_pcm, kill_process, pcm_blocks, start_decoder, wait_process,
+)
+from app.services.transcription_service import TranscriptionService
+from app.services.youtube_ingest import get_youtube_ingest, stream_source
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamedTranscript:
+    text: str
+    chunks: int
+    audio_seconds: float # Transcribed audio, after silence trimming
+    first_chunk_seconds: float # Until the first chunk was handed to Whisper
+    seconds: float
+
+
+class PCMChunker:
+    """
+    Cuts a 16 kHz mono s16le stream into chunks of at most max_seconds as it arrives. Each cut is
+    placed in the quietest 20ms frame of the chunk's last search_seconds, so no word is split and
+    the chunk transcripts can simply be joined. Holds at most one chunk of PCM.
+    """
+
+    def __init__(self, max_seconds: float = 120.0, search_seconds: float = 10.0, frame_ms: int = FRAME_MS):
+        self.frame_bytes = SAMPLE_RATE * frame_ms // 1000 * SAMPLE_BYTES
+        self._max_frames = max(2, int(max_seconds * 1000 / frame_ms))
+        self._search_frames = min(self._max_frames - 1, max(1, int(search_seconds * 1000 / frame_ms)))
+        self._buffer = bytearray()
+
+    def _cut_point(self) -> int:
+        first = self._max_frames - self._search_frames
+        window = bytes(self._buffer[first * self.frame_bytes:self._max_frames * self.frame_bytes])
+        frames = np.frombuffer(window, dtype=np.int16).reshape(self._search_frames, -1).astype(np.float32)
+        quietest = int(np.argmin(np.einsum("ij,ij->i", frames, frames)))
+        return (first + quietest) * self.frame_bytes + self.frame_bytes // 2 # Middle of that frame (whole samples)
+
+    def feed(self, pcm: bytes) -> List[bytes]:
+        """Takes whole samples; returns the chunks completed by them."""
+        self._buffer += pcm
+        chunks = []
+        while len(self._buffer) >= self._max_frames * self.frame_bytes:
+            cut = self._cut_point()
+            chunks.append(bytes(self._buffer[:cut]))
+            del self._buffer[:cut]
+        return chunks
+
+    def finish(self) -> Optional[bytes]:
+        """The last, shorter chunk (None if nothing is left)."""
+        rest, self._buffer = bytes(self._buffer), bytearray()
+        return rest or None
+
+
+async def transcribe_stream(
+    job_id: int,
+    source_url: str,
+    http_headers: Optional[Dict[str, str]] = None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> StreamedTranscript:
+    """
+    Transcribes source_url while it downloads: ffmpeg decodes it to 16 kHz mono PCM, silence is
+    trimmed, the stream is cut into STREAM_CHUNK_SECONDS chunks that are encoded like normalized
+    audio, and TRANSCRIPTION_CHUNK_CONCURRENCY consumers send them to Whisper as they come.
+    The queue between the two sides holds STREAM_QUEUE_CHUNKS chunks; when it is full the decoder
+    is no longer read, so ffmpeg (and the download) waits for Whisper instead of filling the disk.
+    on_chunk(done) is called after each transcribed chunk.
+    """
+    started = time.perf_counter()
+    codec, bitrate = settings.AUDIO_NORMALIZE_CODEC, settings.AUDIO_NORMALIZE_BITRATE
+    suffix = audio_chunker.ENCODERS[codec][0]
+    workers = max(1, settings.TRANSCRIPTION_CHUNK_CONCURRENCY)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.STREAM_QUEUE_CHUNKS))
+    trimmer = build_trimmer()
+    chunker = PCMChunker(settings.STREAM_CHUNK_SECONDS, settings.STREAM_CUT_SEARCH_SECONDS)
+    texts: Dict[int, str] = {}
+    progress = {"chunks": 0, "samples": 0, "first_chunk": None}
+
+    headers = "".join(f"{name}: {value}\r\n" for name, value in (http_headers or {}).items())
+    decoder = await start_decoder(*(["-headers", headers] if headers else []), "-i", source_url)
+    decoder_stderr = asyncio.ensure_future(decoder.stderr.read())
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f"stream_{job_id}_", dir=settings.DOWNLOAD_DIR))
+
+    async def enqueue(pcm: bytes) -> None:
+        index = progress["chunks"]
+        progress["chunks"] += 1
+        progress["samples"] += len(pcm) // SAMPLE_BYTES
+        path = await encode_pcm(pcm, tmp_dir / f"chunk_{index:04d}{suffix}", codec, bitrate)
+        await queue.put((index, path)) # Waits while every Whisper slot is busy and the queue is full
+
+    async def produce() -> None:
+        async for block in pcm_blocks(decoder.stdout):
+            for piece in (trimmer.feed(block) if trimmer else [block]):
+                for chunk in chunker.feed(piece):
+                    await enqueue(chunk)
+        for piece in (trimmer.finish() if trimmer else []):
+            for chunk in chunker.feed(piece):
+                await enqueue(chunk)
+        if (rest := chunker.finish()) is not None:
+            await enqueue(rest)
+        await wait_process(decoder, decoder_stderr, f"decode the audio of job {job_id}")
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def consume() -> None:
+        while (item := await queue.get()) is not None:
+            index, path = item
+            if progress["first_chunk"] is None:
+                progress["first_chunk"] = time.perf_counter() - started
+            texts[index] = await TranscriptionService._transcribe_file(path)
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+            logger.debug(f"Job {job_id}: streamed chunk {index} transcribed, {len(texts[index])} chars")
+            if on_chunk:
+                on_chunk(len(texts))
+
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(consume()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await kill_process(decoder)
+        decoder_stderr.cancel()
+        raise
+    finally:
+        await asyncio.to_thread(shutil.rmtree, tmp_dir, True)
+
+    if not texts:
+        raise AudioNormalizationError(f"No speech found in the audio of job {job_id}")
+    result = StreamedTranscript(
+        text=audio_chunker.stitch_transcripts([texts[i] for i in range(len(texts))], [False] * len(texts)),
+        chunks=len(texts),
+        audio_seconds=progress["samples"] / SAMPLE_RATE,
+        first_chunk_seconds=progress["first_chunk"],
+        seconds=time.perf_counter() - started,
+    )
+    logger.info(
+        f"Job {job_id}: streamed {result.audio_seconds:.0f}s of audio in {result.chunks} chunks in {result.seconds:.1f}s "
+        f"(first chunk sent after {result.first_chunk_seconds:.1f}s)"
+    )
+    return result
+
+
+async def transcribe_youtube_stream(job_id: int, youtube_url: str, on_chunk: Optional[Callable[[int], None]] = None) -> Optional[StreamedTranscript]:
+    """
+    Resolves youtube_url on the ingest engine's metadata threads and transcribes its audio with
+    transcribe_stream. Returns None when the selected format can't be read as one stream by ffmpeg
+    (the caller then downloads it the staged way).
+    """
+    info = await get_youtube_ingest().metadata(youtube_url)
+    source = stream_source(info)
+    if source is None:
+        logger.info(f"Job {job_id}: format {info.get('format_id')} ({info.get('protocol')}) can't be streamed; using the staged download.")
+        return None
+    return await transcribe_stream(job_id, *source, on_chunk=on_chunk)
@@ -0,0 +1,402 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.database import SyncSessionLocal
+from app.models.video_job import VideoJobContent
+from app.services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZES = (3, 4)
+HYPERPLANE_SEED = 20240611 # Fixed so every process hashes topics to the same codes
+BACKFILL_BATCH_SIZE = 500
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Popcount of every 16-bit value, for Hamming distances on NumPy < 2.0 (no np.bitwise_count)
+_POPCOUNT16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+def normalize_topic(topic: str) -> str:
+    text = unicodedata.normalize("NFKC", topic).lower()
+    return _WHITESPACE_RE.sub(" ", _NON_WORD_RE.sub(" ", text)).strip()
+
+
+def embed_topics(topics: Sequence[str], dim: int = 1024) -> np.ndarray:
+    """
+    L2-normalized character (UTF-8 byte) n-gram hashing vectors, shape (len(topics), dim), float32.
+    Offline and deterministic across processes (crc32, not the salted built-in hash); the sign
+    bit of the hash spreads collisions around zero instead of piling them up.
+    """
+    hashes: List[int] = []
+    counts = np.zeros(len(topics), dtype=np.int64)
+    for i, topic in enumerate(topics):
+        data = f" {normalize_topic(topic)} ".encode("utf-8")
+        before = len(hashes)
+        for n in NGRAM_SIZES:
+            hashes.extend(map(zlib.crc32, [data[j:j + n] for j in range(len(data) - n + 1)]))
+        counts[i] = len(hashes) - before
+    h = np.asarray(hashes, dtype=np.int64)
+    flat = np.repeat(np.arange(len(topics), dtype=np.int64), counts) * dim + h % dim
+    signs = np.where(h & 0x80000000, 1.0, -1.0)
+    vectors = np.bincount(flat, weights=signs, minlength=len(topics) * dim).reshape(len(topics), dim).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def dedupe_topics(topics: Sequence[str], vectors: np.ndarray, threshold: float) -> Tuple[List[int], List[List[int]]]:
+    """
+    Greedy leader clustering on the cosine similarity matrix: walking in the LLM's order, a topic
+    within threshold of an earlier kept topic joins its cluster. Returns (kept indexes, clusters).
+    """
+    similar = (vectors @ vectors.T) >= threshold
+    keep = np.ones(len(topics), dtype=bool)
+    clusters: List[List[int]] = []
+    for i in range(len(topics)):
+        if not keep[i]:
+            continue
+        members = np.flatnonzero(similar[i, i + 1:] & keep[i + 1:]) + i + 1
+        keep[members] = False
+        clusters.append([i, *members.tolist()])
+    return [cluster[0] for cluster in clusters], clusters
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).astype(np.int32)
+    return _POPCOUNT16[words.view(np.uint16)].reshape(len(words), 4).sum(axis=1, dtype=np.int32)
+
+
+def _hamming(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Hamming distance from query (words,) to every code in codes, stored word-major as (words, n)
+    uint64 so each XOR + popcount pass runs over one contiguous array.
+    """
+    distances = _popcount(codes[0] ^ query[0])
+    for w in range(1, len(query)):
+        distances += _popcount(codes[w] ^ query[w])
+    return distances
+
+
+@dataclass
+class RankedTopics:
+    topics: List[str] # Deduplicated, most novel first
+    novelty: List[float] # 1 - cosine to the closest earlier topic of another job, per returned topic
+    dropped: List[str] # Near-duplicates within the job (and of history, if configured)
+    seconds: float
+
+
+class TopicIndex(SQLiteStore):
+    """
+    Approximate nearest-neighbour index over every generated topic, shared by all processes.
+    Topics are stored in SQLite with a random-hyperplane (SimHash) binary code of their
+    n-gram vector; each process keeps the codes in a packed NumPy matrix, refreshed with only
+    the rows added since its last read. A query ranks all codes by Hamming distance
+    (vectorized XOR + popcount), then re-ranks the closest candidates by exact cosine.
+    """
+
+    def __init__(self, db_path: Union[str, Path], dim: int = 1024, bits: int = 128, candidates: int = 32, backfill_stale_seconds: float = 600.0):
+        if bits % 64:
+            raise ValueError(f"TopicIndex bits must be a multiple of 64, got {bits}")
+        super().__init__(db_path)
+        self.dim = dim
+        self.bits = bits
+        self.candidates = candidates
+        self.backfill_stale_seconds = backfill_stale_seconds
+        self.planes = np.random.default_rng(HYPERPLANE_SEED).standard_normal((dim, bits)).astype(np.float32)
+        self._lock = threading.Lock() # Guards the in-memory copy
+        self._backfill_checked = False
+        # In-memory copy of the index
+        self._codes = np.zeros((bits // 64, 0), dtype=np.uint64) # Word-major, see _hamming
+        self._job_ids = np.zeros(0, dtype=np.int64)
+        self._topics: List[str] = []
+        self._last_rowid = 0
+        self._generation = None # Bumped in the DB whenever rows are deleted; forces a full reload
+
+    # --- Storage ---
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS topics (job_id INTEGER NOT NULL, topic TEXT NOT NULL, code BLOB NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_topics_job_id ON topics (job_id)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._check_params(conn)
+
+    def _check_params(self, conn: sqlite3.Connection) -> None:
+        """Codes from another dim/bits/seed are meaningless: start over (and backfill again) if they changed."""
+        params = f"{self.dim}:{self.bits}:{HYPERPLANE_SEED}:{','.join(map(str, NGRAM_SIZES))}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+            if row is None or row[0] != params:
+                if row is not None:
+                    logger.warning(f"Topic index parameters changed ({row[0]} -> {params}); rebuilding the index.")
+                conn.execute("DELETE FROM topics")
+                conn.execute("DELETE FROM meta")
+                conn.execute("INSERT INTO meta (name, value) VALUES ('params', ?), ('generation', '0')", (params,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Sign bits of the projections onto the hyperplanes packed into uint64 words, shape (n, bits // 64)."""
+        return np.packbits((vectors @ self.planes) > 0, axis=1).view(np.uint64)
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        """Loads rows added by any process since our last read (everything after a deletion). Caller holds _lock."""
+        generation = conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()[0]
+        if generation != self._generation:
+            self._codes = self._codes[:, :0]
+            self._job_ids = self._job_ids[:0]
+            self._topics = []
+            self._last_rowid = 0
+            self._generation = generation
+        rows = conn.execute(
+            "SELECT rowid, job_id, topic, code FROM topics WHERE rowid > ? ORDER BY rowid", (self._last_rowid,)
+        ).fetchall()
+        if not rows:
+            return
+        codes = np.frombuffer(b"".join(r[3] for r in rows), dtype=np.uint64).reshape(len(rows), self.bits // 64)
+        self._codes = np.concatenate([self._codes, codes.T], axis=1)
+        self._job_ids = np.concatenate([self._job_ids, np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))])
+        self._topics.extend(r[2] for r in rows)
+        self._last_rowid = rows[-1][0]
+
+    def add(self, job_id: int, topics: Sequence[str]) -> None:
+        """Replaces the indexed topics of job_id."""
+        self.add_many([(job_id, topics)])
+
+    def add_many(self, jobs: Iterable[Tuple[int, Sequence[str]]]) -> int:
+        """Replaces the indexed topics of each (job_id, topics) in one transaction. Returns the rows written."""
+        rows = []
+        job_ids = []
+        for job_id, topics in jobs:
+            topics = [t for t in topics if isinstance(t, str) and t.strip()]
+            job_ids.append(job_id)
+            if topics:
+                codes = self.encode(embed_topics(topics, self.dim))
+                rows.extend((job_id, topic, code.tobytes()) for topic, code in zip(topics, codes))
+        if not job_ids:
+            return 0
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            deleted = 0
+            for start in range(0, len(job_ids), BACKFILL_BATCH_SIZE):
+                batch = job_ids[start:start + BACKFILL_BATCH_SIZE]
+                deleted += conn.execute(f"DELETE FROM topics WHERE job_id IN ({','.join('?' * len(batch))})", batch).rowcount
+            if deleted:
+                conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'generation'")
+            conn.executemany("INSERT INTO topics (job_id, topic, code) VALUES (?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return len(rows)
+
+    def query(self, topics: Sequence[str], vectors: Optional[np.ndarray] = None, exclude_job_id: Optional[int] = None) -> List[Tuple[Optional[str], float]]:
+        """For each topic, the closest indexed topic (of another job) and its cosine similarity; (None, 0.0) if none."""
+        if vectors is None:
+            vectors = embed_topics(topics, self.dim)
+        conn = self._connect()
+        try:
+            with self._lock:
+                self._refresh(conn)
+                codes, job_ids, indexed = self._codes, self._job_ids, self._topics
+        finally:
+            conn.close()
+
+        results: List[Tuple[Optional[str], float]] = []
+        if not len(indexed):
+            return [(None, 0.0)] * len(topics)
+        excluded = np.flatnonzero(job_ids == exclude_job_id) if exclude_job_id is not None else None
+        max_distance = self.bits + 1
+        for code, vector in zip(self.encode(vectors), vectors):
+            distances = _hamming(codes, code)
+            if excluded is not None:
+                distances[excluded] = max_distance
+            k = min(self.candidates, len(distances))
+            candidates = np.argpartition(distances, k - 1)[:k]
+            candidates = candidates[distances[candidates] < max_distance]
+            if not len(candidates):
+                results.append((None, 0.0))
+                continue
+            # Exact re-rank: re-embedding a few dozen short strings is cheaper than storing 100k dense vectors
+            similarities = embed_topics([indexed[i] for i in candidates], self.dim) @ vector
+            best = int(np.argmax(similarities))
+            results.append((indexed[candidates[best]], float(similarities[best])))
+        return results
+
+    def ensure_backfilled(self) -> None:
+        """
+        Indexes the topics of every existing job once. The first process to get here claims the
+        backfill and renews the claim after every batch; a claim left stale by a dead process is
+        taken over, and a failed backfill releases its claim so a later call retries.
+        """
+        if self._backfill_checked:
+            return
+        claim = self._claim_backfill()
+        if claim is None:
+            return
+
+        started = time.perf_counter()
+        total = 0
+        try:
+            with SyncSessionLocal() as db:
+                last_id = 0
+                while True:
+                    batch = db.execute(
+                        select(VideoJobContent.job_id, VideoJobContent.topics)
+                        .where(VideoJobContent.job_id > last_id, VideoJobContent.topics.isnot(None))
+                        .order_by(VideoJobContent.job_id)
+                        .limit(BACKFILL_BATCH_SIZE)
+                    ).all()
+                    if not batch:
+                        break
+                    total += self.add_many((job_id, topics) for job_id, topics in batch if isinstance(topics, list))
+                    last_id = batch[-1][0]
+                    claim = self._set_backfill_state(claim, f"running:{time.time():.0f}") or claim
+            self._set_backfill_state(None, "done")
+        except BaseException:
+            try:
+                conn = self._connect()
+                try: # Release the claim (unless another process took it over); add_many is idempotent, so a retry is safe
+                    conn.execute("DELETE FROM meta WHERE name = 'backfilled' AND value = ?", (claim,))
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to release the topic index backfill claim: {e}")
+            raise
+        self._backfill_checked = True
+        logger.info(f"Topic index backfilled with {total} topics in {time.perf_counter() - started:.1f}s")
+
+    def _claim_backfill(self) -> Optional[str]:
+        """Returns our claim on the backfill, or None when it is done or another live process holds it."""
+        claim = f"running:{time.time():.0f}"
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'backfilled'").fetchone()
+            if row is None:
+                # Claim the backfill so concurrent processes don't all run it
+                claimed = conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('backfilled', ?)", (claim,)).rowcount
+            elif row[0] == "done":
+                self._backfill_checked = True
+                return None
+            else:
+                # 'running:<last renewal>' ('running' alone predates renewals and counts as stale)
+                renewed = row[0].partition(":")[2]
+                if renewed.isdigit() and time.time() - int(renewed) < self.backfill_stale_seconds:
+                    return None # Someone else is backfilling; check again on the next call
+                # Only the process whose UPDATE still sees the stale value takes it over
+                claimed = conn.execute("UPDATE meta SET value = ? WHERE name = 'backfilled' AND value = ?", (claim, row[0])).rowcount
+                if claimed:
+                    logger.warning(f"Taking over a stale topic index backfill claim ({row[0]}).")
+        finally:
+            conn.close()
+        return claim if claimed else None
+
+    def _set_backfill_state(self, claim: Optional[str], value: str) -> Optional[str]:
+        """Sets the backfill state (only while we still hold claim, if given); returns value if it was written."""
+        conn = self._connect()
+        try:
+            if claim is None:
+                written = conn.execute("UPDATE meta SET value = ? WHERE name = 'backfilled'", (value,)).rowcount
+            else:
+                written = conn.execute("UPDATE meta SET value = ? WHERE name = 'backfilled' AND value = ?", (value, claim)).rowcount
+        finally:
+            conn.close()
+        return value if written else None
+
+    def size(self) -> int:
+        conn = self._connect()
+        try:
+            with self._lock:
+                self._refresh(conn)
+                return len(self._topics)
+        finally:
+            conn.close()
+
+
+class TopicRanker:
+    """
+    Post-processing for generated topics: drops near-duplicates within the job and ranks the
+    rest by novelty against every topic generated before (for any job), then indexes them.
+    """
+
+    def __init__(self, index: TopicIndex, dedup_threshold: float = 0.8, history_threshold: float = 0.85, drop_history_duplicates: bool = False):
+        self.index = index
+        self.dedup_threshold = dedup_threshold
+        self.history_threshold = history_threshold
+        self.drop_history_duplicates = drop_history_duplicates # Otherwise they are only ranked last
+
+    def process(self, job_id: int, topics: Sequence[str]) -> RankedTopics:
+        started = time.perf_counter()
+        topics = [t for t in topics if t and t.strip()]
+        if not topics:
+            return RankedTopics([], [], [], 0.0)
+        vectors = embed_topics(topics, self.index.dim)
+        kept, clusters = dedupe_topics(topics, vectors, self.dedup_threshold)
+        dropped = [topics[i] for cluster in clusters for i in cluster[1:]]
+
+        try:
+            self.index.ensure_backfilled()
+            nearest = self.index.query([topics[i] for i in kept], vectors[kept], exclude_job_id=job_id)
+        except (sqlite3.Error, OSError, SQLAlchemyError) as e: # SQLAlchemyError: the backfill reads the jobs database
+            # Ranking is an optimisation only: keep the deduplicated LLM order
+            logger.error(f"Topic index unavailable for job {job_id}: {e}")
+            nearest = [(None, 0.0)] * len(kept)
+
+        ranked = []
+        for position, (i, (match, similarity)) in enumerate(zip(kept, nearest)):
+            if similarity >= self.history_threshold:
+                logger.debug(f"Job {job_id}: topic {topics[i]!r} repeats earlier topic {match!r} ({similarity:.2f})")
+                if self.drop_history_duplicates:
+                    dropped.append(topics[i])
+                    continue
+            # Already-covered topics last, then most novel first; ties keep the LLM's order
+            ranked.append((similarity >= self.history_threshold, -(1.0 - similarity), position, topics[i]))
+        ranked.sort()
+        result = RankedTopics(
+            topics=[r[3] for r in ranked],
+            novelty=[round(-r[1], 4) for r in ranked],
+            dropped=dropped,
+            seconds=time.perf_counter() - started,
+        )
+
+        try:
+            self.index.add(job_id, result.topics)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Failed to index topics of job {job_id}: {e}")
+        logger.info(
+            f"Job {job_id}: kept {len(result.topics)}/{len(topics)} topics "
+            f"({len(result.dropped)} near-duplicates dropped) in {result.seconds * 1000:.0f}ms"
+        )
+        return result
+
+
+# Shared instance (None when disabled in settings)
+topic_ranker: Optional[TopicRanker] = (
+    TopicRanker(
+        TopicIndex(settings.TOPIC_INDEX_PATH, dim=settings.TOPIC_EMBED_DIM, bits=settings.TOPIC_INDEX_BITS,
+                   backfill_stale_seconds=settings.TOPIC_INDEX_BACKFILL_STALE_SECONDS),
+        dedup_threshold=settings.TOPIC_DEDUP_THRESHOLD,
+        history_threshold=settings.TOPIC_HISTORY_THRESHOLD,
+        drop_history_duplicates=settings.TOPIC_DROP_HISTORY_DUPLICATES,
+    )
+    if settings.TOPIC_RANKER_ENABLED else None
+)
@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+from app.core.config import settings
+from app.services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024 # Stream the audio through the hash in 1MB chunks
+
+# YouTube video IDs are always 11 chars from this alphabet
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def hash_audio_file(path: Union[str, Path]) -> str:
+    """Returns the sha256 hex digest of a file without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_youtube_video_id(url: str) -> Optional[str]:
+    """
+    Extracts the canonical 11-char video ID from the common YouTube URL shapes
+    (watch?v=, youtu.be/, shorts/, embed/, live/). Returns None if not recognised.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if _VIDEO_ID_RE.match(url): # Bare video ID
+        return url
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+
+    candidate = None
+    if host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif host in ("youtube.com", "music.youtube.com", "youtube-nocookie.com"):
+        if parsed.path == "/watch":
+            candidate = (parse_qs(parsed.query).get("v") or [None])[0]
+        else:
+            parts = [p for p in parsed.path.split("/") if p]
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                candidate = parts[1]
+
+    if candidate and _VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+class TranscriptCache(SQLiteStore):
+    """
+    Content-addressed transcript cache stored in SQLite so every worker process shares it.
+    Entries are evicted least-recently-used once the stored transcripts exceed max_bytes.
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_bytes: int):
+        super().__init__(db_path)
+        self.max_bytes = max_bytes
+
+    # --- Key builders ---
+
+    @staticmethod
+    def content_key(audio_digest: str, model: str, response_format: str) -> str:
+        return f"audio:{audio_digest}:{model}:{response_format}"
+
+    @staticmethod
+    def video_key(video_id: str, model: str, response_format: str) -> str:
+        return f"youtube:{video_id}:{model}:{response_format}"
+
+    def key_for_file(self, path: Union[str, Path], model: str, response_format: str) -> str:
+        return self.content_key(hash_audio_file(path), model, response_format)
+
+    # --- Storage ---
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            " key TEXT PRIMARY KEY,"
+            " transcript TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_transcripts_last_access ON transcripts (last_access)")
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached transcript for key (touching its LRU timestamp) or None."""
+        return self.get_any([key])
+
+    def get_any(self, keys: Iterable[str]) -> Optional[str]:
+        """
+        Returns the cached transcript of the first key (in order) that has one, with a single
+        SELECT ... IN; the lookup counts as one hit or one miss however many keys it tried.
+        """
+        keys = list(dict.fromkeys(key for key in keys if key)) # Dedupe, keep the preference order
+        if not keys:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                rows = dict(conn.execute(
+                    f"SELECT key, transcript FROM transcripts WHERE key IN ({', '.join('?' * len(keys))})", keys,
+                ).fetchall())
+                key = next((key for key in keys if key in rows), None)
+                if key is not None:
+                    conn.execute("UPDATE transcripts SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._bump_counter(conn, "hits")
+                    logger.info(f"Transcript cache HIT for key {key}")
+                    return rows[key]
+                self._bump_counter(conn, "misses")
+                logger.debug(f"Transcript cache MISS for keys {keys}")
+                return None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # The cache is an optimisation only, never fail the job because of it
+            logger.error(f"Transcript cache lookup failed for keys {keys}: {e}")
+            return None
+
+    def put(self, keys: Union[str, Iterable[str]], transcript: str) -> None:
+        """Stores transcript under one or more keys, then evicts LRU entries over the size budget."""
+        if not transcript:
+            return
+        if isinstance(keys, str):
+            keys = [keys]
+        size = len(transcript.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"Transcript of {size} bytes exceeds cache budget; not caching.")
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO transcripts (key, transcript, size, created_at, last_access) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET transcript = excluded.transcript, size = excluded.size, "
+                    "last_access = excluded.last_access",
+                    [(key, transcript, size, now, now) for key in keys],
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store transcript in cache: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        evicted = self._evict_lru(conn, "transcripts", self.max_bytes)
+        if evicted:
+            self._bump_counter(conn, "evictions", evicted)
+            logger.info(f"Transcript cache evicted {evicted} entries to stay under {self.max_bytes} bytes")
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Hit/miss counters shared across all processes using this cache file."""
+        try:
+            conn = self._connect()
+            try:
+                counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+                entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read transcript cache stats: {e}")
+            return {}
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Shared instance (None when disabled in settings)
+transcript_cache: Optional[TranscriptCache] = (
+    TranscriptCache(settings.TRANSCRIPT_CACHE_PATH, settings.TRANSCRIPT_CACHE_MAX_BYTES)
+    if settings.TRANSCRIPT_CACHE_ENABLED else None
+)
@@ -0,0 +1,212 @@
+import logging
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError: # Optional: without it token counts are estimated from the character count
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4 # Estimate used when tiktoken is unavailable
+TOKENIZER_ENCODING = "cl100k_base" # gpt-3.5-turbo / gpt-4 family
+GAP_MARKER = " [...] " # Joins non-adjacent selected sentences
+GAP_MARKER_TOKENS = 3
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# Hesitations and verbal tics that carry no content (comma-delimited "like" / "you know" only)
+_FILLER_RE = re.compile(r"\b(?:(?:u+h*m+|u+h+|e+r+m+|a+h+|hmm+|mhm)\b,?|(?:you know|i mean|like),)\s*", re.IGNORECASE)
+_REPEATED_WORD_RE = re.compile(r"\b(\w+)(?:[\s,]+\1\b)+", re.IGNORECASE) # "the the the" -> "the"
+_SPACES_RE = re.compile(r"[ \t]{2,}")
+
+STOPWORDS = frozenset(
+    "a about after all also am an and any are as at be because been but by can could did do does doing don't "
+    "for from get got had has have he her here him his how i i'm if in into is it it's its just know let's like "
+    "me more my no not now of off oh ok okay on one or our out over really right so some such than that that's "
+    "the their them then there these they this those to too up us very was we we're well were what when where "
+    "which who will with would yeah yes you you're your".split()
+)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e: # e.g. BPE file not cached and no network
+        logger.warning(f"tiktoken encoding unavailable ({e}); estimating token counts from characters.")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Local token count: tiktoken when installed, else ~4 characters per token."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode_ordinary(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class CondensedTranscript:
+    text: str
+    input_tokens: int
+    output_tokens: int
+    sentences: int # After filler removal and de-duplication
+    selected: int
+    seconds: float
+
+
+class TranscriptCondenser:
+    """
+    Extractive summary of a whole transcript under a token budget, replacing "first N characters".
+    Filler words and repeated sentences are dropped, each sentence is scored by the cosine of its
+    TF-IDF vector to the transcript centroid (computed with NumPy bincounts over the term
+    occurrences, so O(tokens)) and the best sentences are picked per section of the transcript,
+    so the summary covers the beginning, middle and end. Selected sentences keep their order.
+    """
+
+    def __init__(self, token_budget: int = 1000, section_tokens: int = 150, min_sentence_words: int = 3, max_sentence_words: int = 40):
+        self.token_budget = token_budget
+        self.sections = max(1, token_budget // section_tokens) # Coverage: one share of the budget per section
+        self.min_sentence_words = min_sentence_words
+        self.max_sentence_words = max_sentence_words # Unpunctuated (Whisper) text is cut into windows this long
+
+    def fits(self, text: str) -> bool:
+        return count_tokens(text) <= self.token_budget
+
+    def condense_text(self, text: str) -> str:
+        """condense(text).text; text that already fits the budget is returned unchanged."""
+        return self.condense(text).text
+
+    def condense(self, text: str) -> CondensedTranscript:
+        started = time.perf_counter()
+        input_tokens = count_tokens(text)
+        if input_tokens <= self.token_budget:
+            return CondensedTranscript(text, input_tokens, input_tokens, 0, 0, time.perf_counter() - started)
+
+        sentences = self._sentences(text)
+        if not sentences:
+            return CondensedTranscript("", input_tokens, 0, 0, 0, time.perf_counter() - started)
+        token_counts = np.fromiter((count_tokens(s) for s in sentences), dtype=np.int64, count=len(sentences))
+        scores = self._scores([_WORD_RE.findall(s.lower()) for s in sentences])
+        selected = self._select(scores, token_counts)
+        condensed = self._join(sentences, selected)
+        output_tokens = count_tokens(condensed)
+        while output_tokens > self.token_budget and selected.any():
+            # Tokens merging across joins can overshoot the estimate slightly: drop the weakest sentence
+            chosen = np.flatnonzero(selected)
+            selected[chosen[np.argmin(scores[chosen])]] = False
+            condensed = self._join(sentences, selected)
+            output_tokens = count_tokens(condensed)
+
+        result = CondensedTranscript(
+            condensed, input_tokens, output_tokens, len(sentences), int(selected.sum()), time.perf_counter() - started
+        )
+        logger.info(
+            f"Condensed transcript {result.input_tokens} -> {result.output_tokens} tokens "
+            f"({result.selected}/{result.sentences} sentences) in {result.seconds * 1000:.0f}ms"
+        )
+        return result
+
+    @staticmethod
+    def _join(sentences: List[str], selected: np.ndarray) -> str:
+        parts: List[str] = []
+        previous = None
+        for i in np.flatnonzero(selected):
+            if previous is not None:
+                parts.append(" " if i == previous + 1 else GAP_MARKER)
+            parts.append(sentences[i])
+            previous = i
+        return "".join(parts)
+
+    def _sentences(self, text: str) -> List[str]:
+        """Splits into sentences (windows for unpunctuated text), strips filler and drops repeats and fragments."""
+        text = _REPEATED_WORD_RE.sub(r"\1", _FILLER_RE.sub("", text))
+        sentences: List[str] = []
+        seen = set()
+        for raw in _SENTENCE_SPLIT_RE.split(text):
+            words = _SPACES_RE.sub(" ", raw).strip().split(" ")
+            for start in range(0, len(words), self.max_sentence_words):
+                window = words[start:start + self.max_sentence_words]
+                if len(window) < self.min_sentence_words:
+                    continue
+                sentence = " ".join(window)
+                key = " ".join(_WORD_RE.findall(sentence.lower()))
+                if key in seen: # Repeated intros, catchphrases, sponsor reads
+                    continue
+                seen.add(key)
+                sentences.append(sentence)
+        return sentences
+
+    @staticmethod
+    def _scores(sentence_words: List[List[str]]) -> np.ndarray:
+        """Cosine similarity of each sentence's TF-IDF vector to the (normalized) centroid of all of them."""
+        n = len(sentence_words)
+        vocab = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        counts: List[int] = []
+        for i, words in enumerate(sentence_words):
+            for word, count in Counter(w for w in words if w not in STOPWORDS).items():
+                rows.append(i)
+                cols.append(vocab.setdefault(word, len(vocab)))
+                counts.append(count)
+        if not cols:
+            return np.zeros(n)
+
+        # Sparse (sentence, term) matrix as coordinate arrays; every reduction is a bincount
+        rows_a = np.asarray(rows, dtype=np.int64)
+        cols_a = np.asarray(cols, dtype=np.int64)
+        tf = 1.0 + np.log(np.asarray(counts, dtype=np.float64))
+        df = np.bincount(cols_a, minlength=len(vocab))
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        weights = tf * idf[cols_a]
+        norms = np.sqrt(np.bincount(rows_a, weights=weights * weights, minlength=n))
+        weights /= norms[rows_a]
+        centroid = np.bincount(cols_a, weights=weights, minlength=len(vocab))
+        centroid /= np.linalg.norm(centroid) or 1.0
+        return np.bincount(rows_a, weights=weights * centroid[cols_a], minlength=n)
+
+    def _select(self, scores: np.ndarray, token_counts: np.ndarray) -> np.ndarray:
+        """Greedy by score within each section's share of the budget, then leftover budget by global score."""
+        budget = self.token_budget
+        # Reserve room for gap markers between selected runs (at most one per selected sentence)
+        average = max(1.0, float(token_counts.mean()))
+        budget -= int(budget / (average + GAP_MARKER_TOKENS) * GAP_MARKER_TOKENS)
+        starts = np.cumsum(token_counts) - token_counts
+        sections = np.minimum(starts * self.sections // max(1, int(token_counts.sum())), self.sections - 1)
+        share = budget / self.sections
+
+        selected = np.zeros(len(scores), dtype=bool)
+        spent = np.zeros(self.sections)
+        used = 0
+        for i in np.lexsort((-scores, sections)): # Sections in order, best sentence first within each
+            cost = token_counts[i]
+            if spent[sections[i]] + cost <= share:
+                selected[i] = True
+                spent[sections[i]] += cost
+                used += cost
+        for i in np.argsort(-scores, kind="stable"):
+            if not selected[i] and used + token_counts[i] <= budget:
+                selected[i] = True
+                used += token_counts[i]
+        return selected
+
+
+# Shared instance (None when disabled: LLM calls fall back to the start of the transcript)
+transcript_condenser: Optional[TranscriptCondenser] = (
+    TranscriptCondenser(settings.TRANSCRIPT_CONDENSE_TOKEN_BUDGET, settings.TRANSCRIPT_CONDENSE_SECTION_TOKENS)
+    if settings.TRANSCRIPT_CONDENSE_ENABLED else None
+)
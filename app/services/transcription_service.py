@@ -1,123 +1,223 @@
+import asyncio
 import logging
 import os
+import shutil
 import tempfile
 from pathlib import Path
+from typing import List, Optional
+import httpx
 from openai import AsyncOpenAI # Use Async client
 
-from app.celery_app import celery
+from app.celery_app import celery, AsyncTask, worker_resource
 from app.core.config import settings
-from app.services.database_service import DatabaseService # Import service class
 from app.models.video_job import JobStatus # Import enum
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import AsyncSessionLocal # Import session factory for task
+from app.services.transcript_cache import transcript_cache
+from app.services import audio_chunker
+from app.services.status_coalescer import get_status_coalescer
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client (consider doing this once globally if possible)
 # Ensure API key is loaded via settings
 if not settings.OPENAI_API_KEY:
     logger.warning("OPENAI_API_KEY not found in settings. Transcription will fail.")
-    # raise ValueError("OPENAI_API_KEY must be configured") # Or handle gracefully
-    client = None
-else:
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+
+def _build_client() -> AsyncOpenAI:
+    # Keep-alive pool sized for chunked transcription; uploads can take minutes
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, http_client=http_client)
+
+
+def get_client() -> Optional[AsyncOpenAI]:
+    """Returns the OpenAI client owned by this worker's event loop (created once per process)."""
+    if not settings.OPENAI_API_KEY:
+        return None
+    return worker_resource("openai_async_client", _build_client, closer=lambda c: c.close())
+
+# Whisper request parameters (also part of the transcript cache key)
+WHISPER_MODEL = "whisper-1"
+WHISPER_RESPONSE_FORMAT = "text"
 
 
 class TranscriptionService:
     """Handles audio transcription using OpenAI Whisper."""
 
     @staticmethod
-    @celery.task(name="tasks.transcribe_audio", bind=True) # Use bind=True to access task instance
-    async def transcribe_audio_task(self, job_id: int, audio_file_path_str: str):
+    async def _transcribe_file(audio_file_path: Path) -> str:
+        """Sends a single file to Whisper and returns the plain text transcript."""
+        # OpenAI library handles reading the file in chunks
+        response = await get_client().audio.transcriptions.create(
+            model=WHISPER_MODEL,
+            file=audio_file_path, # Pass Path object directly
+            response_format=WHISPER_RESPONSE_FORMAT # Get plain text transcript
+        )
+        # With response_format='text' the v1+ library returns the transcript as a str
+        if isinstance(response, str):
+            return response
+        # Handle potential structured responses if format changes ('json', 'verbose_json' etc.)
+        logger.warning(f"Unexpected Whisper response type: {type(response)}")
+        return getattr(response, "text", None) or str(response) # Fallback
+
+    @staticmethod
+    async def _plan_transcription(audio_file_path: Path):
+        """
+        Returns the chunk plan [(start, end), ...] for long/large audio,
+        or None when the file should go to Whisper in a single request.
+        """
+        if not settings.TRANSCRIPTION_CHUNKING_ENABLED:
+            return None
+        too_large = audio_file_path.stat().st_size > settings.WHISPER_MAX_UPLOAD_BYTES
+        try:
+            duration = await audio_chunker.probe_duration(audio_file_path)
+            if duration <= settings.TRANSCRIPTION_CHUNK_MAX_SECONDS and not too_large:
+                return None
+            silences = await audio_chunker.detect_silences(audio_file_path)
+        except (audio_chunker.AudioChunkingError, OSError) as e:
+            if too_large:
+                raise
+            logger.warning(f"Could not plan chunks for {audio_file_path} ({e}); sending it as a single request.")
+            return None
+        return audio_chunker.plan_chunks(
+            duration, silences,
+            max_chunk_seconds=settings.TRANSCRIPTION_CHUNK_MAX_SECONDS,
+            overlap_seconds=settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+        )
+
+    @staticmethod
+    async def _transcribe_chunked(job_id: int, audio_file_path: Path, chunks) -> str:
+        """
+        Transcribes the planned chunks concurrently (bounded by TRANSCRIPTION_CHUNK_CONCURRENCY)
+        on the shared client and stitches the text back together in order.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.TRANSCRIPTION_CHUNK_CONCURRENCY))
+        # Chunks of normalized audio keep its compact encoding instead of growing back to 64k MP3
+        codec, bitrate = ("mp3", "64k")
+        if settings.AUDIO_NORMALIZE_ENABLED:
+            codec, bitrate = settings.AUDIO_NORMALIZE_CODEC, settings.AUDIO_NORMALIZE_BITRATE
+        suffix = audio_chunker.ENCODERS[codec][0]
+        logger.info(f"Job {job_id}: transcribing {len(chunks)} chunks with concurrency {settings.TRANSCRIPTION_CHUNK_CONCURRENCY}")
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f"chunks_{job_id}_", dir=settings.DOWNLOAD_DIR))
+
+        async def transcribe_chunk(index: int, start: float, end: float) -> str:
+            async with semaphore: # Bounds both ffmpeg work and in-flight API requests
+                chunk_path = await audio_chunker.export_chunk(
+                    audio_file_path, start, end, tmp_dir / f"chunk_{index:04d}{suffix}", bitrate=bitrate, codec=codec
+                )
+                text = await TranscriptionService._transcribe_file(chunk_path)
+                logger.debug(f"Job {job_id}: chunk {index} ({start:.1f}s-{end:.1f}s) transcribed, {len(text)} chars")
+                return text
+
+        tasks = [asyncio.ensure_future(transcribe_chunk(i, s, e)) for i, (s, e) in enumerate(chunks)]
+        try:
+            texts = await asyncio.gather(*tasks)
+        except BaseException:
+            # One chunk failed: stop the others' ffmpeg exports and Whisper calls before removing their files
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await asyncio.to_thread(shutil.rmtree, tmp_dir, True) # Off the shared loop
+
+        overlapped = [False] + [chunks[i][0] < chunks[i - 1][1] for i in range(1, len(chunks))]
+        return audio_chunker.stitch_transcripts(texts, overlapped)
+
+    @staticmethod
+    @celery.task(name="tasks.transcribe_audio", bind=True, base=AsyncTask) # Use bind=True to access task instance
+    async def transcribe_audio_task(self, job_id: int, audio_file_path_str: str, cache_aliases: Optional[List[str]] = None, content_key: Optional[str] = None):
         """
         Celery task to transcribe audio file using Whisper API.
         Updates job status and stores transcript in DB.
+        cache_aliases are extra transcript cache keys (e.g. the YouTube video key) to store the result under.
+        content_key is the file's transcript cache key when the caller already hashed it (uploads).
         """
         logger.info(f"Starting transcription task for job_id: {job_id}")
-        db_service = DatabaseService() # Instantiate service inside task
         audio_file_path = Path(audio_file_path_str)
         transcript_text = None
         final_status = JobStatus.FAILED
         status_message = "Transcription failed"
 
-        # Use AsyncSessionLocal for database operations within the async task
-        async with AsyncSessionLocal() as db:
+        status_writer = get_status_coalescer()
+        try:
+            if not audio_file_path.is_file():
+                raise FileNotFoundError(f"Audio file not found at path: {audio_file_path}")
+
+            # 1. Check the transcript cache before paying for Whisper
+            cache_keys = list(cache_aliases or [])
+            if transcript_cache:
+                if content_key is None:
+                    # Hash off the loop thread; other tasks share this loop
+                    content_key = await asyncio.to_thread(transcript_cache.key_for_file, audio_file_path, WHISPER_MODEL, WHISPER_RESPONSE_FORMAT)
+                cache_keys.insert(0, content_key)
+                transcript_text = await asyncio.to_thread(transcript_cache.get_any, cache_keys) # SQLite I/O off the worker loop too
+
+            if transcript_text:
+                logger.info(f"Using cached transcript for job {job_id}. Transcript length: {len(transcript_text)}")
+                final_status = JobStatus.COMPLETED
+                status_message = "Transcription successful (cached). Ready for topic generation."
+                # Make sure every alias points at the transcript for next time
+                await asyncio.to_thread(transcript_cache.put, cache_keys, transcript_text)
+                return {"job_id": job_id, "status": final_status.value, "transcript_length": len(transcript_text), "cached": True}
+
+            # 2. Update Job Status to PROCESSING
+            status_writer.submit(job_id, JobStatus.PROCESSING, "Starting transcription...") # Write-behind
+
+            if not get_client():
+                 raise ValueError("OpenAI client not initialized. Check API Key.")
+
+            logger.info(f"Transcribing file: {audio_file_path} for job {job_id}")
+
+            # 3. Call Whisper API, chunked and in parallel for long audio
+            chunks = await TranscriptionService._plan_transcription(audio_file_path)
+            if chunks:
+                status_writer.submit(job_id, JobStatus.PROCESSING, f"Transcribing {len(chunks)} audio chunks...")
+                transcript_text = await TranscriptionService._transcribe_chunked(job_id, audio_file_path, chunks)
+            else:
+                transcript_text = await TranscriptionService._transcribe_file(audio_file_path)
+
+            if transcript_text:
+                logger.info(f"Transcription successful for job {job_id}. Transcript length: {len(transcript_text)}")
+                final_status = JobStatus.COMPLETED # Mark as COMPLETED (ready for next step)
+                status_message = "Transcription successful. Ready for topic generation."
+                if transcript_cache and cache_keys:
+                    await asyncio.to_thread(transcript_cache.put, cache_keys, transcript_text)
+            else:
+                logger.error(f"Transcription failed for job {job_id} - empty response received.")
+                status_message = "Transcription failed: Empty response from API."
+
+
+        except FileNotFoundError as e:
+            logger.error(f"Transcription Error (Job {job_id}): {e}", exc_info=True)
+            status_message = f"Transcription failed: {e}"
+        except Exception as e:
+            logger.error(f"Transcription Error (Job {job_id}): {e}", exc_info=True)
+            # Check for specific API errors if needed
+            status_message = f"Transcription failed: {e}"
+            final_status = JobStatus.FAILED
+
+        finally:
+            # 4. Update Job Status and Store Transcript/Error
+            # Terminal status: the coalescer writes it (merged with any pending progress) before returning
+            await asyncio.to_thread(
+                status_writer.submit, job_id, final_status, status_message,
+                transcript=transcript_text,
+                condensed_transcript=None, # Recomputed from the new transcript by topic generation
+                transcript_fetched=True, # Mark transcript step as attempted/done
+            )
+            logger.info(f"Final status for job {job_id}: {final_status.value}")
+
+
+            # 5. Clean up the downloaded/uploaded audio file
             try:
-                # 1. Update Job Status to PROCESSING
-                await db_service.update_job_status(db, job_id, JobStatus.PROCESSING, "Starting transcription...")
-                await db.commit() # Commit status update
-
-                if not client:
-                     raise ValueError("OpenAI client not initialized. Check API Key.")
-
-                if not audio_file_path.is_file():
-                    raise FileNotFoundError(f"Audio file not found at path: {audio_file_path}")
-
-                logger.info(f"Transcribing file: {audio_file_path} for job {job_id}")
-
-                # 2. Call Whisper API
-                # OpenAI library handles reading the file in chunks
-                async with await client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file_path, # Pass Path object directly
-                    response_format="text" # Get plain text transcript
-                ) as response:
-                     # The response object itself might be the string in v1+ library when format is 'text'
-                     # Need to confirm exact handling with latest openai package version
-                     # Assuming response directly contains the text here
-                     if isinstance(response, str):
-                         transcript_text = response
-                     else:
-                         # Handle potential future structured responses if format changes
-                         # or if using 'json', 'verbose_json' etc.
-                         logger.warning(f"Unexpected Whisper response type: {type(response)}")
-                         # Attempt to extract text if possible, adjust based on actual response structure
-                         transcript_text = str(response) # Fallback
-
-                if transcript_text:
-                    logger.info(f"Transcription successful for job {job_id}. Transcript length: {len(transcript_text)}")
-                    final_status = JobStatus.COMPLETED # Mark as COMPLETED (ready for next step)
-                    status_message = "Transcription successful. Ready for topic generation."
-                else:
-                    logger.error(f"Transcription failed for job {job_id} - empty response received.")
-                    status_message = "Transcription failed: Empty response from API."
-
-
-            except FileNotFoundError as e:
-                logger.error(f"Transcription Error (Job {job_id}): {e}", exc_info=True)
-                status_message = f"Transcription failed: {e}"
-            except Exception as e:
-                logger.error(f"Transcription Error (Job {job_id}): {e}", exc_info=True)
-                # Check for specific API errors if needed
-                status_message = f"Transcription failed: {e}"
-                final_status = JobStatus.FAILED
-                # Ensure db session rollbacks on general error if commit wasn't reached
-                await db.rollback()
-
-            finally:
-                # 3. Update Job Status and Store Transcript/Error
-                try:
-                    update_data = {
-                        "status": final_status,
-                        "status_message": status_message,
-                        "transcript": transcript_text,
-                        "transcript_fetched": True # Mark transcript step as attempted/done
-                    }
-                    await db_service.update_job(db, job_id, update_data)
-                    await db.commit() # Commit final status and transcript/error
-                    logger.info(f"Final status for job {job_id}: {final_status.value}")
-                except Exception as db_err:
-                     logger.error(f"Failed to update final job status for job {job_id}: {db_err}", exc_info=True)
-                     await db.rollback() # Rollback if final update fails
-
-
-                # 4. Clean up the downloaded/uploaded audio file
-                try:
-                    if audio_file_path.is_file():
-                        os.remove(audio_file_path)
-                        logger.info(f"Cleaned up temporary audio file: {audio_file_path}")
-                except OSError as e:
-                    logger.error(f"Error cleaning up audio file {audio_file_path}: {e}", exc_info=True)
+                if audio_file_path.is_file():
+                    os.remove(audio_file_path)
+                    logger.info(f"Cleaned up temporary audio file: {audio_file_path}")
+            except OSError as e:
+                logger.error(f"Error cleaning up audio file {audio_file_path}: {e}", exc_info=True)
 
         return {"job_id": job_id, "status": final_status.value, "transcript_length": len(transcript_text or "")}
 
@@ -0,0 +1,138 @@
+import asyncio
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable, BinaryIO, List, Optional
+
+from app.core.config import settings
+from app.core.exceptions import UploadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: Optional[str] # Hex digest, computed while writing (transcript cache content key); None if not hashed
+    seconds: float
+
+
+class _HashingFileSink:
+    """Owns the destination file and the running sha256; every method runs on a worker thread."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.digest = hashlib.sha256()
+        self._file = open(path, "wb", buffering=0) # Chunks are already large; skip the userspace buffer
+
+    def write(self, data) -> None:
+        self.digest.update(data) # hashlib releases the GIL on large buffers
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+
+    def write_parts(self, parts: List[bytes]) -> None:
+        self.write(parts[0] if len(parts) == 1 else b"".join(parts))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def discard(self) -> None:
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+def check_declared_size(declared: Optional[int], max_bytes: int) -> None:
+    """Rejects an upload from its Content-Length / multipart size before any of it is read."""
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLargeError(declared, max_bytes)
+
+
+async def stream_to_file(
+    chunks: AsyncIterable[bytes],
+    path: Path,
+    max_bytes: int = settings.UPLOAD_MAX_BYTES,
+    write_chunk_bytes: int = settings.UPLOAD_WRITE_CHUNK_BYTES,
+) -> StoredUpload:
+    """
+    Writes an async byte stream (e.g. Request.stream()) to path without blocking the event loop:
+    small network chunks are gathered into write_chunk_bytes buffers that are hashed and written on
+    a worker thread, with one write in flight while the next buffer is received. Raises
+    UploadTooLargeError as soon as more than max_bytes arrive; the partial file is removed on any error.
+    """
+    started = time.perf_counter()
+    sink = await asyncio.to_thread(_HashingFileSink, path)
+    pending: Optional[asyncio.Future] = None
+    parts: List[bytes] = []
+    buffered = 0
+    size = 0
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(size, max_bytes)
+            parts.append(chunk)
+            buffered += len(chunk)
+            if buffered >= write_chunk_bytes:
+                if pending is not None:
+                    await pending
+                pending = asyncio.ensure_future(asyncio.to_thread(sink.write_parts, parts))
+                parts, buffered = [], 0
+        if pending is not None:
+            await pending
+            pending = None
+        if parts:
+            await asyncio.to_thread(sink.write_parts, parts)
+        await asyncio.to_thread(sink.close)
+    except BaseException:
+        if pending is not None:
+            await asyncio.wait([pending]) # Let the in-flight write finish before deleting the file
+        await asyncio.to_thread(sink.discard)
+        raise
+
+    stored = StoredUpload(path, size, sink.digest.hexdigest(), time.perf_counter() - started)
+    logger.info(f"Stored upload {path.name}: {size / 2**20:.1f}MB in {stored.seconds:.2f}s")
+    return stored
+
+
+def copy_to_file(source: BinaryIO, path: Path, max_bytes: int = settings.UPLOAD_MAX_BYTES) -> StoredUpload:
+    """
+    Blocking copy of an already spooled file (a multipart UploadFile.file) to path; run it with
+    asyncio.to_thread. The bytes move in the kernel (sendfile), so nothing is hashed: hashing here
+    made the request cost more CPU than the old in-loop copy (benchmarks/bench_upload.py), and
+    the transcription task hashes the stored file when it gets no content key.
+    """
+    started = time.perf_counter()
+    source.flush() # SpooledTemporaryFile.fileno() rolls a small in-memory upload over to disk
+    source_fd = source.fileno()
+    size = os.fstat(source_fd).st_size
+    if size > max_bytes:
+        raise UploadTooLargeError(size, max_bytes)
+    try:
+        with open(path, "wb") as target:
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(target.fileno(), source_fd, offset, size - offset)
+                    if not sent:
+                        break
+                    offset += sent
+            except OSError as e:
+                if offset or e.errno not in (errno.EINVAL, errno.ENOTSOCK, errno.ENOSYS):
+                    raise
+                source.seek(0) # No sendfile to a regular file on this platform
+                shutil.copyfileobj(source, target, settings.UPLOAD_WRITE_CHUNK_BYTES)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    stored = StoredUpload(path, size, None, time.perf_counter() - started)
+    logger.info(f"Stored upload {path.name}: {size / 2**20:.1f}MB in {stored.seconds:.2f}s")
+    return stored
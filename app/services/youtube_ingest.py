@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yt_dlp
+
+from app.celery_app import worker_resource
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# What the Whisper API accepts as is (https://platform.openai.com/docs/guides/speech-to-text)
+WHISPER_CONTAINERS = {"m4a", "mp4", "webm", "mp3", "ogg", "oga", "wav", "flac", "mpeg", "mpga"}
+WHISPER_CODECS = ("mp4a", "aac", "opus", "vorbis", "mp3", "flac") # acodec prefixes
+TRANSCODE_POSTPROCESSOR = {
+    'key': 'FFmpegExtractAudio', # Extract audio
+    'preferredcodec': 'mp3', # Convert to mp3
+    'preferredquality': '192', # Audio quality
+}
+PROGRESS_LOG_STEP = 10 # Percent
+STREAMABLE_PROTOCOLS = {"http", "https", "m3u8", "m3u8_native"} # ffmpeg can read these straight from the URL
+
+
+@dataclass
+class IngestResult:
+    path: Path
+    video_id: Optional[str]
+    title: Optional[str]
+    duration: Optional[float] # Seconds, when the source reports it
+    ext: str
+    acodec: Optional[str]
+    transcoded: bool # False when the downloaded stream was kept as is
+    size: int
+    metadata_seconds: float # Includes the wait for a free metadata thread
+    download_seconds: float # Includes the wait for a free download slot
+
+
+@dataclass
+class _JobProgress:
+    job_id: int
+    downloaded: Optional[str] = None # 'finished' progress hook: the file the downloader wrote
+    final: Optional[str] = None # 'finished' postprocessor hook: where the file ended up
+    logged_percent: int = -PROGRESS_LOG_STEP
+
+
+def needs_transcode(info: Dict[str, Any]) -> bool:
+    """True unless the selected format is a single audio-only stream Whisper can take without conversion."""
+    if info.get("requested_formats"): # Separate video + audio streams would have to be merged
+        return True
+    acodec = (info.get("acodec") or "").lower()
+    return not (
+        info.get("vcodec") == "none"
+        and info.get("ext") in WHISPER_CONTAINERS
+        and (acodec.startswith(WHISPER_CODECS) or acodec in ("", "unknown")) # Direct links often don't report the codec
+    )
+
+
+def stream_source(info: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, str]]]:
+    """(url, http_headers) ffmpeg can read the selected format from, or None (merged formats, DASH fragments...)."""
+    if info.get("requested_formats") or info.get("protocol") not in STREAMABLE_PROTOCOLS or not info.get("url"):
+        return None
+    return info["url"], dict(info.get("http_headers") or {})
+
+
+class YouTubeIngest:
+    """
+    Downloads audio with YoutubeDL instances kept warm per pool thread, so extractor state (player
+    JS / signature caches) and the HTTP connection pool survive from one job to the next.
+    Metadata lookups run on their own threads ahead of the download slots: a queued job has its
+    format chosen (and unavailable videos fail) while earlier downloads are still running.
+    Fragmented (HLS/DASH) sources are fetched with concurrent_fragments connections, and m4a/webm-opus
+    audio is kept as downloaded instead of being re-encoded to MP3.
+    The output path comes from the 'finished' hooks, never from looking for files on disk.
+    """
+
+    def __init__(
+        self,
+        download_dir: Path,
+        download_workers: int = 4,
+        metadata_workers: int = 4,
+        concurrent_fragments: int = 4,
+        audio_format: str = "bestaudio/best",
+        skip_reencode: bool = True,
+        extra_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.download_dir = Path(download_dir)
+        self.concurrent_fragments = concurrent_fragments
+        self.audio_format = audio_format
+        self.skip_reencode = skip_reencode
+        self.extra_options = extra_options or {}
+        self._metadata_pool = ThreadPoolExecutor(max_workers=metadata_workers, thread_name_prefix="yt-metadata")
+        self._download_pool = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="yt-download")
+        self._local = threading.local()
+        self._clients: List[yt_dlp.YoutubeDL] = [] # Every instance, for close()
+        self._clients_lock = threading.Lock()
+        self._jobs: Dict[str, _JobProgress] = {} # By job tag (hooks can run on yt-dlp's fragment threads)
+        self._stats = {"downloads": 0, "transcoded": 0, "kept_as_is": 0, "failures": 0, "clients": 0}
+
+    def _options(self, transcode: bool) -> Dict[str, Any]:
+        options = {
+            'format': self.audio_format,
+            'outtmpl': str(self.download_dir / "youtube_%(job_tag)s.%(ext)s"), # job_tag is set per download
+            'noplaylist': True, # Don't download playlists if URL points to one
+            'concurrent_fragment_downloads': self.concurrent_fragments,
+            'quiet': True,
+            'noprogress': True,
+            'logger': logging.getLogger('yt_dlp'), # Integrate with our logging
+            'progress_hooks': [self._on_progress],
+            'postprocessor_hooks': [self._on_postprocess],
+            **self.extra_options,
+        }
+        if transcode:
+            options['postprocessors'] = [TRANSCODE_POSTPROCESSOR]
+        return options
+
+    def _client(self, transcode: bool = False) -> yt_dlp.YoutubeDL:
+        """This thread's YoutubeDL for the given mode, created on first use and reused afterwards."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if transcode not in clients:
+            client = yt_dlp.YoutubeDL(self._options(transcode))
+            clients[transcode] = client
+            with self._clients_lock:
+                self._clients.append(client)
+                self._stats["clients"] += 1
+        return clients[transcode]
+
+    def _on_progress(self, d: Dict[str, Any]) -> None:
+        progress = self._jobs.get((d.get("info_dict") or {}).get("job_tag"))
+        if progress is None:
+            return
+        if d["status"] == "downloading":
+            total = d.get("total_bytes") or d.get("total_bytes_estimate")
+            if total and d.get("downloaded_bytes"):
+                percent = int(d["downloaded_bytes"] * 100 / total)
+                if percent >= progress.logged_percent + PROGRESS_LOG_STEP: # Log every ~10%, not every chunk
+                    progress.logged_percent = percent
+                    logger.debug(f"Job {progress.job_id} Download Progress: {percent}% at {d.get('speed') or 0:.0f} B/s, ETA: {d.get('eta')}s")
+        elif d["status"] == "finished":
+            progress.downloaded = d.get("filename")
+            logger.info(f"yt-dlp finished downloading for job {progress.job_id}. Filename: {progress.downloaded}")
+        elif d["status"] == "error":
+            logger.error(f"yt-dlp reported an error for job {progress.job_id}.")
+
+    def _on_postprocess(self, d: Dict[str, Any]) -> None:
+        info = d.get("info_dict") or {}
+        progress = self._jobs.get(info.get("job_tag"))
+        if progress is not None and d["status"] == "finished" and info.get("filepath"):
+            progress.final = info["filepath"] # The last postprocessor (MoveFiles) reports the final location
+
+    def _extract(self, url: str) -> Dict[str, Any]:
+        info = self._client().extract_info(url, download=False)
+        if info is None:
+            raise yt_dlp.utils.DownloadError(f"No media found at {url}")
+        if info.get("_type") == "playlist": # noplaylist still yields a playlist for pure playlist URLs
+            raise yt_dlp.utils.DownloadError(f"{url} is a playlist, not a single video")
+        return info
+
+    def _download(self, job_tag: str, info: Dict[str, Any], transcode: bool) -> None:
+        info["job_tag"] = job_tag
+        self._client(transcode).process_ie_result(info, download=True)
+
+    async def metadata(self, url: str) -> Dict[str, Any]:
+        """url's info dict with the audio format already selected (no download)."""
+        return await asyncio.get_running_loop().run_in_executor(self._metadata_pool, self._extract, url)
+
+    async def download_audio(self, job_id: int, url: str) -> IngestResult:
+        """
+        Resolves url's metadata, then downloads its audio into download_dir as youtube_<job_id>_<uuid>.<ext>.
+        Raises yt_dlp.utils.DownloadError for download failures and FileNotFoundError if yt-dlp
+        reports success without an output file.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        info = await self.metadata(url)
+        metadata_done = time.perf_counter()
+        transcode = not self.skip_reencode or needs_transcode(info)
+        logger.info(
+            f"Job {job_id}: {info.get('id')} format {info.get('format_id')} ({info.get('ext')}, {info.get('acodec')}), "
+            f"{'transcoding to mp3' if transcode else 'keeping as is'}"
+        )
+
+        job_tag = f"{job_id}_{uuid.uuid4()}"
+        progress = self._jobs[job_tag] = _JobProgress(job_id)
+        try:
+            await loop.run_in_executor(self._download_pool, self._download, job_tag, info, transcode)
+        except Exception:
+            self._stats["failures"] += 1
+            raise
+        finally:
+            self._jobs.pop(job_tag, None)
+
+        output = progress.final or progress.downloaded
+        path = Path(output) if output else None
+        if path is None or not path.is_file():
+            self._stats["failures"] += 1
+            raise FileNotFoundError(f"yt-dlp finished job {job_id} without an output file ({output})")
+        self._stats["downloads"] += 1
+        self._stats["transcoded" if transcode else "kept_as_is"] += 1
+        return IngestResult(
+            path=path,
+            video_id=info.get("id"),
+            title=info.get("title"),
+            duration=info.get("duration"),
+            ext=path.suffix.lstrip("."),
+            acodec="mp3" if transcode else info.get("acodec"),
+            transcoded=transcode,
+            size=path.stat().st_size,
+            metadata_seconds=metadata_done - started,
+            download_seconds=time.perf_counter() - metadata_done,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    def close(self) -> None:
+        """Stops the pools (waiting for running downloads) and closes every YoutubeDL."""
+        self._metadata_pool.shutdown(wait=True, cancel_futures=True)
+        self._download_pool.shutdown(wait=True, cancel_futures=True)
+        with self._clients_lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing yt-dlp client: {e}")
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
+
+
+def _build_ingest() -> YouTubeIngest:
+    return YouTubeIngest(
+        download_dir=settings.DOWNLOAD_DIR,
+        download_workers=settings.YTDLP_DOWNLOAD_WORKERS,
+        metadata_workers=settings.YTDLP_METADATA_WORKERS,
+        concurrent_fragments=settings.YTDLP_CONCURRENT_FRAGMENTS,
+        audio_format=settings.YTDLP_AUDIO_FORMAT,
+        skip_reencode=settings.YTDLP_SKIP_REENCODE,
+    )
+
+
+def get_youtube_ingest() -> YouTubeIngest:
+    """The worker loop's shared ingest engine. Call from coroutines on the worker loop."""
+    return worker_resource("youtube_ingest", _build_ingest, lambda ingest: ingest.aclose())
@@ -0,0 +1,59 @@
+"""
+Starts a Celery worker for one profile of the queue topology in app/celery_app.py.
+
+    python -m app.worker download        # download queue, threads sized to the yt-dlp slots
+    python -m app.worker api             # transcription and llm queues on a thread pool
+    python -m app.worker cpu             # audio and render queues (and unrouted tasks), prefork
+    python -m app.worker llm -c 64       # a single queue, with a different concurrency
+    python -m app.worker all             # every queue in one prefork worker (development)
+    python -m app.worker cpu -- --max-tasks-per-child 100
+
+Arguments after "--" are passed to `celery worker` as they are.
+"""
+import argparse
+import shlex
+import sys
+from typing import List, Optional
+
+from app.celery_app import celery, worker_profiles
+
+
+def worker_argv(profile_name: str, concurrency: Optional[int] = None, pool: Optional[str] = None,
+                prefetch_multiplier: Optional[int] = None, loglevel: str = "INFO", extra: Optional[List[str]] = None) -> List[str]:
+    """The `celery worker` arguments for profile_name, with optional overrides."""
+    profile = worker_profiles()[profile_name]
+    return [
+        "worker",
+        "--queues", ",".join(profile.queues),
+        "--pool", pool or profile.pool,
+        "--concurrency", str(concurrency or profile.concurrency),
+        "--prefetch-multiplier", str(prefetch_multiplier or profile.prefetch_multiplier),
+        "--hostname", f"{profile_name}@%h", # Distinct node names, so several profiles can run on one host
+        "--loglevel", loglevel,
+        *(extra or []),
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    extra: List[str] = []
+    if "--" in argv:
+        argv, extra = argv[:argv.index("--")], argv[argv.index("--") + 1:]
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("profile", choices=sorted(worker_profiles()))
+    parser.add_argument("-c", "--concurrency", type=int, help="Threads or processes (default from the profile)")
+    parser.add_argument("-P", "--pool", help="Override the profile's pool (threads, prefork, solo)")
+    parser.add_argument("--prefetch-multiplier", type=int)
+    parser.add_argument("-l", "--loglevel", default="INFO")
+    parser.add_argument("--print", action="store_true", help="Print the celery command instead of starting the worker")
+    args = parser.parse_args(argv)
+
+    worker_args = worker_argv(args.profile, args.concurrency, args.pool, args.prefetch_multiplier, args.loglevel, extra)
+    if args.print:
+        print(shlex.join(["celery", "-A", "app.celery_app", *worker_args]))
+        return
+    celery.worker_main(worker_args)
+
+
+if __name__ == "__main__":
+    main()
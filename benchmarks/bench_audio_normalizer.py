@@ -0,0 +1,147 @@
+"""
+Upload size and transcription latency with and without the audio normalization stage.
+
+    python benchmarks/bench_audio_normalizer.py --minutes 60 --latency-per-mb 2.0
+
+Synthesizes a speech-like fixture (syllable-rate noise bursts, short pauses between phrases, a
+few long pauses, silence at both ends) and encodes it as 44.1 kHz stereo 192k MP3, which is what
+the YouTube path used to hand to transcription. The fixture is then:
+  original    uploaded as is
+  normalized  streamed through normalize_file (16 kHz mono, silence trimmed, AUDIO_NORMALIZE_CODEC)
+              and then uploaded
+Both uploads go to the local fake OpenAI server, whose transcription latency is base +
+latency-per-mb * upload size (transfer plus processing, as Whisper roughly behaves), so "e2e" is
+normalization time + request latency. Python heap peak (tracemalloc) during normalization shows
+memory does not grow with the length of the audio. Needs ffmpeg on PATH.
+"""
+import argparse
+import asyncio
+import http.client
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+from benchmarks.fake_openai_server import serve # noqa: E402
+
+FIXTURE_RATE = 44100
+PORT = 8765
+
+
+def speech_like(seconds: float, rnd: np.random.Generator) -> np.ndarray:
+    """One phrase: noise bursts with a ~4 Hz syllable envelope around -20 dBFS."""
+    n = int(seconds * FIXTURE_RATE)
+    t = np.arange(n) / FIXTURE_RATE
+    envelope = np.clip(np.sin(2 * np.pi * rnd.uniform(3, 5) * t), 0.15, None)
+    return rnd.standard_normal(n) * envelope * 32768 * 0.1
+
+
+def fixture_blocks(minutes: float, rnd: np.random.Generator):
+    """Yields float mono blocks of the fixture, phrase by phrase (never the whole thing in memory)."""
+    floor = lambda seconds: rnd.standard_normal(int(seconds * FIXTURE_RATE)) * 32768 * 10 ** (-65 / 20)
+    yield floor(5.0) # Intro silence
+    remaining = minutes * 60 - 15.0
+    while remaining > 0:
+        phrase = min(rnd.uniform(2, 8), remaining)
+        pause = rnd.uniform(10, 20) if rnd.random() < 0.03 else rnd.uniform(0.2, 1.0)
+        yield speech_like(phrase, rnd)
+        yield floor(pause)
+        remaining -= phrase + pause
+    yield floor(10.0) # Outro silence
+
+
+def make_fixture(path: Path, minutes: float, codec_args=("-c:a", "libmp3lame", "-b:a", "192k")) -> None:
+    encoder = subprocess.Popen(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-f", "s16le", "-ar", str(FIXTURE_RATE), "-ac", "2",
+         "-i", "-", *codec_args, str(path)],
+        stdin=subprocess.PIPE,
+    )
+    for block in fixture_blocks(minutes, np.random.default_rng(0)):
+        mono = np.clip(block, -32768, 32767).astype(np.int16)
+        encoder.stdin.write(np.repeat(mono, 2).tobytes()) # Same signal on both channels
+    encoder.stdin.close()
+    if encoder.wait() != 0:
+        raise RuntimeError("ffmpeg failed to encode the fixture")
+
+
+def transcribe(path: Path) -> float:
+    """POSTs path to the fake Whisper endpoint as multipart form data; returns the request latency."""
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"model\"\r\n\r\nwhisper-1\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{path.name}\"\r\n"
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    body = head + path.read_bytes() + f"\r\n--{boundary}--\r\n".encode()
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=3600)
+    conn.request("POST", "/v1/audio/transcriptions", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    conn.getresponse().read()
+    conn.close()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--base-latency", type=float, default=0.3)
+    parser.add_argument("--latency-per-mb", type=float, default=2.0)
+    parser.add_argument("--no-trim", action="store_true", help="Resample/re-encode only")
+    args = parser.parse_args()
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg not found on PATH")
+
+    from app.core.config import settings
+    from app.services.audio_normalizer import SilenceTrimmer, normalize_file
+    from app.services.audio_chunker import ENCODERS
+
+    tmp = Path(tempfile.mkdtemp())
+    src = tmp / "fixture.mp3"
+    started = time.perf_counter()
+    make_fixture(src, args.minutes)
+    print(f"{args.minutes:.0f}-minute fixture: {src.stat().st_size / 2**20:.1f}MB 192k stereo MP3 (built in {time.perf_counter() - started:.0f}s)")
+
+    trimmer = None if args.no_trim else SilenceTrimmer(
+        threshold_db=settings.AUDIO_SILENCE_THRESHOLD_DB,
+        pad_seconds=settings.AUDIO_SILENCE_PAD_SECONDS,
+        max_pause_seconds=settings.AUDIO_MAX_PAUSE_SECONDS,
+    )
+    dst = tmp / f"fixture.normalized{ENCODERS[settings.AUDIO_NORMALIZE_CODEC][0]}"
+    tracemalloc.start()
+    result = asyncio.run(normalize_file(src, dst, settings.AUDIO_NORMALIZE_CODEC, settings.AUDIO_NORMALIZE_BITRATE, trimmer))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"normalization: {result.seconds:.1f}s ({result.input_seconds / result.seconds:.0f}x realtime), "
+          f"audio {result.input_seconds / 60:.1f} -> {result.output_seconds / 60:.1f} min, Python heap peak {peak / 2**20:.1f}MB")
+
+    server = serve(PORT, base_latency=args.base_latency, latency_per_mb=args.latency_per_mb)
+    try:
+        rows = [
+            ("original", src.stat().st_size, 0.0, transcribe(src)),
+            (f"normalized ({settings.AUDIO_NORMALIZE_CODEC} {settings.AUDIO_NORMALIZE_BITRATE})", result.output_bytes, result.seconds, transcribe(dst)),
+        ]
+    finally:
+        server.shutdown()
+    print(f"\n{'upload':26s} {'bytes':>9s} {'normalize':>10s} {'request':>9s} {'e2e':>8s}")
+    for name, size, prep, request in rows:
+        print(f"{name:26s} {size / 2**20:8.1f}M {prep:9.1f}s {request:8.1f}s {prep + request:7.1f}s")
+    print(f"upload bytes -{100 * (1 - rows[1][1] / rows[0][1]):.1f}%, e2e latency {rows[1][2] + rows[1][3] - rows[0][3]:+.1f}s")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+One-by-one job submission (InputHandler.process_new_job, one transaction per job, as
+POST /jobs does) vs InputHandler.process_bulk_jobs (one multi-row INSERT ... RETURNING).
+
+    python benchmarks/bench_bulk_submit.py --jobs 500
+
+Uses a throwaway SQLite file; only prompt jobs are submitted so no broker is needed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+from sqlalchemy import event # noqa: E402
+
+from app.database import Base, async_engine, AsyncSessionLocal # noqa: E402
+from app.models import VideoJob # noqa: E402,F401
+from app.services.input_handler import InputHandler # noqa: E402
+
+statements = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count(*args, **kwargs):
+    global statements
+    statements += 1
+
+
+async def main(n: int) -> None:
+    global statements
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    handler = InputHandler()
+    prompts = [f"Prompt number {i} about something interesting." for i in range(n)]
+
+    statements = 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        async with AsyncSessionLocal() as db: # One request = one session + commit
+            await handler.process_new_job(db, "prompt", prompt)
+            await db.commit()
+    one_by_one = time.perf_counter() - start
+    print(f"one-by-one: {n} jobs in {one_by_one:.3f}s ({n / one_by_one:8.1f} jobs/s, {statements / n:.1f} statements/job)")
+
+    statements = 0
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await handler.process_bulk_jobs(db, [("prompt", p) for p in prompts])
+    bulk = time.perf_counter() - start
+    print(f"bulk      : {n} jobs in {bulk:.3f}s ({n / bulk:8.1f} jobs/s, {statements} statements total)")
+    print(f"speedup   : {one_by_one / bulk:.1f}x")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=500)
+    asyncio.run(main(parser.parse_args().jobs))
@@ -0,0 +1,69 @@
+"""
+Single-request vs chunked/parallel transcription against the local fake OpenAI server.
+
+    python benchmarks/bench_chunked_transcription.py --minutes 60 --concurrency 1 2 4 8
+
+Needs ffmpeg/ffprobe on PATH (used to synthesise the fixture and to cut chunks).
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:8765/v1")
+
+from benchmarks.fake_openai_server import serve # noqa: E402
+
+
+def make_fixture(path: Path, minutes: int) -> None:
+    """Tone bursts separated by short silences, so silencedetect finds cut points."""
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={minutes * 60}",
+        "-af", "volume='if(lt(mod(t,20),19),1,0)':eval=frame",
+        "-ac", "1", "-ar", "16000", "-b:a", "64k", str(path),
+    ], check=True)
+
+
+async def run(path: Path, concurrency_levels) -> None:
+    from app.core.config import settings
+    from app.services.transcription_service import TranscriptionService
+
+    start = time.perf_counter()
+    await TranscriptionService._transcribe_file(path)
+    print(f"single request          : {time.perf_counter() - start:7.2f}s")
+
+    chunks = await TranscriptionService._plan_transcription(path)
+    for level in concurrency_levels:
+        settings.TRANSCRIPTION_CHUNK_CONCURRENCY = level
+        start = time.perf_counter()
+        await TranscriptionService._transcribe_chunked(0, path, chunks)
+        print(f"{len(chunks):3d} chunks, concurrency {level:2d}: {time.perf_counter() - start:7.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--chunk-seconds", type=float, default=300.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    os.environ["TRANSCRIPTION_CHUNK_MAX_SECONDS"] = str(args.chunk_seconds)
+    server = serve(8765)
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = Path(tmp) / "fixture.mp3"
+        make_fixture(fixture, args.minutes)
+        print(f"fixture: {args.minutes} min, {fixture.stat().st_size / 1e6:.1f} MB")
+        asyncio.run(run(fixture, args.concurrency))
+    server.shutdown()
@@ -0,0 +1,179 @@
+"""
+Storage size and status-query cost with the transcript/topics blobs inline in video_jobs vs
+split out to video_job_contents.
+
+    python benchmarks/bench_content_split.py --jobs 20000 --words 2000
+
+Builds two throwaway SQLite files with the same jobs: "inline" is the old video_jobs layout
+(transcript, condensed_transcript, topics and editor_data declared between the small columns,
+as the old model did) and "split" is the current schema from the models. Reports per-table
+page counts (dbstat), the latency of the status queries the API and workers run, and the
+time and WAL bytes written by a batch of status-only updates.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+STATUSES = ["PENDING", "PROCESSING", "COMPLETED", "FAILED"]
+
+QUERIES = {
+    # GET /jobs/{id}/status?fields=status_message (the poll)
+    "status by id": ("SELECT id, status, status_message FROM video_jobs WHERE id = ?", lambda rnd, n: (rnd.randint(1, n),)),
+    # GET /jobs?status=... first page (keyset index, then the rows)
+    "list page": (
+        "SELECT id, created_at, updated_at, source_type, status, status_message, transcript_fetched, script_genre"
+        " FROM video_jobs WHERE status = ? ORDER BY created_at DESC, id DESC LIMIT 20",
+        lambda rnd, n: (rnd.choice(STATUSES),),
+    ),
+    # Anything that has to look at every row (e.g. an ad-hoc filter on status_message)
+    "full scan": ("SELECT count(*) FROM video_jobs WHERE status_message LIKE ?", lambda rnd, n: ("%retry%",)),
+}
+
+
+def ddl(split: bool):
+    """CREATE statements for the current (split) schema or the old inline layout."""
+    import sqlalchemy as sa
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateIndex, CreateTable
+    from app.models.video_job import VideoJob, VideoJobContent
+
+    jobs = VideoJob.__table__
+    tables = [jobs, VideoJobContent.__table__]
+    if not split:
+        contents = VideoJobContent.__table__.c
+        order = []
+        for column in jobs.columns:
+            order.append(column)
+            if column.name == "source_value":
+                order.append(contents.transcript)
+            elif column.name == "transcript_fetched":
+                order.append(contents.condensed_transcript)
+            elif column.name == "script_genre":
+                order.extend((contents.topics, contents.editor_data))
+        columns = [sa.Column(c.name, c.type, primary_key=c.primary_key and c.table is jobs) for c in order]
+        inline = sa.Table("video_jobs", sa.MetaData(), *columns)
+        for index in jobs.indexes:
+            sa.Index(index.name, *(inline.c[c.name] for c in index.columns), unique=index.unique)
+        tables = [inline]
+    statements = []
+    for table in tables:
+        statements.append(str(CreateTable(table).compile(dialect=sqlite.dialect())))
+        statements.extend(str(CreateIndex(index).compile(dialect=sqlite.dialect())) for index in table.indexes)
+    return statements
+
+
+def build(path: Path, split: bool, jobs, args) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0") # So the WAL size measures what an update batch writes
+    for statement in ddl(split):
+        conn.execute(statement)
+    conn.execute("BEGIN")
+    hot_columns = "id, created_at, updated_at, version, source_type, source_value, transcript_fetched, status, status_message, script_genre"
+    content_columns = "transcript, condensed_transcript, topics, editor_data"
+    if split:
+        conn.executemany(f"INSERT INTO video_jobs ({hot_columns}) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)", [j[:9] for j in jobs])
+        conn.executemany(f"INSERT INTO video_job_contents (job_id, {content_columns}) VALUES (?, ?, ?, ?, ?)", [(j[0], *j[9:]) for j in jobs])
+    else:
+        conn.executemany(f"INSERT INTO video_jobs ({hot_columns}, {content_columns}) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", jobs)
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return conn
+
+
+def pages(conn) -> dict:
+    """Pages per table/index; overflow pages are the parts of long values that don't fit in a row's page."""
+    result = {}
+    for name, pagetype, count in conn.execute("SELECT name, pagetype, count(*) FROM dbstat GROUP BY name, pagetype"):
+        entry = result.setdefault(name, {"pages": 0, "overflow": 0})
+        entry["pages"] += count
+        if pagetype == "overflow":
+            entry["overflow"] += count
+    return result
+
+
+def timed(conn, sql, make_params, rnd, n, repeat) -> float:
+    times = []
+    for _ in range(repeat):
+        params = make_params(rnd, n)
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=2000, help="Words per transcript (~6 characters each)")
+    parser.add_argument("--updates", type=int, default=2000, help="Status-only updates per batch")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    vocab = [f"word{i}" for i in range(5000)]
+    jobs = []
+    for job_id in range(1, args.jobs + 1):
+        transcript = " ".join(rnd.choices(vocab, k=args.words))
+        topics = json.dumps([" ".join(rnd.choices(vocab, k=5)) for _ in range(10)])
+        jobs.append((
+            job_id, "2026-10-18 12:00:00", "2026-10-18 12:00:00", "youtube_url", f"https://youtu.be/{job_id:011d}", 1,
+            rnd.choice(STATUSES), rnd.choice(["Done.", "Transcribing...", "Will retry download"]), "Review",
+            transcript, transcript[: len(transcript) // 4], topics, None,
+        ))
+
+    tmp = Path(tempfile.mkdtemp())
+    layouts = {name: build(tmp / f"{name}.db", name == "split", jobs, args) for name in ("inline", "split")}
+    del jobs
+
+    print(f"{args.jobs} jobs, {args.words}-word transcripts")
+    print(f"{'layout':8s} {'file':>8s} {'video_jobs pages':>17s} {'of which overflow':>18s} {'contents pages':>15s}")
+    for name, conn in layouts.items():
+        stats = pages(conn)
+        size = (tmp / f"{name}.db").stat().st_size / 2**20
+        jobs_pages = stats["video_jobs"]
+        contents_pages = stats.get("video_job_contents", {}).get("pages", 0)
+        print(f"{name:8s} {size:7.0f}M {jobs_pages['pages']:17d} {jobs_pages['overflow']:18d} {contents_pages:15d}")
+
+    print(f"\n{'query':14s} {'inline':>10s} {'split':>10s}")
+    for query, (sql, make_params) in QUERIES.items():
+        repeat = max(3, args.repeat // 10) if query == "full scan" else args.repeat
+        results = [timed(conn, sql, make_params, random.Random(1), args.jobs, repeat) for conn in layouts.values()]
+        print(f"{query:14s} {results[0]:8.3f}ms {results[1]:8.3f}ms")
+
+    # Status-only updates: the whole row is rewritten, so inline rows rewrite their overflow chains too
+    print(f"\n{'updates':14s} {'inline':>10s} {'split':>10s}")
+    ids = random.Random(2).sample(range(1, args.jobs + 1), min(args.updates, args.jobs))
+    rates, wal = [], []
+    for name, conn in layouts.items():
+        wal_path = tmp / f"{name}.db-wal"
+        started = time.perf_counter()
+        conn.execute("BEGIN")
+        conn.executemany(
+            "UPDATE video_jobs SET status = 'PROCESSING', status_message = ?, version = version + 1 WHERE id = ?",
+            [(f"Transcribing chunk {i}...", job_id) for i, job_id in enumerate(ids)],
+        )
+        conn.execute("COMMIT")
+        rates.append(len(ids) / (time.perf_counter() - started))
+        wal.append(wal_path.stat().st_size / len(ids) / 1024)
+    print(f"{'rows/s':14s} {rates[0]:10.0f} {rates[1]:10.0f}")
+    print(f"{'WAL KiB/row':14s} {wal[0]:10.1f} {wal[1]:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
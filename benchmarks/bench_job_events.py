@@ -0,0 +1,116 @@
+"""
+DB load of status polling vs the SSE event stream, as the number of watching clients grows.
+
+    python benchmarks/bench_job_events.py --clients 10 100 1000 --seconds 10
+
+Each run watches one job that a simulated worker moves through a few status transitions.
+Pollers call DatabaseService.get_job every --poll-interval seconds (like the dashboard);
+streamers subscribe to the in-process JobEventHub and read the status once. We count SQL
+statements hitting the database and report queries/second for both approaches.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["JOB_EVENTS_BACKEND"] = "memory"
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+from sqlalchemy import event # noqa: E402
+
+from app.database import Base, async_engine, AsyncSessionLocal # noqa: E402
+from app.models.video_job import VideoJob, JobStatus # noqa: E402
+from app.services.database_service import DatabaseService # noqa: E402
+from app.services.job_events import job_event_hub, publish_job_event # noqa: E402
+
+queries = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count(*args, **kwargs):
+    global queries
+    queries += 1
+
+
+async def simulate_worker(job_id: int, seconds: float) -> None:
+    """Moves the job through a few states over `seconds`, publishing after each commit."""
+    db_service = DatabaseService()
+    steps = [JobStatus.PROCESSING, JobStatus.PROCESSING, JobStatus.COMPLETED]
+    for i, st in enumerate(steps):
+        await asyncio.sleep(seconds / len(steps))
+        async with AsyncSessionLocal() as db:
+            await db_service.update_job_status(db, job_id, st, f"step {i}")
+            await db.commit()
+        publish_job_event(job_id, st, f"step {i}")
+
+
+async def poller(job_id: int, stop: asyncio.Event, interval: float) -> None:
+    db_service = DatabaseService()
+    while not stop.is_set():
+        async with AsyncSessionLocal() as db:
+            await db_service.get_job(db, job_id, columns=["status", "status_message"])
+        await asyncio.sleep(interval)
+
+
+async def streamer(job_id: int, stop: asyncio.Event, received: list) -> None:
+    queue = await job_event_hub.subscribe(job_id)
+    try:
+        async with AsyncSessionLocal() as db: # Initial state, as the SSE endpoint does
+            await DatabaseService().get_job(db, job_id, columns=["status", "status_message"])
+        while not stop.is_set():
+            try:
+                received.append(await asyncio.wait_for(queue.get(), timeout=0.5))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        job_event_hub.unsubscribe(job_id, queue)
+
+
+async def run(mode: str, clients: int, seconds: float, interval: float) -> None:
+    global queries
+    async with AsyncSessionLocal() as db:
+        job = VideoJob(source_type="prompt", source_value="x", status=JobStatus.PENDING)
+        db.add(job)
+        await db.commit()
+        job_id = job.id
+
+    stop = asyncio.Event()
+    received: list = []
+    queries = 0
+    start = time.perf_counter()
+    if mode == "poll":
+        watchers = [asyncio.create_task(poller(job_id, stop, interval)) for _ in range(clients)]
+    else:
+        watchers = [asyncio.create_task(streamer(job_id, stop, received)) for _ in range(clients)]
+    await simulate_worker(job_id, seconds)
+    stop.set()
+    await asyncio.gather(*watchers)
+    elapsed = time.perf_counter() - start
+    extra = f", {len(received)} events delivered" if mode == "sse" else ""
+    print(f"{mode:4s} clients={clients:5d}: {queries:7d} queries, {queries / elapsed:9.1f} queries/s{extra}")
+
+
+async def main(args) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    for clients in args.clients:
+        await run("poll", clients, args.seconds, args.poll_interval)
+        await run("sse", clients, args.seconds, args.poll_interval)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--poll-interval", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""
+Keyset vs OFFSET pagination of the job listing at deep pages.
+
+    python benchmarks/bench_job_listing.py --rows 1000000 --page-size 50
+
+Seeds a SQLite file with --rows video_jobs rows (same columns/indexes as the model,
+without the big content columns) and times fetching the page at several depths with
+the queries GET /api/v1/jobs (keyset) and a naive LIMIT/OFFSET listing would issue.
+Only needs the standard library.
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+STATUSES = ["PENDING", "PROCESSING", "COMPLETED", "FAILED"]
+SOURCES = ["prompt", "youtube_url", "audio_file"]
+
+KEYSET_SQL = (
+    "SELECT id, created_at, status FROM video_jobs WHERE status = ? AND (created_at, id) < (?, ?) "
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+OFFSET_SQL = (
+    "SELECT id, created_at, status FROM video_jobs WHERE status = ? "
+    "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+)
+
+
+def seed(conn: sqlite3.Connection, rows: int) -> None:
+    conn.execute(
+        "CREATE TABLE video_jobs (id INTEGER PRIMARY KEY, created_at DATETIME, updated_at DATETIME, "
+        "source_type VARCHAR, source_value TEXT, status VARCHAR(10), status_message VARCHAR, "
+        "transcript_fetched BOOLEAN NOT NULL, script_genre VARCHAR)"
+    )
+    start = datetime(2024, 1, 1)
+    rnd = random.Random(42)
+    batch = []
+    for i in range(1, rows + 1):
+        created = (start + timedelta(seconds=i * 30 + rnd.randint(0, 29))).isoformat(sep=" ")
+        batch.append((i, created, created, rnd.choice(SOURCES), f"value {i}", rnd.choice(STATUSES), "ok", 1, None))
+        if len(batch) == 50_000:
+            conn.executemany("INSERT INTO video_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO video_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.execute("CREATE INDEX ix_video_jobs_status_created_at_id ON video_jobs (status, created_at, id)")
+    conn.execute("CREATE INDEX ix_video_jobs_source_type_created_at_id ON video_jobs (source_type, created_at, id)")
+    conn.execute("CREATE INDEX ix_video_jobs_created_at_id ON video_jobs (created_at, id)")
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(rows: int, page_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(Path(tmp) / "bench.db")
+        t0 = time.perf_counter()
+        seed(conn, rows)
+        print(f"seeded {rows} rows in {time.perf_counter() - t0:.1f}s")
+
+        status = "COMPLETED"
+        matching = conn.execute("SELECT COUNT(*) FROM video_jobs WHERE status = ?", (status,)).fetchone()[0]
+        print(f"{matching} rows with status={status}, page size {page_size}")
+        print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        last_page = matching // page_size - 1 # Pages past the data have no previous row to use as the cursor
+        for page in sorted({p for p in (1, 10, 100, 1000, last_page) if 1 <= p <= last_page}):
+            offset = page * page_size
+            # The keyset cursor is the last row of the previous page
+            cursor = conn.execute(OFFSET_SQL, (status, 1, offset - 1)).fetchone()
+            off_ms = timed(lambda: conn.execute(OFFSET_SQL, (status, page_size, offset)).fetchall())
+            key_ms = timed(lambda: conn.execute(KEYSET_SQL, (status, cursor[1], cursor[0], page_size)).fetchall())
+            assert conn.execute(OFFSET_SQL, (status, page_size, offset)).fetchall() == \
+                conn.execute(KEYSET_SQL, (status, cursor[1], cursor[0], page_size)).fetchall()
+            print(f"{page:>8} {off_ms:>10.2f} {key_ms:>10.2f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rows, args.page_size)
@@ -0,0 +1,86 @@
+"""
+Sync job update throughput: SELECT + setattr + flush + refresh vs one UPDATE ... RETURNING.
+
+    python benchmarks/bench_job_update.py --updates 5000
+    python benchmarks/bench_job_update.py --url postgresql+psycopg2://user:pw@localhost/bench  # if you have one
+
+"legacy" replays the old DatabaseService._update_job_sync (full-row SELECT, flush, full-row
+refresh). "returning_row" is update_job_sync() returning the VideoJob, "returning_cols" asks
+only for (id, version, status) and "versioned" also passes expected_version. Every update is
+committed on its own, like a worker status write. Defaults to a throwaway SQLite file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--url", help="Sync SQLAlchemy URL to benchmark instead of a temp SQLite file")
+    args = parser.parse_args()
+
+    if not args.url:
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+    os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.database import Base, sync_engine
+    from app.models.video_job import JobStatus, VideoJob
+    from app.services.database_service import DatabaseService
+
+    engine = create_engine(args.url) if args.url else sync_engine
+    Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session() as session:
+        session.add_all(
+            VideoJob(id=i, source_type="youtube_url", source_value="x", status=JobStatus.PROCESSING, transcript="word " * 3000)
+            for i in range(1, args.jobs + 1)
+        )
+        session.commit()
+
+    db_service = DatabaseService()
+
+    def legacy(session, job_id, data):
+        job = db_service.get_job_sync(session, job_id)
+        for key, value in data.items():
+            setattr(job, key, value)
+        session.flush()
+        session.refresh(job)
+
+    def returning_row(session, job_id, data):
+        db_service.update_job_sync(session, job_id, data)
+
+    def returning_cols(session, job_id, data):
+        db_service.update_job_sync(session, job_id, data, returning=("status",))
+
+    versions = {}
+
+    def versioned(session, job_id, data):
+        row = db_service.update_job_sync(session, job_id, data, expected_version=versions.get(job_id), returning=("status",))
+        versions[job_id] = row.version
+
+    for name, fn in (("legacy", legacy), ("returning_row", returning_row), ("returning_cols", returning_cols), ("versioned", versioned)):
+        start = time.perf_counter()
+        for i in range(args.updates):
+            job_id = i % args.jobs + 1
+            with Session() as session:
+                fn(session, job_id, {"status": JobStatus.PROCESSING, "status_message": f"{name} {i}"})
+                session.commit()
+        elapsed = time.perf_counter() - start
+        print(f"{engine.dialect.name:10s} {name:15s} {args.updates / elapsed:9.0f} updates/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Topic jobs per second through one worker process: one blocking call at a time vs the AsyncLLMExecutor.
+
+    python benchmarks/bench_llm_executor.py --jobs 200 --concurrency 1 8 32 --error-rate 0.05
+
+"sequential" is the old behaviour (one LLM call in flight per worker process). The executor runs
+--jobs single-call analyses concurrently on the worker loop against the local fake OpenAI server,
+which answers a fraction of requests with 429 to exercise the retry path. The LLM cache is off.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:8765/v1")
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from benchmarks.fake_openai_server import FakeOpenAIHandler, serve # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--base-latency", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = serve(8765, base_latency=args.base_latency)
+    FakeOpenAIHandler.chat_error_rate = args.error_rate
+    from app.celery_app import get_worker_loop
+    from app.services.llm_executor import AsyncLLMExecutor
+    from app.services.llm_service import LLMService
+    import app.services.llm_service as llm_module
+
+    rnd = random.Random(0)
+    scripts = [" ".join(f"word{rnd.randrange(2000)}" for _ in range(800)) for _ in range(args.jobs)]
+    service = LLMService()
+    worker_loop = get_worker_loop()
+
+    try:
+        for concurrency in args.concurrency:
+            async def run_all():
+                executor = AsyncLLMExecutor(
+                    api_key="sk-fake", base_url=os.environ["OPENAI_BASE_URL"], max_concurrency=concurrency,
+                    rpm_limit=100000, tpm_limit=100_000_000,
+                )
+                llm_module.get_llm_executor = lambda: executor # Executor sized for this run
+                try:
+                    results = await asyncio.gather(*(service.analyze_script(s, topic_count=60) for s in scripts))
+                finally:
+                    await executor.aclose()
+                return results, executor.stats()
+
+            start = time.perf_counter()
+            results, stats = worker_loop.run(run_all())
+            elapsed = time.perf_counter() - start
+            ok = sum(r is not None for r in results)
+            label = "sequential" if concurrency == 1 else f"executor x{concurrency}"
+            print(f"{label:14s} {args.jobs / elapsed:7.2f} jobs/s  ok {ok}/{args.jobs}  "
+                  f"retries {stats['retries']}  failures {stats['failures']}")
+    finally:
+        worker_loop.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
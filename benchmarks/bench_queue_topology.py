@@ -0,0 +1,215 @@
+"""
+Mixed-workload simulation: one shared queue on prefork workers vs the per-stage queue topology.
+
+    python benchmarks/bench_queue_topology.py --cores 4 --bulk 200 --hours 2
+
+A discrete-event simulation (no broker or network needed) of one machine with --cores cores:
+  - a bulk submission of --bulk YouTube jobs at t=0
+  - single YouTube jobs arriving every ~--job-interval seconds (Poisson) for --hours
+  - topic generation requests (one chat call) every ~--llm-interval seconds for --hours
+A YouTube job is download (I/O) -> normalize (CPU) -> transcribe (I/O); durations are drawn from
+the ranges below, the same for both setups (same seed).
+  shared    before: every task on the default queue, prefork with one process per core and
+            prefetch 1, so a process is taken for the whole download or Whisper request
+  topology  the profiles in app/celery_app.py: a download worker (YTDLP_DOWNLOAD_WORKERS slots,
+            threads for the metadata lookups ahead of them, the download rate limit), an api worker
+            (CELERY_IO_CONCURRENCY threads) and a prefork cpu worker with one process per core;
+            within a queue, higher priority runs first (bulk downloads at CELERY_BULK_PRIORITY)
+Reported: time until the whole workload is done, YouTube jobs per hour, and submit-to-done latency
+of single jobs and of topic requests.
+"""
+import argparse
+import heapq
+import itertools
+import os
+import random
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+from app.celery_app import DEFAULT_PRIORITY, TASK_PRIORITIES, TASK_QUEUES, worker_profiles # noqa: E402
+from app.core.config import settings # noqa: E402
+
+DURATIONS = { # Seconds, uniform
+    "tasks.download_youtube_audio": (60, 240),
+    "tasks.normalize_audio": (15, 45),
+    "tasks.transcribe_audio": (30, 120),
+    "tasks.generate_topics": (3, 10),
+}
+NEXT_STAGE = {"tasks.download_youtube_audio": "tasks.normalize_audio", "tasks.normalize_audio": "tasks.transcribe_audio"}
+
+
+@dataclass
+class SimTask:
+    name: str
+    job: int
+    interactive: bool # False for bulk jobs
+    durations: List[float] # This stage's, then the following stages'
+    submitted: float # Of the job (or topic request)
+
+
+@dataclass
+class Pool:
+    """A worker (or several identical ones): slots taking tasks from its queues, best priority first."""
+    queues: Tuple[str, ...]
+    slots: int
+    download_slots: Optional[int] = None # yt-dlp slots shared by the pool's threads (None: never the limit)
+    download_interval: float = 0.0 # Rate limit, seconds between download starts
+    busy: int = 0
+    downloads: int = 0
+    download_waiting: List[SimTask] = field(default_factory=list) # Hold a thread until a yt-dlp slot frees up
+    next_download: float = 0.0
+
+
+class Simulation:
+    def __init__(self, pools: List[Pool], routes: Callable[[str], str], priority: Callable[[SimTask], int]):
+        self.now = 0.0
+        self.pools = pools
+        self.routes = routes
+        self.priority = priority
+        self.queues: Dict[str, list] = defaultdict(list) # Heaps of (-priority, seq, task)
+        self.events: list = []
+        self.seq = itertools.count()
+        self.job_latency: Dict[int, Tuple[float, bool]] = {}
+        self.topic_latency: List[float] = []
+
+    def at(self, when: float, action: Callable[[], None]) -> None:
+        heapq.heappush(self.events, (when, next(self.seq), action))
+
+    def submit(self, task: SimTask) -> None:
+        heapq.heappush(self.queues[self.routes(task.name)], (-self.priority(task), next(self.seq), task))
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        for pool in self.pools:
+            while pool.busy < pool.slots:
+                candidates = [q for q in pool.queues if self.queues[q]]
+                if "download" in candidates and pool.download_interval and self.now < pool.next_download:
+                    candidates.remove("download") # Rate limited: try again when the next token is due
+                    self.at(pool.next_download, self.dispatch)
+                if not candidates:
+                    break
+                queue = min(candidates, key=lambda q: self.queues[q][0][:2])
+                _, _, task = heapq.heappop(self.queues[queue])
+                pool.busy += 1
+                if task.name == "tasks.download_youtube_audio" and pool.download_slots is not None:
+                    pool.next_download = self.now + pool.download_interval
+                    if pool.downloads >= pool.download_slots:
+                        pool.download_waiting.append(task)
+                        continue
+                    pool.downloads += 1
+                self.start(pool, task)
+
+    def start(self, pool: Pool, task: SimTask) -> None:
+        def finish():
+            pool.busy -= 1
+            if task.name == "tasks.download_youtube_audio" and pool.download_slots is not None:
+                if pool.download_waiting:
+                    self.start(pool, pool.download_waiting.pop(0)) # The slot (and the waiting thread's) moves on
+                else:
+                    pool.downloads -= 1
+            self.complete(task)
+            self.dispatch()
+        self.at(self.now + task.durations[0], finish)
+
+    def complete(self, task: SimTask) -> None:
+        if task.name == "tasks.generate_topics":
+            self.topic_latency.append(self.now - task.submitted)
+        elif task.name in NEXT_STAGE:
+            self.submit(SimTask(NEXT_STAGE[task.name], task.job, task.interactive, task.durations[1:], task.submitted))
+        else:
+            self.job_latency[task.job] = (self.now - task.submitted, task.interactive)
+
+    def run(self) -> float:
+        while self.events:
+            self.now, _, action = heapq.heappop(self.events)
+            action()
+        return self.now
+
+
+def workload(args, rnd: random.Random) -> List[SimTask]:
+    """The first task of every job and topic request."""
+    stages = lambda: [rnd.uniform(*DURATIONS[name]) for name in ("tasks.download_youtube_audio", "tasks.normalize_audio", "tasks.transcribe_audio")]
+    tasks = [SimTask("tasks.download_youtube_audio", job, False, stages(), 0.0) for job in range(args.bulk)]
+    for interval, name in ((args.job_interval, "tasks.download_youtube_audio"), (args.llm_interval, "tasks.generate_topics")):
+        t = rnd.expovariate(1 / interval)
+        while t < args.hours * 3600:
+            durations = [rnd.uniform(*DURATIONS[name])] if name == "tasks.generate_topics" else stages()
+            tasks.append(SimTask(name, len(tasks), True, durations, t))
+            t += rnd.expovariate(1 / interval)
+    return tasks
+
+
+def simulate(args, topology: bool) -> dict:
+    if topology:
+        profiles = worker_profiles()
+        rate = settings.CELERY_QUEUE_RATE_LIMITS.get("download")
+        interval = 0.0
+        if rate:
+            count, unit = rate.split("/")
+            interval = {"s": 1, "m": 60, "h": 3600}[unit] / float(count)
+        pools = [
+            Pool(profiles["download"].queues, profiles["download"].concurrency, settings.YTDLP_DOWNLOAD_WORKERS, interval),
+            Pool(profiles["api"].queues, profiles["api"].concurrency),
+            Pool(("audio",), args.cores),
+        ]
+        routes = lambda name: TASK_QUEUES[name]
+        def priority(task: SimTask) -> int:
+            if task.name == "tasks.download_youtube_audio" and not task.interactive:
+                return settings.CELERY_BULK_PRIORITY
+            return TASK_PRIORITIES.get(task.name, DEFAULT_PRIORITY)
+    else:
+        pools = [Pool(("celery",), args.cores)]
+        routes = lambda name: "celery"
+        priority = lambda task: 0 # One FIFO
+
+    sim = Simulation(pools, routes, priority)
+    for task in workload(args, random.Random(args.seed)):
+        sim.at(task.submitted, lambda task=task: sim.submit(task))
+    makespan = sim.run()
+    single = sorted(latency for latency, interactive in sim.job_latency.values() if interactive)
+    return {
+        "makespan": makespan,
+        "jobs_per_hour": len(sim.job_latency) / (makespan / 3600),
+        "single": single,
+        "topics": sorted(sim.topic_latency),
+    }
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cores", type=int, default=4)
+    parser.add_argument("--bulk", type=int, default=200)
+    parser.add_argument("--hours", type=float, default=2.0, help="How long single jobs and topic requests keep arriving")
+    parser.add_argument("--job-interval", type=float, default=120.0)
+    parser.add_argument("--llm-interval", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.cores} cores, {args.bulk} bulk jobs, single jobs every ~{args.job_interval:.0f}s and topic requests every "
+          f"~{args.llm_interval:.0f}s for {args.hours:g}h")
+    print(f"{'setup':9s} {'all done':>9s} {'jobs/h':>7s} {'single p50':>11s} {'single p95':>11s} {'topics p50':>11s} {'topics p95':>11s}")
+    for name, topology in (("shared", False), ("topology", True)):
+        r = simulate(args, topology)
+        print(
+            f"{name:9s} {r['makespan'] / 3600:8.2f}h {r['jobs_per_hour']:7.1f} "
+            f"{percentile(r['single'], 50) / 60:9.1f}m {percentile(r['single'], 95) / 60:9.1f}m "
+            f"{percentile(r['topics'], 50):10.1f}s {percentile(r['topics'], 95):10.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
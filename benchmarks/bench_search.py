@@ -0,0 +1,142 @@
+"""
+Full-text search vs LIKE scans on a large SQLite job table.
+
+    python benchmarks/bench_search.py --rows 100000 --words 150
+
+Creates a throwaway SQLite file with --rows jobs (Zipf-distributed vocabulary, so there are
+common and rare terms), then builds the FTS5 index exactly as migration a7d2c94e1b36 does
+(same DDL over video_jobs + video_job_contents, batched backfill) and compares the API's search query (BM25 + snippet, top 20)
+with the old `transcript LIKE '%term%'` scan. Also reports the trigger overhead on inserts
+and checks that status-only updates don't touch the index.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+MIGRATION = ROOT / "alembic" / "versions" / "a7d2c94e1b36_move_video_job_content_to_own_table.py"
+GENRES = ["Educational / Explainer", "Storytelling / Narrative", "Review", "Tutorial / How-To", "Comedy / Entertainment"]
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("fts_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(conn, sql, params, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=150, help="Words per transcript")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.services.search_service import _SQLITE_SEARCH, build_fts5_query
+    migration = load_migration()
+
+    rnd = random.Random(0)
+    vocab = [f"w{i}" for i in range(20000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocab))] # Zipf
+    cum_weights = [0.0] * len(vocab)
+    total = 0.0
+    for i, w in enumerate(weights):
+        total += w
+        cum_weights[i] = total
+
+    path = Path(tempfile.mkdtemp()) / "bench_search.db"
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE video_jobs (id INTEGER PRIMARY KEY, status TEXT, script_genre TEXT, created_at TEXT)")
+    conn.execute("CREATE TABLE video_job_contents (job_id INTEGER PRIMARY KEY REFERENCES video_jobs (id), transcript TEXT, topics TEXT)")
+
+    def make_rows(start, count):
+        for job_id in range(start, start + count):
+            words = rnd.choices(vocab, cum_weights=cum_weights, k=args.words)
+            topics = '["' + '", "'.join(" ".join(rnd.choices(vocab, cum_weights=cum_weights, k=4)) for _ in range(5)) + '"]'
+            yield (job_id, "COMPLETED", rnd.choice(GENRES), "2026-10-18 12:00:00", " ".join(words), topics)
+
+    def insert(rows):
+        conn.execute("BEGIN")
+        conn.executemany("INSERT INTO video_jobs VALUES (?, ?, ?, ?)", [row[:4] for row in rows])
+        conn.executemany("INSERT INTO video_job_contents VALUES (?, ?, ?)", [(row[0], *row[4:]) for row in rows])
+        conn.execute("COMMIT")
+
+    rows = list(make_rows(1, args.rows))
+    started = time.perf_counter()
+    insert(rows)
+    elapsed = time.perf_counter() - started
+    print(f"inserted {args.rows} jobs without index: {args.rows / elapsed:.0f} rows/s ({path.stat().st_size / 2**20:.0f}MB)")
+
+    # Same DDL and batched backfill as the migration
+    started = time.perf_counter()
+    for statement in migration.SQLITE_UPGRADE:
+        conn.execute(statement)
+    last_id = 0
+    batch = migration.BATCH_SIZE
+    while True:
+        ids = [r[0] for r in conn.execute("SELECT id FROM video_jobs WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch))]
+        if not ids:
+            break
+        conn.execute(migration.SQLITE_BACKFILL, {"last_id": last_id, "upto": ids[-1]})
+        last_id = ids[-1]
+    print(f"FTS5 backfill in batches of {batch}: {time.perf_counter() - started:.1f}s")
+
+    search_sql = str(_SQLITE_SEARCH)
+    queries = {
+        "common term": "w3",
+        "mid term": "w150",
+        "rare term": "w15000",
+        "two terms": "w40 w90",
+        "phrase": f'"{vocab[1]} {vocab[2]}"',
+        "prefix": "w1234*",
+    }
+    # LIKE can't rank, so any relevance ordering needs every match: that's the scan we replace
+    print(f"{'query':14s} {'LIKE (all matches)':>19s} {'FTS5 BM25 top 20':>17s}")
+    for name, query in queries.items():
+        terms = [t.strip('"*') for t in query.split()]
+        like_sql = "SELECT job_id FROM video_job_contents WHERE " + " AND ".join("transcript LIKE ?" for _ in terms)
+        like_ms, like_rows = timed(conn, like_sql, [f"%{t}%" for t in terms], max(1, args.repeat // 2))
+        fts_ms, _ = timed(conn, search_sql, {"query": build_fts5_query(query), "limit": 20, "offset": 0}, args.repeat)
+        print(f"{name:14s} {like_ms:9.1f}ms {like_rows:7d} {fts_ms:15.2f}ms")
+
+    # Write-path overhead: inserts fire the index trigger, status-only updates must not
+    extra = 2000
+    rows = list(make_rows(args.rows + 1, extra))
+    started = time.perf_counter()
+    insert(rows)
+    print(f"insert with FTS triggers: {extra / (time.perf_counter() - started):.0f} rows/s")
+    changes = conn.total_changes
+    started = time.perf_counter()
+    conn.execute("BEGIN")
+    conn.executemany("UPDATE video_jobs SET status = 'PROCESSING' WHERE id = ?", [(i,) for i in range(1, extra + 1)])
+    conn.execute("COMMIT")
+    print(f"status-only update: {extra / (time.perf_counter() - started):.0f} rows/s, "
+          f"{conn.total_changes - changes - extra} index changes (expected 0)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Write/read contention on SQLite with and without the production profile (app/database.py).
+
+    python benchmarks/bench_sqlite_concurrency.py --writers 8 --readers 4 --seconds 10
+
+N writer processes loop DatabaseService._update_job_sync (what Celery workers do per status
+update) and M reader processes loop DatabaseService.get_job_sync (API-style reads) against
+one SQLite file, first with SQLITE_PROFILE=default, then with SQLITE_PROFILE=production.
+Reports throughput and how many operations failed with "database is locked".
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _setup_env(db_path: str, profile: str) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["SQLITE_PROFILE"] = profile
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+    os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+
+def _worker(role: str, db_path: str, profile: str, jobs: int, seconds: float, results) -> None:
+    _setup_env(db_path, profile)
+    from sqlalchemy.exc import OperationalError
+    from app.database import SyncSessionLocal
+    from app.models.video_job import JobStatus
+    from app.services.database_service import DatabaseService
+
+    db_service = DatabaseService()
+    ok = locked = 0
+    deadline = time.perf_counter() + seconds
+    rnd = random.Random(os.getpid())
+    while time.perf_counter() < deadline:
+        job_id = rnd.randint(1, jobs)
+        session = SyncSessionLocal()
+        try:
+            if role == "writer":
+                db_service._update_job_sync(session, job_id, {"status": JobStatus.PROCESSING, "status_message": f"tick {ok}"})
+                session.commit()
+            else:
+                db_service.get_job_sync(session, job_id)
+                session.rollback()
+            ok += 1
+        except OperationalError as e:
+            if "locked" in str(e):
+                locked += 1
+            session.rollback()
+        finally:
+            session.close()
+    results.put((role, ok, locked))
+
+
+def run(profile: str, writers: int, readers: int, seconds: float, jobs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        _setup_env(db_path, profile)
+        import sqlite3
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE video_jobs (id INTEGER PRIMARY KEY, created_at DATETIME, updated_at DATETIME, "
+            "source_type VARCHAR, source_value TEXT, transcript TEXT, transcript_fetched BOOLEAN NOT NULL, "
+            "status VARCHAR(10), status_message VARCHAR, script_genre VARCHAR, topics JSON, editor_data JSON, "
+            "selected_music VARCHAR, render_path VARCHAR, youtube_title VARCHAR, youtube_description TEXT, "
+            "youtube_tags JSON, youtube_id VARCHAR, scheduled_upload_time DATETIME)"
+        )
+        conn.executemany(
+            "INSERT INTO video_jobs (id, source_type, source_value, transcript, transcript_fetched, status) "
+            "VALUES (?, 'prompt', 'x', ?, 1, 'PENDING')",
+            [(i, "word " * 2000) for i in range(1, jobs + 1)],
+        )
+        conn.commit()
+        conn.close()
+
+        ctx = mp.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=("writer", db_path, profile, jobs, seconds, results)) for _ in range(writers)]
+        procs += [ctx.Process(target=_worker, args=("reader", db_path, profile, jobs, seconds, results)) for _ in range(readers)]
+        for p in procs:
+            p.start()
+        totals = {"writer": [0, 0], "reader": [0, 0]}
+        for _ in procs:
+            role, ok, locked = results.get()
+            totals[role][0] += ok
+            totals[role][1] += locked
+        for p in procs:
+            p.join()
+
+    for role, (ok, locked) in totals.items():
+        print(f"{profile:10s} {role}s: {ok / seconds:9.1f} ops/s, {locked:6d} 'database is locked' errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--jobs", type=int, default=1000)
+    args = parser.parse_args()
+    for profile in ("default", "production"):
+        run(profile, args.writers, args.readers, args.seconds, args.jobs)
@@ -0,0 +1,110 @@
+"""
+Commits per job and status-write latency: direct per-update commits vs StatusUpdateCoalescer.
+
+    python benchmarks/bench_status_coalescer.py --workers 16 --jobs 400 --updates 6
+
+Each simulated worker thread processes jobs the way the Celery tasks do: several PROCESSING
+progress updates a few ms apart, then one terminal COMPLETED update carrying the transcript.
+"direct" commits every update through DatabaseService._update_job_sync (the old task code);
+"coalesced" submits them to a StatusUpdateCoalescer. Both run against a fresh SQLite file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def run(mode: str, workers: int, jobs: int, updates: int, step_ms: float) -> None:
+    from sqlalchemy import event
+    from app.database import Base, SyncSessionLocal, sync_engine
+    from app.models.video_job import JobStatus, VideoJob
+    from app.services.database_service import DatabaseService
+    from app.services.status_coalescer import StatusUpdateCoalescer
+
+    Base.metadata.drop_all(sync_engine)
+    Base.metadata.create_all(sync_engine)
+    with SyncSessionLocal() as session:
+        session.add_all(VideoJob(id=i, source_type="prompt", source_value="x", status=JobStatus.PENDING) for i in range(1, jobs + 1))
+        session.commit()
+
+    commits = [0]
+
+    def count_commit(conn):
+        commits[0] += 1
+    event.listen(sync_engine, "commit", count_commit)
+
+    db_service = DatabaseService()
+    coalescer = StatusUpdateCoalescer(flush_interval=0.2, max_batch=100)
+    latencies = []
+    lat_lock = threading.Lock()
+    job_ids = iter(range(1, jobs + 1))
+    ids_lock = threading.Lock()
+
+    def write(job_id, status, message, **fields):
+        t0 = time.perf_counter()
+        if mode == "direct":
+            with SyncSessionLocal() as session:
+                db_service._update_job_sync(session, job_id, {"status": status, "status_message": message, **fields})
+                session.commit()
+        else:
+            coalescer.submit(job_id, status, message, **fields)
+        with lat_lock:
+            latencies.append(time.perf_counter() - t0)
+
+    def worker():
+        while True:
+            with ids_lock:
+                job_id = next(job_ids, None)
+            if job_id is None:
+                return
+            for step in range(updates):
+                write(job_id, JobStatus.PROCESSING, f"step {step}")
+                time.sleep(step_ms / 1000)
+            write(job_id, JobStatus.COMPLETED, "done", transcript="word " * 2000, transcript_fetched=True)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    coalescer.close()
+    elapsed = time.perf_counter() - start
+    event.remove(sync_engine, "commit", count_commit)
+
+    print(
+        f"{mode:10s} {elapsed:6.2f}s  commits/job {commits[0] / jobs:5.2f}  "
+        f"p50 write {_percentile(latencies, 0.5) * 1000:7.2f}ms  p99 write {_percentile(latencies, 0.99) * 1000:7.2f}ms"
+    )
+    if mode == "coalesced":
+        # Caller-side latency above; this is submit -> commit as seen by the writer thread
+        print(f"{'':10s} coalescer stats: {coalescer.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--updates", type=int, default=6, help="PROCESSING updates per job before the terminal one")
+    parser.add_argument("--step-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+    os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+    os.environ.setdefault("JOB_EVENTS_BACKEND", "memory") # No Redis needed; events go nowhere
+    for mode in ("direct", "coalesced"):
+        run(mode, args.workers, args.jobs, args.updates, args.step_ms)
@@ -0,0 +1,72 @@
+"""
+Per-job LLM latency and prompt size: two calls (genre, then topics) vs one structured call.
+
+    python benchmarks/bench_topic_generation.py --jobs 20
+
+Runs LLMService against the local fake OpenAI server, whose chat latency is a fixed overhead
+plus a prefill cost per prompt token, with the LLM cache disabled so every job hits the API.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:8765/v1")
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from benchmarks.fake_openai_server import FakeOpenAIHandler, serve # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--base-latency", type=float, default=0.4)
+    parser.add_argument("--latency-per-1k-prompt-tokens", type=float, default=0.15)
+    args = parser.parse_args()
+
+    server = serve(8765, base_latency=args.base_latency)
+    FakeOpenAIHandler.latency_per_1k_prompt_tokens = args.latency_per_1k_prompt_tokens
+    from app.celery_app import get_worker_loop
+    from app.services.llm_service import LLMService
+    service = LLMService()
+    worker_loop = get_worker_loop() # LLMService runs on the worker loop (it owns the executor)
+    rnd = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    scripts = [" ".join(rnd.choice(vocabulary) for _ in range(1500)) for _ in range(args.jobs)]
+
+    async def two_calls(script):
+        genre = await service.determine_genre(script)
+        return genre, await service.generate_topics(script, genre, topic_count=60)
+
+    async def single_call(script):
+        analysis = await service.analyze_script(script, topic_count=60)
+        return analysis.genre, analysis.topics
+
+    try:
+        for name, fn in (("two_calls", two_calls), ("single_call", single_call)):
+            requests_before, chars_before = FakeOpenAIHandler.request_count, FakeOpenAIHandler.prompt_chars
+            start = time.perf_counter()
+            for script in scripts:
+                genre, topics = worker_loop.run(fn(script))
+                assert genre and topics, f"{name} returned no result"
+            elapsed = time.perf_counter() - start
+            requests = FakeOpenAIHandler.request_count - requests_before
+            prompt_tokens = (FakeOpenAIHandler.prompt_chars - chars_before) / 4
+            print(f"{name:12s} {elapsed / args.jobs * 1000:8.0f} ms/job  {requests / args.jobs:4.1f} requests/job  "
+                  f"~{prompt_tokens / args.jobs:6.0f} prompt tokens/job")
+    finally:
+        worker_loop.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
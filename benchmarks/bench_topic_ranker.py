@@ -0,0 +1,101 @@
+"""
+Topic de-duplication and history ranking at scale.
+
+    python benchmarks/bench_topic_ranker.py --history 100000 --queries 600
+
+Builds a TopicIndex of --history synthetic topics (templated titles over a shared vocabulary,
+so there are real near-neighbours) in a temp dir, then reports: ms per ANN query, recall@1 of
+the ANN answer against a brute-force exact cosine scan, in-job dedup time for 60 topics, and the
+full TopicRanker.process() time for one job.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+TEMPLATES = [
+    "How {a} changed {b} forever",
+    "The hidden history of {a}",
+    "Why {a} is harder than {b}",
+    "{a} vs {b}: what actually matters",
+    "10 things nobody tells you about {a}",
+    "Is {a} the future of {b}?",
+    "The science behind {a}",
+    "What {a} can teach us about {b}",
+]
+
+
+def synthetic_topics(count: int, rnd: random.Random):
+    nouns = [f"{w}{i}" for i, w in enumerate(["quantum", "rocket", "coffee", "bitcoin", "ocean", "neuron", "empire", "glacier"] * 250)]
+    topics = []
+    for _ in range(count):
+        topic = rnd.choice(TEMPLATES).format(a=rnd.choice(nouns), b=rnd.choice(nouns))
+        if rnd.random() < 0.2: # Paraphrase noise
+            topic = topic.replace("The ", "").replace("actually ", "").lower()
+        topics.append(topic)
+    return topics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=600)
+    args = parser.parse_args()
+
+    import numpy as np
+    from app.services.topic_ranker import TopicIndex, TopicRanker, dedupe_topics, embed_topics
+
+    rnd = random.Random(0)
+    index = TopicIndex(Path(tempfile.mkdtemp()) / "topic_index.sqlite3")
+    index._backfill_checked = True # Nothing to backfill from the bench DB
+    history = synthetic_topics(args.history, rnd)
+
+    started = time.perf_counter()
+    per_job = 60
+    index.add_many((job_id, history[i:i + per_job]) for job_id, i in enumerate(range(0, len(history), per_job), start=1))
+    print(f"indexed {index.size()} topics in {time.perf_counter() - started:.1f}s")
+
+    queries = [t + rnd.choice(["", "!", " explained", " (2024)"]) for t in rnd.sample(history, args.queries)]
+    vectors = embed_topics(queries, index.dim)
+    started = time.perf_counter()
+    answers = index.query(queries, vectors)
+    elapsed = time.perf_counter() - started
+    print(f"ANN query: {elapsed * 1000 / len(queries):.2f} ms/topic over {len(history)} topics")
+
+    # Brute force on a sample for recall (embedding 100k topics once is the slow part)
+    sample = min(100, len(queries))
+    history_vectors = embed_topics(history, index.dim)
+    started = time.perf_counter()
+    exact = history_vectors @ vectors[:sample].T
+    best = exact.argmax(axis=0)
+    brute_ms = (time.perf_counter() - started) * 1000 / sample
+    hits = sum(
+        1 for q in range(sample)
+        if answers[q][0] is not None and abs(answers[q][1] - float(exact[best[q], q])) < 1e-4
+    )
+    print(f"recall@1 vs exact cosine: {hits / sample:.1%} (dense exact scan: {brute_ms:.2f} ms/topic, needs {history_vectors.nbytes / 2**20:.0f}MB)")
+
+    job_topics = synthetic_topics(45, rnd)
+    job_topics += [t.upper() + "?" for t in rnd.sample(job_topics, 15)] # In-job near-duplicates
+    started = time.perf_counter()
+    kept, _ = dedupe_topics(job_topics, embed_topics(job_topics, index.dim), 0.8)
+    print(f"dedup of {len(job_topics)} topics: {(time.perf_counter() - started) * 1000:.2f} ms, kept {len(kept)}")
+
+    ranker = TopicRanker(index)
+    result = ranker.process(10**9, job_topics)
+    print(f"TopicRanker.process: {result.seconds * 1000:.1f} ms for {len(job_topics)} topics -> {len(result.topics)} kept; "
+          f"median novelty {float(np.median(result.novelty)):.2f}")
+
+
+if __name__ == "__main__":
+    main()
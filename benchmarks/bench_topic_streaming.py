@@ -0,0 +1,73 @@
+"""
+Time to first topic: buffered vs streamed topic generation.
+
+    python benchmarks/bench_topic_streaming.py --jobs 5 --ms-per-token 20
+
+Runs LLMService.generate_topics against the local fake OpenAI server, which decodes at
+--ms-per-token. The buffered run only has topics once the whole 60-topic reply has arrived;
+the streamed run parses each topic as its closing quote arrives. The LLM cache is off.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:8765/v1")
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from benchmarks.fake_openai_server import FakeOpenAIHandler, serve # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--base-latency", type=float, default=0.4)
+    parser.add_argument("--ms-per-token", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = serve(8765, base_latency=args.base_latency)
+    FakeOpenAIHandler.seconds_per_output_token = args.ms_per_token / 1000
+    from app.celery_app import get_worker_loop
+    from app.services.llm_service import LLMService
+    service = LLMService()
+    worker_loop = get_worker_loop()
+    rnd = random.Random(0)
+    scripts = [" ".join(f"word{rnd.randrange(2000)}" for _ in range(800)) for _ in range(args.jobs)]
+
+    try:
+        for mode in ("buffered", "streamed"):
+            first, total = [], []
+            for script in scripts:
+                started = time.perf_counter()
+                seen = []
+
+                def on_topics(new_topics):
+                    if not seen:
+                        first.append(time.perf_counter() - started)
+                    seen.extend(new_topics)
+
+                topics = worker_loop.run(service.generate_topics(
+                    script, "Educational / Explainer", topic_count=60, on_topics=on_topics if mode == "streamed" else None
+                ))
+                total.append(time.perf_counter() - started)
+                if mode == "buffered":
+                    first.append(total[-1]) # Nothing to show before the full reply
+                assert topics and len(topics) == 60, f"{mode}: got {topics!r}"
+            print(f"{mode:9s} time to first topic {sum(first) / len(first):6.2f}s  "
+                  f"time to all topics {sum(total) / len(total):6.2f}s")
+    finally:
+        worker_loop.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Transcript condensation cost and scaling on synthetic multi-hour transcripts.
+
+    python benchmarks/bench_transcript_condenser.py --hours 0.5 1 2 4 8
+
+Generates ~150 spoken words per minute (topic drift every few minutes, filler words, repeated
+sponsor reads, unpunctuated stretches like raw Whisper output) and condenses each transcript to
+TRANSCRIPT_CONDENSE_TOKEN_BUDGET. ms per 1k input tokens should stay flat as the length grows.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+FILLERS = ["um,", "uh", "you know,", "like,", "I mean,"]
+SPONSOR = "This video is sponsored by our friends at Example VPN, use code SAVE for a discount."
+
+
+def synthetic_transcript(minutes: float, rnd: random.Random) -> str:
+    vocab = [f"term{i}" for i in range(5000)]
+    common = "the a and we so this that is it to of in on for with you".split()
+    sentences = []
+    words_left = int(minutes * 150)
+    while words_left > 0:
+        section = rnd.sample(vocab, 40) # The "subject" of the next few minutes
+        for _ in range(rnd.randint(20, 60)):
+            length = rnd.randint(6, 24)
+            words = [rnd.choice(section) if rnd.random() < 0.35 else rnd.choice(common) for _ in range(length)]
+            if rnd.random() < 0.3:
+                words.insert(rnd.randrange(len(words)), rnd.choice(FILLERS))
+            end = "" if rnd.random() < 0.2 else "." # Some stretches have no punctuation at all
+            sentences.append(" ".join(words) + end)
+            words_left -= length
+        if rnd.random() < 0.2:
+            sentences.append(SPONSOR)
+    return " ".join(sentences)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.transcript_condenser import TranscriptCondenser, _encoding, count_tokens
+
+    condenser = TranscriptCondenser(settings.TRANSCRIPT_CONDENSE_TOKEN_BUDGET, settings.TRANSCRIPT_CONDENSE_SECTION_TOKENS)
+    print(f"token counts: {'tiktoken' if _encoding() else 'character estimate'}; budget {condenser.token_budget} tokens")
+    rnd = random.Random(0)
+    for hours in args.hours:
+        text = synthetic_transcript(hours * 60, rnd)
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = condenser.condense(text)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        # The old prompt saw only the first 4000 characters
+        head_share = min(1.0, 4000 / len(text))
+        print(
+            f"{hours:4.1f}h {result.input_tokens:8d} -> {result.output_tokens:5d} tokens "
+            f"({result.selected:4d}/{result.sentences:6d} sentences)  {best * 1000:8.1f}ms  "
+            f"{best * 1000 / (result.input_tokens / 1000):6.2f}ms/1k tokens  "
+            f"[first-4000-chars covered {head_share:.1%} of the transcript]"
+        )
+        assert count_tokens(result.text) <= condenser.token_budget
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Event-loop blocking and CPU cost of storing large audio uploads.
+
+    python benchmarks/bench_upload.py --size-mb 500 --concurrency 4
+
+Runs --concurrency uploads of --size-mb each on one event loop, three ways:
+  legacy      what POST /jobs did: the body is spooled to a temp file (as Starlette's multipart
+              parser does: SpooledTemporaryFile, writes offloaded once it rolls to disk), then
+              copied with `await upload.read(1MB)` + a blocking `buffer.write` on the loop
+  multipart   the same spooling, then copy_to_file (a sendfile copy) on a thread
+  streamed    POST /jobs/audio: stream_to_file straight from the body chunks, nothing spooled
+Only streamed hashes while writing; for the other two the transcription task hashes the stored
+file. The body arrives as 64KB chunks, like uvicorn hands them to the app. A 1ms ticker measures
+how late the loop runs it (loop lag); "blocked" is the total lateness of ticks more than 5ms late.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+# Imported here, not in the modes: loading the settings inside the first measured run showed up as loop lag
+from app.services.upload_writer import copy_to_file, stream_to_file # noqa: E402
+
+NETWORK_CHUNK = 64 * 1024
+SPOOL_MAX_SIZE = 1024 * 1024 # Starlette's UploadFile spool threshold
+TICK = 0.001
+BLOCKED_THRESHOLD = 0.005
+
+
+async def body(size: int, payload: bytes):
+    """The request body as the ASGI server delivers it."""
+    sent = 0
+    while sent < size:
+        chunk = payload[: min(NETWORK_CHUNK, size - sent)]
+        sent += len(chunk)
+        yield chunk
+        await asyncio.sleep(0) # Each chunk is a separate receive() from the server
+
+
+async def spool(size: int, payload: bytes):
+    """Starlette's multipart handling: parts go to a SpooledTemporaryFile, written via the threadpool once on disk."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in body(size, payload):
+        if spooled._rolled:
+            await asyncio.to_thread(spooled.write, chunk)
+        else:
+            spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+async def legacy(size: int, payload: bytes, dest: Path) -> None:
+    spooled = await spool(size, payload)
+    try:
+        with open(dest, "wb") as buffer:
+            while content := await asyncio.to_thread(spooled.read, 1024 * 1024): # UploadFile.read() on a rolled file
+                buffer.write(content) # Blocking write on the loop
+    finally:
+        await asyncio.to_thread(spooled.close) # UploadFile.close() of a rolled file
+
+
+async def multipart(size: int, payload: bytes, dest: Path) -> None:
+    spooled = await spool(size, payload)
+    try:
+        await asyncio.to_thread(copy_to_file, spooled, dest)
+    finally:
+        await asyncio.to_thread(spooled.close) # UploadFile.close() of a rolled file
+
+
+async def streamed(size: int, payload: bytes, dest: Path) -> None:
+    await stream_to_file(body(size, payload), dest)
+
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run(mode, args, tmp: Path) -> dict:
+    size = args.size_mb * 1024 * 1024
+    payload = os.urandom(NETWORK_CHUNK)
+    lags: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(ticker(lags, stop))
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*(mode(size, payload, tmp / f"{mode.__name__}_{i}.bin") for i in range(args.concurrency)))
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    stop.set()
+    await monitor
+    for path in tmp.glob(f"{mode.__name__}_*.bin"):
+        path.unlink()
+    lags.sort()
+    return {
+        "wall": wall,
+        "cpu_per_upload": cpu / args.concurrency,
+        "p99_lag_ms": lags[int(0.99 * (len(lags) - 1))] * 1000 if lags else 0.0,
+        "max_lag_ms": lags[-1] * 1000 if lags else 0.0,
+        "blocked_s": sum(lag for lag in lags if lag > BLOCKED_THRESHOLD),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--dir", type=Path, help="Where to write (defaults to a temp dir; use the DOWNLOAD_DIR disk)")
+    args = parser.parse_args()
+    tmp = args.dir or Path(tempfile.mkdtemp())
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    print(f"{args.concurrency} concurrent uploads of {args.size_mb}MB ({os.cpu_count()} CPUs)")
+    print(f"{'mode':10s} {'wall':>8s} {'CPU/upload':>11s} {'p99 lag':>9s} {'max lag':>9s} {'blocked':>9s}")
+    for mode in (legacy, multipart, streamed):
+        r = asyncio.run(run(mode, args, tmp))
+        print(f"{mode.__name__:10s} {r['wall']:7.1f}s {r['cpu_per_upload']:10.2f}s {r['p99_lag_ms']:7.1f}ms "
+              f"{r['max_lag_ms']:7.1f}ms {r['blocked_s']:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
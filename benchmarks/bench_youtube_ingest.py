@@ -0,0 +1,121 @@
+"""
+YouTube audio ingest throughput: a new YoutubeDL per job vs the warm YouTubeIngest pool.
+
+    python benchmarks/bench_youtube_ingest.py --jobs 8 --size-mb 8 --segments 40 --kbps-per-connection 8000
+
+Runs --jobs downloads concurrently on one event loop against the local fake host
+(benchmarks/fake_youtube_server.py), which throttles every connection like the real CDN:
+  legacy  what download_youtube_audio_task did: a new YoutubeDL per job on asyncio.to_thread,
+          one fragment at a time, FFmpegExtractAudio to MP3, then the output found by probing
+          .mp3/.m4a/.wav/.ogg on disk
+  ingest  YouTubeIngest: warm clients per pool thread, metadata resolved ahead of the download
+          slots, --fragments parallel fragment connections, no re-encode for Whisper-ready audio
+The fake media is random bytes, so without ffmpeg legacy runs without its MP3 step (the re-encode
+cost is then not measured, and the probe misses the .mp4 output). With ffmpeg, pass --audio with a
+real AAC file to include it. --codec ac-3 exercises the ingest transcode fallback (needs ffmpeg).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+from benchmarks.fake_youtube_server import FakeYouTubeHandler, serve # noqa: E402
+
+PORT = 8766
+
+
+def url(n: int) -> str:
+    return f"http://127.0.0.1:{PORT}/watch/video{n:04d}.m3u8"
+
+
+async def legacy(args, out: Path) -> dict:
+    import yt_dlp
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+
+    async def one(n: int) -> bool:
+        base = f"youtube_{n}_{uuid.uuid4()}"
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'outtmpl': str(out / f"{base}.%(ext)s"),
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'}] if has_ffmpeg else [],
+        }
+
+        def _download():
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url(n)])
+        await asyncio.to_thread(_download)
+        return any((out / f"{base}{ext}").is_file() for ext in ('.mp3', '.m4a', '.wav', '.ogg'))
+
+    found = await asyncio.gather(*(one(n) for n in range(args.jobs)))
+    return {"found": sum(found), "note": "" if has_ffmpeg else "no ffmpeg: MP3 step skipped"}
+
+
+async def ingest(args, out: Path) -> dict:
+    from app.services.youtube_ingest import YouTubeIngest
+    engine = YouTubeIngest(
+        out, download_workers=args.workers, metadata_workers=args.workers,
+        concurrent_fragments=args.fragments, audio_format="bestaudio[acodec^=mp4a]/bestaudio[acodec=opus]/bestaudio/best",
+    )
+    try:
+        results = await asyncio.gather(*(engine.download_audio(n, url(n)) for n in range(args.jobs)))
+    finally:
+        await engine.aclose()
+    return {
+        "found": sum(r.path.is_file() for r in results),
+        "note": f"{engine.stats()['kept_as_is']} kept as is, {engine.stats()['transcoded']} transcoded, {engine.stats()['clients']} clients",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4, help="YTDLP_DOWNLOAD_WORKERS / YTDLP_METADATA_WORKERS")
+    parser.add_argument("--fragments", type=int, default=4, help="YTDLP_CONCURRENT_FRAGMENTS")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--segments", type=int, default=40)
+    parser.add_argument("--codec", default="mp4a.40.2")
+    parser.add_argument("--metadata-latency", type=float, default=0.3)
+    parser.add_argument("--request-latency", type=float, default=0.05)
+    parser.add_argument("--kbps-per-connection", type=float, default=8000.0)
+    parser.add_argument("--audio", type=Path, help="Serve this file instead of random bytes")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING) # Per-job log lines and yt-dlp's no-ffmpeg warnings
+
+    server = serve(PORT, args.size_mb, args.segments, args.codec, args.metadata_latency,
+                   args.request_latency, args.kbps_per_connection, args.audio)
+    size_mb = len(FakeYouTubeHandler.payload) / 2**20
+    print(f"{args.jobs} jobs of {size_mb:.1f}MB in {args.segments} fragments, {args.kbps_per_connection:.0f} kbit/s per connection")
+    print(f"{'mode':8s} {'wall':>8s} {'jobs/s':>8s} {'requests':>9s} {'found':>6s}  notes")
+    try:
+        for mode in (legacy, ingest):
+            out = Path(tempfile.mkdtemp())
+            FakeYouTubeHandler.request_count = 0
+            started = time.perf_counter()
+            result = asyncio.run(mode(args, out))
+            wall = time.perf_counter() - started
+            print(f"{mode.__name__:8s} {wall:7.2f}s {args.jobs / wall:8.2f} {FakeYouTubeHandler.request_count:9d} "
+                  f"{result['found']:3d}/{args.jobs:<2d}  {result['note']}")
+            shutil.rmtree(out, ignore_errors=True)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
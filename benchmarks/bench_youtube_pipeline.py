@@ -0,0 +1,104 @@
+"""
+End-to-end latency of a long YouTube job: staged (download, then normalize, then chunked
+transcription) vs the streaming pipeline mode.
+
+    python benchmarks/bench_youtube_pipeline.py --minutes 60 --kbps 4000 --latency-per-mb 8
+
+Builds a speech-like fixture (see bench_audio_normalizer.py) as a 128k AAC .m4a, like YouTube's
+bestaudio, and serves it from the fake YouTube host (benchmarks/fake_youtube_server.py) as one
+progressive download throttled to --kbps. Whisper is the fake OpenAI server; with the default
+opus 24k chunks, --latency-per-mb 8 is about 15s per 10 minutes of audio.
+  staged     YouTubeIngest.download_audio -> normalize_file -> _plan_transcription/_transcribe_chunked,
+             each stage waiting for the previous one (the broker hops and status flushes between the
+             tasks are not included, so the real gap is larger)
+  streaming  transcribe_youtube_stream: decoding, chunking and Whisper requests overlap the download
+Runs on the worker loop, as the tasks do. Needs ffmpeg and ffprobe on PATH.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:8765/v1")
+os.environ["TRANSCRIPT_CACHE_ENABLED"] = "false"
+
+from benchmarks import fake_openai_server, fake_youtube_server # noqa: E402
+from benchmarks.bench_audio_normalizer import make_fixture # noqa: E402
+
+YOUTUBE_PORT = 8766
+URL = f"http://127.0.0.1:{YOUTUBE_PORT}/media/video0001.m4a"
+
+
+async def staged(job_id: int) -> dict:
+    from app.core.config import settings
+    from app.services.audio_chunker import ENCODERS
+    from app.services.audio_normalizer import build_trimmer, normalize_file
+    from app.services.transcription_service import TranscriptionService
+    from app.services.youtube_ingest import get_youtube_ingest
+
+    started = time.perf_counter()
+    downloaded = await get_youtube_ingest().download_audio(job_id, URL)
+    download_done = time.perf_counter() - started
+    dst = downloaded.path.with_name(f"{downloaded.path.stem}.normalized{ENCODERS[settings.AUDIO_NORMALIZE_CODEC][0]}")
+    normalized = await normalize_file(downloaded.path, dst, settings.AUDIO_NORMALIZE_CODEC, settings.AUDIO_NORMALIZE_BITRATE, build_trimmer())
+    downloaded.path.unlink()
+    chunks = await TranscriptionService._plan_transcription(dst)
+    if chunks:
+        text = await TranscriptionService._transcribe_chunked(job_id, dst, chunks)
+    else:
+        text = await TranscriptionService._transcribe_file(dst)
+    dst.unlink()
+    return {"chars": len(text), "chunks": len(chunks or [1]), "note": f"download done at {download_done:.0f}s, normalized in {normalized.seconds:.0f}s"}
+
+
+async def streaming(job_id: int) -> dict:
+    from app.services.streaming_transcription import transcribe_youtube_stream
+    result = await transcribe_youtube_stream(job_id, URL)
+    return {"chars": len(result.text), "chunks": result.chunks, "note": f"first chunk sent at {result.first_chunk_seconds:.0f}s"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--kbps", type=float, default=4000.0, help="Download bandwidth of the connection")
+    parser.add_argument("--latency-per-mb", type=float, default=8.0)
+    args = parser.parse_args()
+    if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+        sys.exit("ffmpeg and ffprobe must be on PATH")
+
+    tmp = Path(tempfile.mkdtemp())
+    fixture = tmp / "fixture.m4a"
+    make_fixture(fixture, args.minutes, ("-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart"))
+    youtube = fake_youtube_server.serve(YOUTUBE_PORT, audio=fixture, kbps_per_connection=args.kbps, metadata_latency=0.3)
+    whisper = fake_openai_server.serve(8765, base_latency=0.5, latency_per_mb=args.latency_per_mb)
+    size_mb = fixture.stat().st_size / 2**20
+    print(f"{args.minutes:.0f}-minute fixture, {size_mb:.1f}MB AAC at {args.kbps:.0f} kbit/s "
+          f"(download alone ~{size_mb * 8 * 1024 / args.kbps:.0f}s)")
+
+    from app.celery_app import get_worker_loop
+    worker_loop = get_worker_loop()
+    print(f"{'mode':10s} {'e2e':>8s} {'chunks':>7s} {'chars':>7s}  notes")
+    try:
+        for job_id, mode in enumerate((staged, streaming), start=1):
+            started = time.perf_counter()
+            result = worker_loop.run(mode(job_id))
+            print(f"{mode.__name__:10s} {time.perf_counter() - started:7.1f}s {result['chunks']:7d} {result['chars']:7d}  {result['note']}")
+    finally:
+        worker_loop.shutdown()
+        youtube.shutdown()
+        whisper.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
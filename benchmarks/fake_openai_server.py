@@ -0,0 +1,127 @@
+"""
+Minimal local stand-in for the OpenAI endpoints we call, for benchmarks and manual testing.
+
+    python benchmarks/fake_openai_server.py --port 8765 --latency-per-mb 2.0
+
+Then run the app/workers with OPENAI_BASE_URL=http://127.0.0.1:8765/v1 and any OPENAI_API_KEY.
+Transcription latency is base + latency-per-mb * upload size, which roughly mimics Whisper.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/0.1"
+    base_latency = 0.3
+    latency_per_mb = 2.0
+    latency_per_1k_prompt_tokens = 0.1 # Chat completions only
+    chat_error_rate = 0.0 # Fraction of chat completions answered with 429
+    seconds_per_output_token = 0.0 # Chat decode time (~4 chars per token)
+    request_count = 0
+    prompt_chars = 0 # Total chat prompt characters received
+    _lock = threading.Lock()
+
+    def log_message(self, format, *args): # Keep benchmark output clean
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_chat(self, n: int, content: str):
+        """Server-sent chat.completion.chunk events, ~one token (4 chars) per chunk."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+        for i, piece in enumerate(pieces + [None]):
+            chunk = {
+                "id": f"chatcmpl-{n}", "object": "chat.completion.chunk", "created": int(time.time()), "model": "fake",
+                "choices": [{"index": 0, "delta": {"content": piece} if piece else {},
+                             "finish_reason": None if piece else "stop"}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            if piece:
+                time.sleep(self.seconds_per_output_token)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        with FakeOpenAIHandler._lock:
+            FakeOpenAIHandler.request_count += 1
+            n = FakeOpenAIHandler.request_count
+
+        if self.path.endswith("/audio/transcriptions"):
+            time.sleep(self.base_latency + self.latency_per_mb * length / (1024 * 1024))
+            text = f"transcribed request {n} with {len(body)} bytes of audio."
+            self._send(200, text.encode(), "text/plain")
+        elif self.path.endswith("/chat/completions"):
+            if random.random() < self.chat_error_rate: # Simulated quota errors
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+                return
+            request = json.loads(body or b"{}")
+            prompt = "".join(m.get("content") or "" for m in request.get("messages", []))
+            with FakeOpenAIHandler._lock:
+                FakeOpenAIHandler.prompt_chars += len(prompt)
+            # Roughly: fixed overhead + prefill time for the prompt (~4 chars per token)
+            time.sleep(self.base_latency + self.latency_per_1k_prompt_tokens * len(prompt) / 4000)
+            topics = [f"Topic {i}" for i in range(60)]
+            if (request.get("response_format") or {}).get("type") == "json_object":
+                content = json.dumps({"genre": "Educational / Explainer", "topics": topics})
+            elif prompt.rstrip().endswith("Genre:"):
+                content = "Educational / Explainer"
+            else:
+                content = json.dumps(topics)
+            if request.get("stream"):
+                self._stream_chat(n, content)
+                return
+            time.sleep(self.seconds_per_output_token * len(content) / 4) # Decode time
+            reply = {
+                "id": f"chatcmpl-{n}", "object": "chat.completion", "created": int(time.time()), "model": "fake",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (len(prompt) + len(content)) // 4},
+            }
+            self._send(200, json.dumps(reply).encode(), "application/json")
+        else:
+            self._send(404, b'{"error": "not found"}', "application/json")
+
+
+def serve(port: int = 8765, base_latency: float = 0.3, latency_per_mb: float = 2.0) -> ThreadingHTTPServer:
+    """Starts the fake server on a background thread and returns it (call .shutdown() to stop)."""
+    FakeOpenAIHandler.base_latency = base_latency
+    FakeOpenAIHandler.latency_per_mb = latency_per_mb
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--base-latency", type=float, default=0.3)
+    parser.add_argument("--latency-per-mb", type=float, default=2.0)
+    args = parser.parse_args()
+    serve(args.port, args.base_latency, args.latency_per_mb)
+    print(f"Fake OpenAI server listening on http://127.0.0.1:{args.port}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
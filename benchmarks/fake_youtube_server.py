@@ -0,0 +1,153 @@
+"""
+Minimal local stand-in for a YouTube-like media host, for the ingest benchmark and manual testing.
+
+    python benchmarks/fake_youtube_server.py --port 8766 --size-mb 30 --segments 60 --kbps-per-connection 8000
+
+Every video id is served as:
+  /watch/<id>.m3u8       HLS master playlist with one audio-only variant (CODECS from --codec); the
+                         --metadata-latency applies here, like the watch page / player API round trip
+  /media/<id>/audio.m3u8 media playlist of --segments fragments
+  /media/<id>/seg/<n>    one fragment (cut at multiples of --align bytes, e.g. 188 for MPEG-TS)
+  /media/<id>.m4a        the whole file as one progressive download
+Each response waits --request-latency before the first byte and is then throttled to
+--kbps-per-connection, which is how the real host limits a single connection (and why fragments
+downloaded in parallel finish sooner). The media bytes are the --audio file, or deterministic
+pseudo-random bytes of --size-mb (enough to measure the download path; not decodable audio).
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+WRITE_CHUNK = 16 * 1024
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    server_version = "FakeYouTube/0.1"
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real CDN
+    payload = b""
+    segments = 60
+    align = 1
+    segment_seconds = 10.0
+    codec = "mp4a.40.2"
+    metadata_latency = 0.3
+    request_latency = 0.05
+    bytes_per_second = 1024 * 1024 # Per connection
+    request_count = 0
+    bytes_sent = 0
+    _lock = threading.Lock()
+
+    def log_message(self, format, *args): # Keep benchmark output clean
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, throttle: bool = False):
+        with FakeYouTubeHandler._lock:
+            FakeYouTubeHandler.request_count += 1
+        time.sleep(self.request_latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        started = time.perf_counter()
+        view = memoryview(body)
+        for offset in range(0, len(body), WRITE_CHUNK):
+            self.wfile.write(view[offset:offset + WRITE_CHUNK])
+            if throttle: # Sleep until this connection is back under its rate
+                ahead = (offset + WRITE_CHUNK) / self.bytes_per_second - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        with FakeYouTubeHandler._lock:
+            FakeYouTubeHandler.bytes_sent += len(body)
+
+    def _segment(self, n: int) -> Optional[bytes]:
+        if not 0 <= n < self.segments:
+            return None
+        size = -(-len(self.payload) // self.segments)
+        size += -size % self.align
+        return self.payload[n * size:(n + 1) * size]
+
+    def do_GET(self):
+        if match := re.fullmatch(r"/watch/([\w-]+)\.m3u8", self.path):
+            time.sleep(self.metadata_latency)
+            video_id = match.group(1)
+            master = (
+                "#EXTM3U\n"
+                f'#EXT-X-STREAM-INF:BANDWIDTH={self.bytes_per_second * 8},CODECS="{self.codec}"\n'
+                f"/media/{video_id}/audio.m3u8\n"
+            )
+            self._send(200, master.encode(), "application/vnd.apple.mpegurl")
+        elif match := re.fullmatch(r"/media/([\w-]+)/audio\.m3u8", self.path):
+            lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{int(self.segment_seconds) + 1}", "#EXT-X-MEDIA-SEQUENCE:0"]
+            for n in range(self.segments):
+                lines += [f"#EXTINF:{self.segment_seconds:.3f},", f"/media/{match.group(1)}/seg/{n}"]
+            lines.append("#EXT-X-ENDLIST")
+            self._send(200, ("\n".join(lines) + "\n").encode(), "application/vnd.apple.mpegurl")
+        elif (match := re.fullmatch(r"/media/[\w-]+/seg/(\d+)", self.path)) and (segment := self._segment(int(match.group(1)))) is not None:
+            self._send(200, segment, "application/octet-stream", throttle=True)
+        elif re.fullmatch(r"/media/[\w-]+\.m4a", self.path):
+            self._send(200, self.payload, "audio/mp4", throttle=True)
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    do_HEAD = do_GET
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address): # Clients dropping keep-alive connections is expected
+        pass
+
+
+def serve(
+    port: int = 8766,
+    size_mb: float = 30.0,
+    segments: int = 60,
+    codec: str = "mp4a.40.2",
+    metadata_latency: float = 0.3,
+    request_latency: float = 0.05,
+    kbps_per_connection: float = 8000.0,
+    audio: Optional[Path] = None,
+    align: int = 1,
+) -> ThreadingHTTPServer:
+    """Starts the fake host on a background thread and returns it (call .shutdown() to stop)."""
+    if audio:
+        FakeYouTubeHandler.payload = audio.read_bytes()
+    else:
+        FakeYouTubeHandler.payload = random.Random(0).randbytes(int(size_mb * 1024 * 1024))
+    FakeYouTubeHandler.segments = segments
+    FakeYouTubeHandler.align = align
+    FakeYouTubeHandler.codec = codec
+    FakeYouTubeHandler.metadata_latency = metadata_latency
+    FakeYouTubeHandler.request_latency = request_latency
+    FakeYouTubeHandler.bytes_per_second = kbps_per_connection * 1000 / 8
+    server = _Server(("127.0.0.1", port), FakeYouTubeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--size-mb", type=float, default=30.0)
+    parser.add_argument("--segments", type=int, default=60)
+    parser.add_argument("--codec", default="mp4a.40.2", help='HLS CODECS value, e.g. "opus" or "ac-3"')
+    parser.add_argument("--metadata-latency", type=float, default=0.3)
+    parser.add_argument("--request-latency", type=float, default=0.05)
+    parser.add_argument("--kbps-per-connection", type=float, default=8000.0)
+    parser.add_argument("--audio", type=Path, help="Serve this file instead of random bytes")
+    parser.add_argument("--align", type=int, default=1, help="Fragment boundaries at multiples of this many bytes")
+    args = parser.parse_args()
+    serve(args.port, args.size_mb, args.segments, args.codec, args.metadata_latency, args.request_latency, args.kbps_per_connection, args.audio, args.align)
+    print(f"Fake YouTube host on http://127.0.0.1:{args.port}/watch/<id>.m3u8 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,184 @@
+"""
+Runs whole job pipelines (app/services/pipeline.py) in-process with Celery in eager mode, against
+the local fake OpenAI and YouTube servers, and prints each job's stages and saved pipeline_state.
+
+    python benchmarks/pipeline_eager.py --minutes 2
+
+No broker or worker: task_always_eager runs every canvas synchronously inside the submitting
+call, through the same entry points the API uses (InputHandler.process_new_job/process_audio_stream
+and the resume endpoint's job_payload + pipeline_signature). Scenarios:
+  prompt      prompt -> topics
+  audio       raw-body upload -> normalize -> transcribe -> topics
+  audio again same bytes: transcript cache hit, straight to topics
+  resume      YouTube job with the Whisper server down: fails in transcribe (which deletes the
+              audio), then is resumed with the server back up and restarts from download
+  parallel    a harness-only "stats" stage next to topics, run as a chord and joined
+Exits non-zero if any job ends up not COMPLETED or with stages missing. Needs ffmpeg on PATH.
+The canvas and resume logic are unit-tested without ffmpeg in tests/test_pipeline.py.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+TMP = Path(tempfile.mkdtemp())
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{TMP / 'bench.db'}" # Always a throwaway database: main() drops all tables
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:8765/v1")
+os.environ["JOB_EVENTS_BACKEND"] = "memory"
+os.environ["PIPELINE_AUTORUN"] = "true"
+os.environ["DOWNLOAD_DIR"] = str(TMP / "downloads")
+os.environ["CACHE_DIR"] = str(TMP / "cache")
+os.environ["TRANSCRIPT_CACHE_PATH"] = str(TMP / "cache" / "transcripts.sqlite3")
+os.environ["LLM_CACHE_PATH"] = str(TMP / "cache" / "llm_responses.sqlite3")
+os.environ["TOPIC_INDEX_PATH"] = str(TMP / "cache" / "topic_index.sqlite3")
+
+from benchmarks import fake_openai_server, fake_youtube_server # noqa: E402
+from benchmarks.bench_audio_normalizer import make_fixture # noqa: E402
+
+OPENAI_PORT = 8765
+YOUTUBE_PORT = 8766
+URL = f"http://127.0.0.1:{YOUTUBE_PORT}/media/video0001.m4a"
+
+
+def setup_stats_stage():
+    """Registers a "stats" stage (transcript word count) and runs it side by side with topics for audio jobs."""
+    from app.celery_app import AsyncTask, celery, worker_session
+    from app.services import pipeline
+    from app.services.database_service import DatabaseService
+
+    async def stats(payload):
+        async with worker_session() as db:
+            job = await DatabaseService().get_job(db, payload["job_id"], columns=["transcript"])
+            return {"transcript_words": len((job.transcript or "").split())}
+
+    @celery.task(name="tasks.pipeline.stats", bind=True, base=AsyncTask)
+    async def stats_task(self, payload):
+        return await pipeline.run_stage("stats", payload)
+
+    pipeline.STAGES["stats"] = pipeline.Stage(stats)
+    pipeline.STAGE_TASKS["stats"] = stats_task
+    pipeline.PIPELINES["audio_file"] = ("normalize", "transcribe", ("topics", "stats"))
+
+
+async def fetch(job_id: int):
+    from app.database import AsyncSessionLocal
+    from app.services.database_service import DatabaseService
+    async with AsyncSessionLocal() as db:
+        return await DatabaseService().get_job(db, job_id, columns=["status", "status_message", "topics", "pipeline_state"])
+
+
+async def report(name: str, job_id: int, expected, failures: list) -> None:
+    job = await fetch(job_id)
+    state = job.pipeline_state or {}
+    completed = state.get("completed") or []
+    print(f"{name:12s} job {job_id:<3d} {job.status.value:10s} completed={'/'.join(completed) or '-':40s} "
+          f"topics={len(job.topics or [])} {job.status_message!r}")
+    extra = {k: v for k, v in state.items() if k not in ("job_id", "source_type", "source_value", "completed", "failed") and v}
+    if extra:
+        print(f"{'':12s} state {extra}")
+    if job.status.value != "COMPLETED" or not set(expected) <= set(completed):
+        failures.append(f"{name}: {job.status.value}, completed {completed}, expected {list(expected)}")
+
+
+async def run(fixture: Path, whisper) -> list:
+    from app.database import AsyncSessionLocal
+    from app.services.database_service import DatabaseService
+    from app.services.input_handler import InputHandler
+    from app.services.pipeline import PipelineStageError, job_payload, pipeline_signature, remaining_steps, start_pipeline, step_label
+
+    handler = InputHandler()
+    failures: list = []
+
+    async def submit(source_type, source_value):
+        async with AsyncSessionLocal() as db:
+            job = await handler.process_new_job(db, source_type, source_value)
+            job_id = job.id
+            await db.commit() # What get_db does after the response
+            return job_id
+
+    async def upload(path: Path):
+        async def body():
+            with path.open("rb") as f:
+                while block := f.read(1 << 20):
+                    yield block
+        async with AsyncSessionLocal() as db:
+            job = await handler.process_audio_stream(db, body(), path.name, path.stat().st_size)
+            job_id = job.id
+            await db.commit() # What get_db does after the response
+            return job_id
+
+    await report("prompt", await submit("prompt", "Five habits of effective remote teams"), ["topics"], failures)
+    await report("audio", await upload(fixture), ["normalize", "transcribe", "topics", "stats"], failures)
+    await report("audio again", await upload(fixture), ["topics", "stats"], failures)
+
+    # Resume: no Whisper server, so the YouTube job fails in transcribe
+    whisper.shutdown()
+    whisper.server_close()
+    async with AsyncSessionLocal() as db:
+        job = await DatabaseService().create_job(db, "youtube_url", URL)
+        job_id = job.id
+        await db.commit()
+    try: # Not through process_new_job: in eager mode the stage's failure propagates to whoever applied the canvas
+        start_pipeline(job_id, "youtube_url", URL)
+        failures.append("resume: the pipeline should have failed in transcribe")
+    except PipelineStageError as e:
+        print(f"{'':12s} {e}")
+    job = await fetch(job_id)
+    state = job.pipeline_state or {}
+    print(f"{'resume':12s} job {job_id:<3d} {job.status.value:10s} completed={'/'.join(state.get('completed') or [])} "
+          f"failed={state.get('failed')}")
+    whisper = fake_openai_server.serve(OPENAI_PORT, base_latency=0.05, latency_per_mb=0.5)
+    try:
+        payload = job_payload(job)
+        steps = remaining_steps(payload)
+        print(f"{'':12s} resuming: {' -> '.join(step_label(s) for s in steps)}")
+        pipeline_signature(payload).apply_async()
+        await report("resumed", job_id, ["download", "normalize", "transcribe", "topics"], failures)
+    finally:
+        whisper.shutdown()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=2.0, help="Length of the audio fixture")
+    args = parser.parse_args()
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg not found on PATH")
+
+    from app.celery_app import celery, get_worker_loop
+    from app.database import Base, sync_engine
+    import app.models.video_job # noqa: F401  (registers the tables)
+    celery.conf.update(task_always_eager=True, task_eager_propagates=True)
+    Base.metadata.drop_all(sync_engine)
+    Base.metadata.create_all(sync_engine)
+    setup_stats_stage()
+
+    fixture = TMP / "fixture.m4a"
+    make_fixture(fixture, args.minutes, ("-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart"))
+    video = TMP / "video.m4a" # Different audio, so the YouTube job can't hit the transcript cache
+    make_fixture(video, args.minutes / 2, ("-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart"))
+    youtube = fake_youtube_server.serve(YOUTUBE_PORT, audio=video, metadata_latency=0.05)
+    whisper = fake_openai_server.serve(OPENAI_PORT, base_latency=0.05, latency_per_mb=0.5)
+    try:
+        failures = asyncio.run(run(fixture, whisper))
+    finally:
+        get_worker_loop().shutdown()
+        youtube.shutdown()
+        shutil.rmtree(TMP, ignore_errors=True)
+    if failures:
+        sys.exit("FAILED:\n  " + "\n  ".join(failures))
+    print("all pipelines completed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Test settings: every path and the database point into a temp directory, the broker and result
+backend are in memory, and the schema is created with Base.metadata (no migrations).
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+TMP = Path(tempfile.mkdtemp(prefix="ai_youtube_tests_"))
+os.environ["SECRET_KEY"] = "test"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{TMP / 'test.db'}"
+os.environ["CELERY_BROKER_URL"] = "memory://"
+os.environ["CELERY_RESULT_BACKEND"] = "cache+memory://"
+os.environ["JOB_EVENTS_BACKEND"] = "memory"
+os.environ["DOWNLOAD_DIR"] = str(TMP / "downloads")
+os.environ["CACHE_DIR"] = str(TMP / "cache")
+os.environ["TRANSCRIPT_CACHE_PATH"] = str(TMP / "cache" / "transcripts.sqlite3")
+os.environ["LLM_CACHE_PATH"] = str(TMP / "cache" / "llm_responses.sqlite3")
+os.environ["TOPIC_INDEX_PATH"] = str(TMP / "cache" / "topic_index.sqlite3")
+os.environ["LOG_DIR"] = str(TMP / "logs")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app.database import Base, sync_engine
+    import app.models.video_job # noqa: F401  (registers the tables)
+    Base.metadata.create_all(sync_engine)
+    yield
+    from app.celery_app import get_worker_loop
+    get_worker_loop().shutdown()
+
+
+@pytest.fixture
+def eager():
+    """Celery in eager mode: a canvas runs synchronously inside apply_async, and a failing task raises there."""
+    from app.celery_app import celery
+    previous = (celery.conf.task_always_eager, celery.conf.task_eager_propagates)
+    celery.conf.update(task_always_eager=True, task_eager_propagates=True)
+    yield celery
+    celery.conf.update(task_always_eager=previous[0], task_eager_propagates=previous[1])
+
+
+@pytest.fixture
+def make_job():
+    """Inserts a VideoJob row (committed) and returns its id."""
+    from app.database import SyncSessionLocal
+    from app.models.video_job import JobStatus, VideoJob
+
+    def make(source_type="youtube_url", source_value="https://youtu.be/abc", status=JobStatus.PENDING, **values):
+        with SyncSessionLocal() as session:
+            job = VideoJob(source_type=source_type, source_value=source_value, status=status, **values)
+            session.add(job)
+            session.commit()
+            return job.id
+    return make
@@ -0,0 +1,69 @@
+"""
+The job endpoints that (re)start work, through TestClient. The broker is in memory and nothing
+consumes it, so a started canvas stays queued: what the API sees right after a submission.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.database import SyncSessionLocal
+from app.models.video_job import JobStatus, VideoJob
+from app.routers import jobs
+from app.services.pipeline import new_payload
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "PIPELINE_AUTORUN", True)
+    app = FastAPI() # Not app.main: only the router under test (main also mounts app/static)
+    app.include_router(jobs.router, prefix="/api/v1")
+    with TestClient(app) as client:
+        yield client
+
+
+def set_job(job_id: int, **values) -> None:
+    with SyncSessionLocal() as session:
+        job = session.get(VideoJob, job_id)
+        for name, value in values.items():
+            setattr(job, name, value)
+        session.commit()
+
+
+def test_autorun_prompt_job_is_running_until_its_topics_are_written(client):
+    response = client.post("/api/v1/jobs", data={"source_type": "prompt", "prompt_text": "Five habits of remote teams"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == JobStatus.PROCESSING.value
+
+    assert client.post(f"/api/v1/jobs/{job_id}/pipeline").status_code == 409
+    assert client.post(f"/api/v1/jobs/{job_id}/generate_topics").status_code == 409
+
+
+def test_job_between_stages_is_still_running(client, make_job):
+    # The transcribe stage wrote COMPLETED, the canvas's topics stage hasn't run yet
+    job_id = make_job(status=JobStatus.COMPLETED, transcript="text", transcript_fetched=True)
+    set_job(job_id, pipeline_state=new_payload(job_id, "youtube_url", "u", completed=["download", "normalize", "transcribe"], transcribed=True))
+
+    assert client.get(f"/api/v1/jobs/{job_id}/status").json()["pipeline_running"] is True
+    assert client.post(f"/api/v1/jobs/{job_id}/pipeline").status_code == 409
+    assert client.post(f"/api/v1/jobs/{job_id}/generate_topics").status_code == 409
+    assert client.post(f"/api/v1/jobs/{job_id}/generate_topics", params={"force": "true"}).status_code == 202
+
+
+def test_failed_pipeline_can_be_resumed_once(client, make_job):
+    job_id = make_job(status=JobStatus.FAILED, transcript="text", transcript_fetched=True)
+    set_job(job_id, pipeline_state=new_payload(job_id, "youtube_url", "u", completed=["download", "normalize", "transcribe"],
+                                                transcribed=True, failed="topics"))
+
+    response = client.post(f"/api/v1/jobs/{job_id}/pipeline")
+    assert response.status_code == 202
+    assert response.json()["remaining"] == ["topics"]
+    # The resumed canvas is queued: a second resume is refused
+    assert client.post(f"/api/v1/jobs/{job_id}/pipeline").status_code == 409
+
+
+def test_cache_stats(client):
+    body = client.get("/api/v1/cache/stats").json()
+    assert set(body) == {"transcripts", "llm_responses"}
+    assert body["transcripts"]["misses"] >= 0
@@ -0,0 +1,36 @@
+"""_PartialTopicWriter (streamed topic generation) against a recording status writer."""
+from app.core.config import settings
+from app.models.video_job import JobStatus
+from app.services.llm_service import _PartialTopicWriter
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.submits = []
+
+    def submit(self, job_id, status, message=None, **values):
+        self.submits.append((status, values))
+
+
+def test_reset_clears_the_persisted_topics_of_a_rejected_reply(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STREAM_PERSIST_EVERY", 2)
+    writer = RecordingWriter()
+    partial = _PartialTopicWriter(1, writer)
+    partial(["a", "b"])
+    assert writer.submits[-1] == (JobStatus.PROCESSING, {"topics": ["a", "b"]})
+
+    partial.reset()
+    assert writer.submits[-1] == (JobStatus.PROCESSING, {"topics": None})
+    assert partial.topics == []
+    assert partial.persisted_any # The task's failure handler still clears the column
+
+
+def test_reset_writes_nothing_when_nothing_was_persisted(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STREAM_PERSIST_EVERY", 10)
+    monkeypatch.setattr(settings, "LLM_STREAM_PERSIST_INTERVAL_SECONDS", 60)
+    writer = RecordingWriter()
+    partial = _PartialTopicWriter(1, writer)
+    partial(["a"])
+    partial.reset()
+    assert writer.submits == []
+    assert not partial.persisted_any
@@ -0,0 +1,241 @@
+"""
+Pipeline orchestration (app/services/pipeline.py) with Celery in eager mode. The stage bodies are
+stubbed, so the canvas, the saved pipeline_state and the resume logic run without ffmpeg, yt-dlp
+or OpenAI.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.database import SyncSessionLocal
+from app.models.video_job import JobStatus, VideoJob
+from app.services import pipeline
+from app.services.pipeline import (
+    PipelineStageError,
+    PipelineStages,
+    Stage,
+    job_payload,
+    new_payload,
+    pipeline_running,
+    pipeline_signature,
+    remaining_steps,
+    start_pipeline,
+)
+
+
+def saved_job(job_id: int) -> VideoJob:
+    with SyncSessionLocal() as session:
+        job = session.get(VideoJob, job_id)
+        session.expunge(job)
+        return job
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """
+    Replaces every stage body with a stub that records the call and returns stage_values[name]
+    (or raises it, when it is an exception). inputs_ready stays the real one.
+    """
+    calls, stage_values = [], {}
+
+    def stub(name):
+        async def run(payload):
+            calls.append(name)
+            value = stage_values.get(name, {})
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return run
+
+    for name, stage in list(pipeline.STAGES.items()):
+        monkeypatch.setitem(pipeline.STAGES, name, Stage(stub(name), stage.inputs_ready))
+    return SimpleNamespace(calls=calls, values=stage_values)
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "audio.m4a"
+    path.write_bytes(b"audio")
+    return str(path)
+
+
+# --- remaining_steps ---
+
+def test_new_job_runs_every_step():
+    assert remaining_steps(new_payload(1, "youtube_url", "u")) == ["download", "normalize", "transcribe", "topics"]
+    assert remaining_steps(new_payload(1, "prompt")) == ["topics"]
+
+
+def test_normalize_is_skipped_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_NORMALIZE_ENABLED", False)
+    assert remaining_steps(new_payload(1, "audio_file", "a")) == ["transcribe", "topics"]
+
+
+def test_resumes_after_the_last_completed_stage(audio_file):
+    payload = new_payload(1, "youtube_url", "u", audio_file_path=audio_file, completed=["download", "normalize"])
+    assert remaining_steps(payload) == ["transcribe", "topics"]
+
+
+def test_resume_moves_back_when_the_audio_is_gone(tmp_path):
+    payload = new_payload(1, "youtube_url", "u", audio_file_path=str(tmp_path / "deleted.m4a"), completed=["download", "normalize"])
+    assert remaining_steps(payload) == ["download", "normalize", "transcribe", "topics"]
+
+
+def test_transcribed_job_only_needs_topics(tmp_path):
+    payload = new_payload(1, "audio_file", "a", audio_file_path=str(tmp_path / "deleted.m4a"), transcribed=True)
+    assert remaining_steps(payload) == ["topics"]
+    assert remaining_steps({**payload, "completed": ["topics"]}) == []
+    assert pipeline_signature({**payload, "completed": ["topics"]}) is None
+
+
+# --- job_payload ---
+
+def job_row(**values):
+    row = {"id": 7, "source_type": "audio_file", "source_value": "/a.m4a", "pipeline_state": None, "transcript": None, "topics": None}
+    return SimpleNamespace(**{**row, **values})
+
+
+def test_job_payload_prefers_the_saved_state():
+    state = new_payload(7, "audio_file", "/a.m4a", completed=["normalize"], failed="transcribe", content_key="k")
+    payload = job_payload(job_row(pipeline_state=state))
+    assert payload["completed"] == ["normalize"]
+    assert payload["content_key"] == "k"
+    assert payload["failed"] is None
+
+
+def test_job_payload_from_columns():
+    assert job_payload(job_row())["audio_file_path"] == "/a.m4a"
+    transcribed = job_payload(job_row(transcript="text"))
+    assert transcribed["transcribed"] is True
+    assert remaining_steps(transcribed) == ["topics"]
+    assert remaining_steps(job_payload(job_row(transcript="text", topics=["t"]))) == []
+
+
+# --- canvas ---
+
+def test_chain_runs_the_stages_in_order_and_saves_the_state(eager, stages, make_job, audio_file):
+    job_id = make_job()
+    stages.values["download"] = {"audio_file_path": audio_file, "cache_aliases": ["video:abc"]}
+    stages.values["transcribe"] = {"transcribed": True, "audio_file_path": None}
+
+    assert start_pipeline(job_id, "youtube_url", "https://youtu.be/abc") == ["download", "normalize", "transcribe", "topics"]
+    assert stages.calls == ["download", "normalize", "transcribe", "topics"]
+    state = saved_job(job_id).pipeline_state
+    assert state["completed"] == ["download", "normalize", "transcribe", "topics"]
+    assert state["cache_aliases"] == ["video:abc"]
+    assert state["transcribed"] is True
+
+
+def test_join_merges_the_payloads_of_parallel_stages(eager, make_job):
+    job_id = make_job()
+    base = new_payload(job_id, "prompt")
+    merged = PipelineStages.join_task.apply(args=([
+        {**base, "completed": ["normalize", "transcribe"], "transcribed": True},
+        {**base, "completed": ["normalize", "topics"], "topic_count": 3},
+    ],)).get()
+    assert merged["completed"] == ["normalize", "transcribe", "topics"]
+    assert merged["transcribed"] is True and merged["topic_count"] == 3
+    assert saved_job(job_id).pipeline_state == merged
+
+
+def test_parallel_step_runs_as_a_chord(eager, stages, make_job, monkeypatch):
+    monkeypatch.setitem(pipeline.PIPELINES, "prompt", (("normalize", "transcribe"), "topics"))
+    stages.values["normalize"] = {"content_key": "k"}
+    stages.values["transcribe"] = {"transcribed": True}
+    job_id = make_job("prompt", "x")
+
+    start_pipeline(job_id, "prompt")
+    assert sorted(stages.calls[:2]) == ["normalize", "transcribe"]
+    assert stages.calls[2:] == ["topics"]
+    state = saved_job(job_id).pipeline_state
+    assert set(state["completed"]) == {"normalize", "transcribe", "topics"}
+    assert state["content_key"] == "k" and state["transcribed"] is True
+
+
+def test_failed_stage_stops_the_canvas_and_resume_starts_over_it(eager, stages, make_job, audio_file):
+    job_id = make_job()
+    stages.values["download"] = {"audio_file_path": audio_file}
+    stages.values["transcribe"] = PipelineStageError("Whisper failed")
+
+    with pytest.raises(PipelineStageError):
+        start_pipeline(job_id, "youtube_url", "https://youtu.be/abc")
+    assert stages.calls == ["download", "normalize", "transcribe"] # topics never ran
+    job = saved_job(job_id)
+    assert job.pipeline_state["completed"] == ["download", "normalize"]
+    assert job.pipeline_state["failed"] == "transcribe"
+
+    # The audio is still there: resume at transcribe
+    stages.calls.clear()
+    stages.values["transcribe"] = {"transcribed": True}
+    pipeline_signature(job_payload(job)).apply_async()
+    assert stages.calls == ["transcribe", "topics"]
+    assert saved_job(job_id).pipeline_state["completed"] == ["download", "normalize", "transcribe", "topics"]
+
+
+def test_crashed_stage_marks_the_job_failed(eager, stages, make_job):
+    job_id = make_job("prompt", "x")
+    stages.values["topics"] = RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        start_pipeline(job_id, "prompt")
+    job = saved_job(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.pipeline_state["failed"] == "topics"
+    assert job.pipeline_state["completed"] == []
+
+
+def test_pipeline_running():
+    state = new_payload(1, "prompt")
+    assert pipeline_running(state)
+    assert not pipeline_running({**state, "failed": "topics"})
+    assert not pipeline_running({**state, "completed": ["topics"]})
+    assert not pipeline_running(None)
+
+
+def test_job_a_stage_completed_stays_processing_while_steps_remain(eager, stages, make_job):
+    # As after a transcribe stage: the job is COMPLETED ("Ready for topic generation"), topics still to run
+    job_id = make_job(status=JobStatus.COMPLETED)
+    payload = new_payload(job_id, "youtube_url", "u", completed=["download", "normalize"], transcribed=True)
+
+    payload = PipelineStages.transcribe_task.apply(args=(payload,)).get()
+    job = saved_job(job_id)
+    assert job.status == JobStatus.PROCESSING
+    assert job.status_message == "Running pipeline stage topics..."
+    assert pipeline_running(job.pipeline_state)
+
+    PipelineStages.topics_task.apply(args=(payload,)).get()
+    assert not pipeline_running(saved_job(job_id).pipeline_state)
+
+
+def test_new_canvas_saves_its_state_before_the_first_stage(eager, stages, make_job):
+    job_id = make_job()
+    seen = []
+    original = pipeline.STAGES["download"]
+
+    async def download(payload):
+        seen.append(saved_job(job_id).pipeline_state)
+        return await original.run(payload)
+    pipeline.STAGES["download"] = Stage(download, original.inputs_ready)
+    stages.values["download"] = PipelineStageError("download failed")
+
+    with pytest.raises(PipelineStageError):
+        start_pipeline(job_id, "youtube_url", "https://youtu.be/abc")
+    assert seen[0]["completed"] == [] and pipeline_running(seen[0])
+
+
+def test_side_by_side_last_step_leaves_the_job_completed(eager, stages, make_job, monkeypatch):
+    monkeypatch.setitem(pipeline.PIPELINES, "prompt", ("normalize", ("transcribe", "topics")))
+    job_id = make_job("prompt", "x")
+
+    async def topics(payload): # Writes the job's final status, like the real topics stage
+        with SyncSessionLocal() as session:
+            session.get(VideoJob, job_id).status = JobStatus.COMPLETED
+            session.commit()
+        return {}
+    pipeline.STAGES["topics"] = Stage(topics)
+
+    start_pipeline(job_id, "prompt")
+    job = saved_job(job_id)
+    assert job.status == JobStatus.COMPLETED # Not reopened by topics' sibling or the join
+    assert not pipeline_running(job.pipeline_state)